@@ -270,6 +270,8 @@ tbox_graph.add((volumeYear, RDFS.label, Literal("volume year")))
 # Save the TBOX to a file
 tbox_graph.serialize("research_tbox.ttl", format="turtle")
 print("TBOX created and saved to research_tbox.ttl")
+# N-Triples copy, prepended by the streaming ABox export without parsing Turtle
+tbox_graph.serialize("research_tbox.nt", format="nt", encoding="utf-8")
 
 # Print some statistics
 print(f"Number of classes: {len(list(tbox_graph.subjects(RDF.type, RDFS.Class)))}")
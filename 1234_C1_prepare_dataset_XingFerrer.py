@@ -1,53 +1,84 @@
-import pandas as pd
+import argparse
+import gzip
+import itertools
+import os
+
+import numpy as np
 from rdflib import Graph, Literal
-from sklearn.model_selection import train_test_split
 
-TTL_FILE   = "research_ontology.ttl"   # tu ABox en TTL
+import kg_dataset
+import ttl_stream
+
+# ABox written by B_ABOX: Turtle from the columnar / rowwise modes, N-Triples
+# (optionally gzipped) from stream / incremental. The newest one is used
+# unless --input names a file.
+ABOX_FILES = ["research_ontology.nt", "research_ontology.nt.gz", "research_ontology.ttl"]
 MAX_LIT_LEN= 200                  # filtrado de literales
 SEED       = 42
 MIN_COUNT   = 3    # Umbral mínimo para mantener relación en estratificación
 
 def load_triples(ttl_path):
+    # Streaming reader for the Turtle/N-Triples our ABox builder writes;
+    # rdflib is only used for syntax outside that subset.
+    # Returns (n, 3) id triples plus the entity / relation names behind the ids.
+    try:
+        entities, relations = {}, {}
+        rows = ttl_stream.iter_triples(ttl_path, max_lit_len=MAX_LIT_LEN)
+        ids = ttl_stream.iter_id_triples(drop_missing(rows), entities, relations)
+        triples = np.fromiter(itertools.chain.from_iterable(ids), dtype=np.int64)
+    except ttl_stream.UnsupportedSyntax as e:
+        print(f"Falling back to rdflib: {e}")
+        entities, relations = {}, {}
+        ids = ttl_stream.iter_id_triples(drop_missing(load_triples_rdflib(ttl_path)), entities, relations)
+        triples = np.fromiter(itertools.chain.from_iterable(ids), dtype=np.int64)
+    # A graph is a set: drop triples an N-Triples stream repeated
+    triples = np.unique(triples.reshape(-1, 3), axis=0)
+    return triples, np.array(list(entities), dtype=object), np.array(list(relations), dtype=object)
+
+def drop_missing(rows):
+    # Missing CSV values end up as the literal "nan"; dropped here, before the
+    # split, so the coverage it enforces holds for the triples actually saved
+    for h, r, t in rows:
+        if h != 'nan' and t != 'nan':
+            yield h, r, t
+
+def default_input():
+    found = [path for path in ABOX_FILES if os.path.exists(path)]
+    if not found:
+        raise SystemExit(f"No ABox found ({', '.join(ABOX_FILES)}); run 1234_B_ABOX_XingFerrer.py first")
+    return max(found, key=os.path.getmtime)
+
+def load_triples_rdflib(ttl_path):
     g = Graph()
-    g.parse(ttl_path, format="ttl")
-    rows = []
+    fmt = "nt" if ttl_path.endswith((".nt", ".nt.gz")) else "ttl"
+    if ttl_path.endswith(".gz"):
+        with gzip.open(ttl_path, "rb") as source:
+            g.parse(source, format=fmt)
+    else:
+        g.parse(ttl_path, format=fmt)
     for s, p, o in g:
         if isinstance(o, Literal) and len(str(o)) > MAX_LIT_LEN:
             continue
-        rows.append((str(s), str(p), str(o)))
-    return pd.DataFrame(rows, columns=["head","relation","tail"])
-
-def make_splits(df):
-    counts = df["relation"].value_counts()
-    df["stratify_rel"] = df["relation"].apply(
-        lambda r: r if counts[r] >= MIN_COUNT else "rare"
-    )
-    # Split train vs temp (80/20)
-    train, temp = train_test_split(
-        df,
-        test_size=0.2,
-        random_state=SEED,
-        stratify=df["stratify_rel"]
-    )
-    # Split temp en valid/test 50/50 -> 10/10 total
-    counts_temp = temp["relation"].value_counts()
-    temp["stratify_rel"] = temp["relation"].apply(
-        lambda r: r if counts_temp[r] >= MIN_COUNT else "rare"
-    )
-    valid, test = train_test_split(
-        temp,
-        test_size=0.5,
-        random_state=SEED,
-        stratify=temp["stratify_rel"]
-    )
-    for split in (train, valid, test):
-        split.drop(columns="stratify_rel", inplace=True)
-    return train, valid, test
+        yield str(s), str(p), str(o)
+
+def make_splits(triples):
+    # 80/10/10 estratificado por relación; las relaciones con menos de MIN_COUNT
+    # triples van juntas como "rare". Devuelve índices y cuántos triples de
+    # valid/test se han movido a train para que todas sus entidades estén en train.
+    return kg_dataset.split_triples(triples, fractions=(0.8, 0.1, 0.1), seed=SEED, min_count=MIN_COUNT)
 
 if __name__ == "__main__":
-    df = load_triples(TTL_FILE)
-    train, valid, test = make_splits(df)
-    train.to_csv("train.tsv", sep="\t", index=False, header=False)
-    valid.to_csv("valid.tsv", sep="\t", index=False, header=False)
-    test.to_csv("test.tsv",  sep="\t", index=False, header=False)
-    print(f"Total triples: {len(df)}  →  train={len(train)}, valid={len(valid)}, test={len(test)}")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Split the ABox into train / valid / test")
+    parser.add_argument("--input", help=f"ABox file (default: the newest of {', '.join(ABOX_FILES)})")
+    args = parser.parse_args()
+    ttl_file = args.input or default_input()
+    print(f"Reading {ttl_file}")
+    triples, entities, relations = load_triples(ttl_file)
+    splits, moved = make_splits(triples)
+    for name, idx in splits.items():
+        kg_dataset.write_tsv(f"{name}.tsv", triples[idx], entities, relations)
+    # Integer-encoded copy for C2-C4 (int32 .npy triples + vocabularies)
+    kg_dataset.save_arrays({name: triples[idx] for name, idx in splits.items()}, entities, relations)
+    train, valid, test = (len(splits[name]) for name in ("train", "valid", "test"))
+    print(f"Total triples: {len(triples)}  →  train={train}, valid={valid}, test={test}")
+    print(f"Moved {moved} valid/test triples to train to keep every entity and relation covered")
@@ -1,16 +1,30 @@
+import os
+
 import torch
-import torch.nn as nn
-import torch.optim as optim
 import numpy as np
-import pandas as pd
+
+import checkpoints
+import kg_dataset
+import transe
+from ann_index import IVFPQIndex, recall_at_k
+from entity_search import EntitySearch
+from transe import KnownTriples, TransEModel
 
 # ——— Parameters ———
-TRAIN_FILE    = "train.tsv"  # generated by C1_prepare_dataset.py
 EMBED_DIM     = 50           # embedding dimensionality
 MARGIN        = 1.0          # margin for ranking loss
 LEARNING_RATE = 0.01
 EPOCHS        = 50
 BATCH_SIZE    = 512
+NEGATIVES     = 5            # corrupted triples per positive
+HEAD_PROB     = 0.5          # share of negatives corrupting the head instead of the tail
+FILTER_NEGATIVES = True      # redraw negatives that are known train triples
+SPARSE        = False        # sparse embedding gradients + SparseAdam (large entity sets; always on with WORKERS > 1)
+RENORM        = False        # keep the entity rows a batch touches inside the unit ball
+WORKERS       = 1            # >1: Hogwild training with this many CPU processes
+TOP_K         = 5            # candidates listed per example query
+USE_ANN       = False        # also answer the batched query with an IVF-PQ index
+ANN_FILE      = "ann_{}_e{}.npz"  # one index per entity type and trained epoch count, saved in the model checkpoint
 
 # URIs to use for the example queries
 PAPER_URI     = "http://research.publications.com/instance#Paper_9169568"
@@ -18,79 +32,57 @@ CITES_URI     = "http://research.publications.com/ontology#cites"
 WRITTENBY_URI = "http://research.publications.com/ontology#writtenBy"
 
 # ——— Load triples and build mappings ———
-df = pd.read_csv(
-    TRAIN_FILE,
-    sep="\t",
-    names=["head", "relation", "tail"],
-    dtype=str,
-    keep_default_na=False,
-)
-
-# Combine heads and tails, then extract unique entity and relation lists
-all_entities = pd.concat([df["head"], df["tail"]])
-entities = list(all_entities.unique())
-relations = list(df["relation"].unique())
-
-ent2id = {ent: idx for idx, ent in enumerate(entities)}
-rel2id = {rel: idx for idx, rel in enumerate(relations)}
-
-# Convert triples to integer IDs
-triples = torch.LongTensor([
-    [ent2id[h], rel2id[r], ent2id[t]]
-    for h, r, t in df.values
-])
-
-# ——— TransE model definition ———
-class TransEModel(nn.Module):
-    def __init__(self, num_entities, num_relations, dim):
-        super().__init__()
-        self.entity_embeddings = nn.Embedding(num_entities, dim)
-        self.relation_embeddings = nn.Embedding(num_relations, dim)
-        nn.init.xavier_uniform_(self.entity_embeddings.weight.data)
-        nn.init.xavier_uniform_(self.relation_embeddings.weight.data)
-
-    def forward(self, heads, rels, tails):
-        # L2 norm of (e_h + w_r - e_t)
-        h_emb = self.entity_embeddings(heads)
-        r_emb = self.relation_embeddings(rels)
-        t_emb = self.entity_embeddings(tails)
-        return torch.norm(h_emb + r_emb - t_emb, p=2, dim=1)
+# Integer triples come straight from the binary dataset (built from the TSVs on first use)
+dataset = kg_dataset.load_or_build()
+
+# Only entities and relations seen in train get an embedding
+entities = list(dataset.entities[:dataset.n_train_entities])
+relations = list(dataset.relations[:dataset.n_train_relations])
+
+vocab = kg_dataset.build_vocab(dataset)
+
+triples = torch.from_numpy(np.asarray(dataset.train, dtype=np.int64))
 
 # ——— Training loop ———
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model = TransEModel(len(entities), len(relations), EMBED_DIM).to(device)
-optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
-criterion = nn.MarginRankingLoss(margin=MARGIN)
-
-# Precompute all entity IDs for negative sampling
-all_entity_ids = torch.arange(len(entities), device=device)
-
-for epoch in range(1, EPOCHS + 1):
-    permutation = torch.randperm(len(triples))
-    epoch_losses = []
-    for i in range(0, len(permutation), BATCH_SIZE):
-        batch_idx = permutation[i:i + BATCH_SIZE]
-        positive = triples[batch_idx].to(device)
-
-        # Create negative samples by corrupting the tail
-        neg_tails = all_entity_ids[
-            torch.randint(0, len(entities), (positive.size(0),))
-        ]
-        negative = torch.stack([positive[:, 0], positive[:, 1], neg_tails], dim=1)
-
-        model.zero_grad()
-        pos_scores = model(positive[:, 0], positive[:, 1], positive[:, 2])
-        neg_scores = model(negative[:, 0], negative[:, 1], negative[:, 2])
-
-        # We want pos_score + margin < neg_score -> label = -1
-        target = -torch.ones_like(pos_scores, device=device)
-        loss = criterion(pos_scores, neg_scores, target)
-        loss.backward()
-        optimizer.step()
-        epoch_losses.append(loss.item())
-
-    avg_loss = np.mean(epoch_losses)
-    print(f"Epoch {epoch:2d}/{EPOCHS} – Avg Loss: {avg_loss:.4f}")
+triples = triples.to(device)
+hogwild = WORKERS > 1 and device.type == "cpu"
+# Hogwild workers must only write the rows their batch touches, i.e. use SparseAdam
+sparse = SPARSE or hogwild
+model = TransEModel(len(entities), len(relations), EMBED_DIM, sparse=sparse).to(device)
+
+# Corrupted triples that are true in train are redrawn instead of pushed apart
+known = KnownTriples(triples, len(entities), len(relations), device) if FILTER_NEGATIVES else None
+
+# Weights are checkpointed under checkpoints/transe-<hash>; a finished run is
+# reused as is and an interrupted one resumes after its last saved epoch
+checkpoint = checkpoints.Checkpoint("transe", {
+    "dim": EMBED_DIM, "margin": MARGIN, "lr": LEARNING_RATE, "batch_size": BATCH_SIZE,
+    "negatives": NEGATIVES, "head_prob": HEAD_PROB, "filter": FILTER_NEGATIVES,
+    "sparse": sparse, "renorm": RENORM,
+})
+MODEL_FILE = checkpoint.file("model.pt")
+optimizer = transe.make_optimizer(model, LEARNING_RATE)
+done = checkpoint.epochs_done()
+if done:
+    transe.load_checkpoint(MODEL_FILE, model, optimizer if not hogwild else None)
+    print(f"Loaded checkpoint {checkpoint.path} ({done}/{EPOCHS} epochs)")
+
+
+def save_epoch(epoch):
+    if epoch % checkpoints.CHECKPOINT_EVERY == 0 or epoch == EPOCHS:
+        transe.save_checkpoint(MODEL_FILE, model, optimizer if not hogwild else None)
+        checkpoint.save_meta(epoch)
+
+
+if hogwild:
+    transe.train_hogwild(model, triples, EPOCHS, BATCH_SIZE, MARGIN, LEARNING_RATE,
+                         negatives=NEGATIVES, known=known, head_prob=HEAD_PROB, renorm=RENORM,
+                         workers=WORKERS, start_epoch=done + 1, on_epoch=save_epoch)
+else:
+    transe.train(model, optimizer, triples, EPOCHS, BATCH_SIZE, MARGIN,
+                 negatives=NEGATIVES, known=known, head_prob=HEAD_PROB, renorm=RENORM,
+                 start_epoch=done + 1, on_epoch=save_epoch)
 
 # Predicts embedding for a cited paper and for its author by relation inversion.
 # Identifies the actual author in the KG whose embedding is closest.
@@ -101,45 +93,58 @@ with torch.no_grad():
     entity_matrix = model.entity_embeddings.weight.data.cpu().numpy()
     relation_matrix = model.relation_embeddings.weight.data.cpu().numpy()
 
+# Type-partitioned exact search over the trained embeddings (papers, authors, ...)
+search = EntitySearch(entity_matrix, entities)
+
 # 1) Compute predicted embedding of the cited paper: e_paper + w_cites
-paper_vec = entity_matrix[ent2id[PAPER_URI]]
-cites_vec = relation_matrix[rel2id[CITES_URI]]
-predicted_cited_vec = paper_vec + cites_vec
+paper_id = vocab.entities.get_loc(PAPER_URI)
+cites_vec = relation_matrix[vocab.relations.get_loc(CITES_URI)]
+predicted_cited_vec = entity_matrix[paper_id] + cites_vec
 
 print("Predicted embedding for the cited paper (dimension", EMBED_DIM, "):")
 print(predicted_cited_vec)
 
-# Filter only entities that are papers
-paper_ids = [ent2id[e] for e in entities if "Paper" in e or "paper" in e]
-paper_embeddings = entity_matrix[paper_ids]
-
-# Compute distances to the predicted vector
-distances = np.linalg.norm(paper_embeddings - predicted_cited_vec, axis=1)
-
-# Find the closest
-best_id = paper_ids[np.argmin(distances)]
-closest_paper = entities[best_id]
-closest_dist = distances.min()
+# Closest papers to the predicted vector
+paper_ids, paper_dists = search.nearest(predicted_cited_vec, k=TOP_K, entity_type="Paper")
+closest_paper = entities[paper_ids[0, 0]]
+closest_dist = paper_dists[0, 0]
 
 print(f"\nClosest paper in the KG: {closest_paper}")
 print(f"Distance to the predicted vector: {closest_dist:.4f}")
+print(f"Top {TOP_K} cited-paper candidates:")
+for name, dist in zip(search.names(paper_ids[0]), paper_dists[0]):
+    print(f"  {dist:.4f}  {name}")
 
 # 2) Compute predicted author vector by inverting writtenBy: vec_cited - w_writtenBy
-writtenby_vec = relation_matrix[rel2id[WRITTENBY_URI]]
+writtenby_vec = relation_matrix[vocab.relations.get_loc(WRITTENBY_URI)]
 predicted_author_vec = predicted_cited_vec - writtenby_vec
 
-# Filter entity IDs to only those that are authors (assuming URIs contain “Author”)
-author_ids = [
-    ent2id[e] for e in entities
-    if "Author" in e or "author" in e
-]
-
-# Compute Euclidean distances and find the closest real author
-author_embeddings = entity_matrix[author_ids]
-distances = np.linalg.norm(author_embeddings - predicted_author_vec, axis=1)
-best_idx = author_ids[np.argmin(distances)]
-closest_author = entities[best_idx]
-closest_distance = distances.min()
+# Closest real author (instance#Author_ URIs only)
+author_ids, author_dists = search.nearest(predicted_author_vec, k=TOP_K, entity_type="Author")
+closest_author = entities[author_ids[0, 0]]
+closest_distance = author_dists[0, 0]
 
 print(f"\nClosest author match: {closest_author}")
 print(f"Distance to predicted author vector: {closest_distance:.4f}")
+
+# 3) Batched: the most likely cited paper for every paper at once (e_h + w_cites)
+all_papers = search.ids("Paper")
+cited_ids, cited_dists = search.translate(all_papers, cites_vec, k=1, entity_type="Paper")
+print(f"\nPredicted citations for {len(all_papers)} papers (first 5):")
+for head, tail, dist in zip(all_papers[:5], cited_ids[:5, 0], cited_dists[:5, 0]):
+    print(f"  {entities[head]} -> {entities[tail]}  ({dist:.4f})")
+
+# 4) Optional approximate index for large entity sets, checked against the exact answer
+if USE_ANN:
+    # Built once per trained model; later runs load it
+    ann_file = checkpoint.file(ANN_FILE.format("Paper", checkpoint.epochs_done()))
+    if os.path.exists(ann_file):
+        ann = IVFPQIndex.load(ann_file)
+        print(f"\nLoaded IVF-PQ index from {ann_file}")
+    else:
+        ann = IVFPQIndex.build(search.partitions["Paper"][1], ids=all_papers)
+        ann.save(ann_file)
+        print(f"\nIVF-PQ index saved to {ann_file}")
+    ann_ids, _ = ann.search(entity_matrix[all_papers] + cites_vec, k=TOP_K, refine=4)
+    exact_ids, _ = search.translate(all_papers, cites_vec, k=TOP_K, entity_type="Paper")
+    print(f"IVF-PQ recall@{TOP_K} vs exact: {recall_at_k(ann_ids, exact_ids):.3f}")
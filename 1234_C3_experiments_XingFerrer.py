@@ -1,15 +1,17 @@
+import os
+import time
+
 import pandas as pd
 import numpy as np
-from ampligraph.datasets import load_from_csv
-from ampligraph.latent_features import ScoringBasedEmbeddingModel
-from ampligraph.compat import evaluate_performance
-from ampligraph.evaluation import mrr_score, hits_at_n_score
+import checkpoints
+import grid_runner
+import kg_dataset
+import kge_eval
+import tuning
 
 # ——— Configuration ———
-TRAIN_FILE = "train.tsv"
-VALID_FILE = "valid.tsv"
-TEST_FILE = "test.tsv"
 OUTPUT_CSV = "comparison_ag2.csv"
+BREAKDOWN_CSV = "comparison_ag2_breakdown.csv"   # per relation / entity type, same configs
 
 MODELS      = ["TransE", "DistMult", "ComplEx"]
 EMBED_DIMS  = [50, 100]
@@ -17,104 +19,200 @@ NEG_SAMPLES = [5, 20]
 EPOCHS      = 200
 BATCHES     = 150  # number of batches per epoch
 
+GRID_WORKERS       = 0   # configs trained at once (0 = cores // THREADS_PER_WORKER)
+THREADS_PER_WORKER = 1   # TensorFlow / BLAS threads inside each worker
+
+EARLY_STOPPING = True    # validate every EVAL_EVERY epochs, stop after PATIENCE checks without gain
+EVAL_EVERY     = 20
+PATIENCE       = 3
+MIN_DELTA      = 1e-3    # MRR gain that counts as an improvement
+
+HALVING        = False   # successive halving across the grid instead of running every config fully
+HALVING_ETA    = 3       # keep the best 1/ETA configs per rung
+HALVING_MIN_EPOCHS = 25  # budget of the first rung
+
+EVAL_BACKEND   = "local" # filtered ranks from kge_eval; "ampligraph" to cross-check
+
+# A result row belongs to a config trained on the current dataset: "hash" is the
+# config + dataset hash of its checkpoint, so rows from an older split (or an
+# older CSV without the column) are not taken as done
+RESULT_KEYS = ["model", "dim", "negs", "hash"]
+RESULT_COLUMNS = RESULT_KEYS + ["MRR", "Hits@10", "epochs", "best_epoch", "seconds"]
+BREAKDOWN_COLUMNS = RESULT_KEYS + ["group", "key", "n", "MRR", "Hits@1", "Hits@3", "Hits@10"]
+
 # ——— Load splits ———
-X_train_raw = load_from_csv(".", TRAIN_FILE, sep="\t")
-X_valid_raw = load_from_csv(".", VALID_FILE, sep="\t")
-X_test_raw  = load_from_csv(".", TEST_FILE,  sep="\t")
-
-# —– Build vocab from train —–
-all_ents = np.concatenate([
-    X_train_raw[:, 0].astype(str),
-    X_train_raw[:, 2].astype(str)
-])
-mask = all_ents != 'nan'
-ents = np.unique(all_ents[mask])
-rels = np.unique(X_train_raw[:, 1])
-ent_to_idx = {e: i for i, e in enumerate(ents)}
-rel_to_idx = {r: i for i, r in enumerate(rels)}
-
-# —– Helper to map and filter triples —–
-def map_and_filter(X_raw, ent_to_idx, rel_to_idx):
-    mapped = []
-    for h, r, t in X_raw:
-        if h in ent_to_idx and r in rel_to_idx and t in ent_to_idx:
-            mapped.append([ent_to_idx[h], rel_to_idx[r], ent_to_idx[t]])
-    return np.array(mapped, dtype=int)
-
-X_train = map_and_filter(X_train_raw, ent_to_idx, rel_to_idx)
-X_valid = map_and_filter(X_valid_raw, ent_to_idx, rel_to_idx)
-X_test  = map_and_filter(X_test_raw,  ent_to_idx, rel_to_idx)
-
-results = []
-best_mrr   = -1.0
-best_model = None
-best_cfg   = None
-
-for name in MODELS:
-    for dim in EMBED_DIMS:
-        for neg in NEG_SAMPLES:
-            print(f"Training {name:7s} | dim={dim:<3d} | negs={neg:<2d}")
-            # Instantiate model
-            model = ScoringBasedEmbeddingModel(
-                eta=neg,
-                k=dim,
-                scoring_type=name,
-                seed=0
-            )
-            model.compile(optimizer='adam', loss='pairwise')
-
-            # Fit model
-            batch_size = max(1, X_train.shape[0] // BATCHES)
-            model.fit(
-                X_train,
-                batch_size=batch_size,
-                epochs=EPOCHS,
-                verbose=False
-            )
-
-            # Evaluate on validation
-            ranks = evaluate_performance(
-                X_valid,
-                model=model,
-                filter_triples=X_train,
-                corrupt_side='s,o',
-                batch_size=256
-            )
-            mrr  = mrr_score(ranks)
-            h10  = hits_at_n_score(ranks, 10)
-            print(f"  → MRR={mrr:.4f}, Hits@10={h10:.4f}")
-
-            results.append({
-                "model":   name,
-                "dim":     dim,
-                "negs":    neg,
-                "MRR":     mrr,
-                "Hits@10": h10,
-            })
-
-            # Update best model
-            if mrr > best_mrr:
-                best_mrr   = mrr
-                best_model = model
-                best_cfg   = {"model": name, "dim": dim, "negs": neg}
-
-# Save comparison results
-df = pd.DataFrame(results)
-df.to_csv(OUTPUT_CSV, index=False)
-print("\nValidation results saved to", OUTPUT_CSV)
-print(df.sort_values("MRR", ascending=False))
-
-# Report best on validation
-print(f"\nBest on validation: {best_cfg} with MRR={best_mrr:.4f}")
-
-# Evaluate best model on test
-ranks_test = evaluate_performance(
-    X_test,
-    model=best_model,
-    filter_triples=X_train,
-    corrupt_side='s,o',
-    batch_size=256
-)
-mrr_test    = mrr_score(ranks_test)
-hits10_test = hits_at_n_score(ranks_test, 10)
-print(f"Test       → MRR={mrr_test:.4f}, Hits@10={hits10_test:.4f}")
\ No newline at end of file
+# Integer triples from the binary dataset; ids below n_train_* form the train vocab
+def load_splits():
+    dataset = kg_dataset.load_or_build()
+    X_train = np.asarray(dataset.train, dtype=int)
+    X_valid = kg_dataset.known_to_train(dataset.valid, dataset)
+    X_test  = kg_dataset.known_to_train(dataset.test, dataset)
+    return dataset, X_train, X_valid, X_test
+
+
+def kge_config(cfg):
+    return checkpoints.kge_config(cfg["model"], cfg["dim"], cfg["negs"], BATCHES)
+
+
+def rank(model, X, X_known, dataset, breakdown=None):
+    # Filtered head and tail ranks, corrupting with every train entity; X_known
+    # (train + valid + test) is the filter, the protocol ampligraph's own ranks
+    # match exactly (a filter without X makes them count the positive twice)
+    return kge_eval.evaluate_model(X, model, X_known, dataset.n_train_entities,
+                                   dataset.n_train_relations, corrupt_side='s,o', backend=EVAL_BACKEND,
+                                   breakdown=breakdown)
+
+
+def validate(model, X_known, X_valid, dataset):
+    # Global MRR / Hits@10 plus the per-relation / per-type rows, from the same ranks
+    breakdown = kge_eval.dataset_breakdown(dataset)
+    ranks = rank(model, X_valid, X_known, dataset, breakdown)
+    return kge_eval.mrr_score(ranks), kge_eval.hits_at_n_score(ranks, 10), breakdown.rows()
+
+
+def run_config(cfg):
+    # One grid cell, run inside a pool worker. cfg may carry "max_epochs" (a
+    # halving rung); checkpoints make a later, longer rung resume this one.
+    dataset, X_train, X_valid, X_test = load_splits()
+    X_known = np.vstack([X_train, X_valid, X_test])
+    max_epochs = cfg.get("max_epochs", EPOCHS)
+    config = kge_config(cfg)
+    checkpoint = checkpoints.Checkpoint("kge", config)
+    meta = checkpoint.load_meta() or {}
+    done = meta.get("epoch", 0)
+    print(f"Training {cfg['model']:7s} | dim={cfg['dim']:<3d} | negs={cfg['negs']:<2d} | epochs={max_epochs}")
+    start = time.perf_counter()
+
+    if EARLY_STOPPING and done >= max_epochs and "best_epoch" in meta:
+        # Already trained this far: report the best validated check, not the final weights
+        mrr, h10, per_group = meta["best_score"], meta["best_h10"], meta.get("best_breakdown", [])
+        epochs, best_epoch = done, meta["best_epoch"]
+    elif not EARLY_STOPPING or done >= max_epochs:
+        # The row records the epochs the returned weights really have, which can
+        # exceed max_epochs when the checkpoint was trained further before
+        model = checkpoints.fit_kge(X_train, max_epochs, config)
+        mrr, h10, per_group = validate(model, X_known, X_valid, dataset)
+        epochs = best_epoch = model.epochs_trained
+    else:
+        last = {}
+
+        def train_to(epochs, model):
+            return checkpoints.fit_kge(X_train, epochs, config, model=model)
+
+        def evaluate(model):
+            last["mrr"], last["h10"], last["per_group"] = validate(model, X_known, X_valid, dataset)
+            return last["mrr"]
+
+        def on_best(model, epoch, score):
+            checkpoints.save_kge_best(model, config, epoch, score, best_h10=last["h10"],
+                                      best_breakdown=last["per_group"])
+
+        prior = (meta["best_score"], meta["best_epoch"]) if "best_epoch" in meta else None
+        result = tuning.early_stopping(train_to, evaluate, max_epochs, every=EVAL_EVERY,
+                                       patience=PATIENCE, min_delta=MIN_DELTA, start_epochs=done,
+                                       best=prior, on_best=on_best)
+        mrr, best_epoch, epochs = result["best_score"], result["best_epoch"], result["epochs"]
+        best_meta = checkpoint.load_meta()
+        h10, per_group = best_meta["best_h10"], best_meta.get("best_breakdown", [])
+
+    seconds = time.perf_counter() - start
+    print(f"  → {cfg['model']} dim={cfg['dim']} negs={cfg['negs']}: MRR={mrr:.4f}, Hits@10={h10:.4f}"
+          f" ({epochs} epochs, best @ {best_epoch})")
+    return {"model": cfg["model"], "dim": cfg["dim"], "negs": cfg["negs"], "hash": checkpoint.hash,
+            "MRR": mrr, "Hits@10": h10,
+            "epochs": epochs, "best_epoch": best_epoch, "seconds": round(seconds, 1),
+            "breakdown": per_group}
+
+
+def write_breakdown(row):
+    # Appends a config's per-relation / per-type rows next to its OUTPUT_CSV row
+    for group_row in row["breakdown"]:
+        grid_runner.append_result(BREAKDOWN_CSV, {**{k: row[k] for k in RESULT_KEYS}, **group_row},
+                                  BREAKDOWN_COLUMNS)
+
+
+def run_halving(grid, workers):
+    # Rungs run in the process pool; each config's row (from the last rung it
+    # reached) is written to the CSV once the halving is over. A crash loses no
+    # training: the rerun resumes every config from its checkpoint.
+    done = {grid_runner.config_key(row, RESULT_KEYS) for row in grid_runner.read_results(OUTPUT_CSV)}
+    pending = [cfg for cfg in grid if grid_runner.config_key(cfg, RESULT_KEYS) not in done]
+    rows = {}
+
+    def run_rung(configs, epochs):
+        rung = [dict(cfg, max_epochs=epochs) for cfg in configs]
+        results = []
+        for cfg, row in grid_runner.map_configs(rung, run_config, workers, THREADS_PER_WORKER):
+            # Time spent in earlier rungs counts towards the config's total
+            key = (row["model"], row["dim"], row["negs"])
+            row["seconds"] = round(row["seconds"] + rows.get(key, {}).get("seconds", 0), 1)
+            rows[key] = row
+            results.append(({k: cfg[k] for k in RESULT_KEYS}, row["MRR"]))
+        return results
+
+    tuning.successive_halving(pending, run_rung, HALVING_MIN_EPOCHS, EPOCHS, HALVING_ETA)
+    for row in rows.values():
+        grid_runner.append_result(OUTPUT_CSV, row, RESULT_COLUMNS)
+        write_breakdown(row)
+    return list(rows.values())
+
+
+def report_savings(rows, wall):
+    # Exhaustive grid estimate: every config at its measured seconds/epoch for all EPOCHS
+    if not rows:
+        return
+    epochs = sum(int(row["epochs"]) for row in rows)
+    full_epochs = EPOCHS * len(rows)
+    full_seconds = sum(row["seconds"] * EPOCHS / max(int(row["epochs"]), 1) for row in rows)
+    spent = sum(row["seconds"] for row in rows)
+    print(f"\nTrained {epochs}/{full_epochs} epochs ({epochs / full_epochs:.0%} of the exhaustive grid)")
+    print(f"CPU time {spent:.0f} s vs ~{full_seconds:.0f} s exhaustive (saved ~{full_seconds - spent:.0f} s); "
+          f"wall-clock {wall:.0f} s")
+
+
+if __name__ == "__main__":
+    # Builds the binary dataset once, before the workers read it
+    dataset, X_train, X_valid, X_test = load_splits()
+
+    grid = [{"model": name, "dim": dim, "negs": neg}
+            for name in MODELS for dim in EMBED_DIMS for neg in NEG_SAMPLES]
+    for cfg in grid:
+        cfg["hash"] = checkpoints.Checkpoint("kge", kge_config(cfg)).hash
+    start = time.perf_counter()
+    if HALVING:
+        new_rows = run_halving(grid, GRID_WORKERS or None)
+    else:
+        # Each finished config is appended to OUTPUT_CSV right away; configs already
+        # in the CSV are not run again
+        new_rows = grid_runner.run_grid(grid, run_config, OUTPUT_CSV, keys=RESULT_KEYS,
+                                        columns=RESULT_COLUMNS, workers=GRID_WORKERS or None,
+                                        threads=THREADS_PER_WORKER, on_result=write_breakdown)
+    report_savings(new_rows, time.perf_counter() - start)
+
+    # Comparison results (this run and earlier ones on the same dataset)
+    df = pd.read_csv(OUTPUT_CSV)
+    df = df[df["hash"].isin([cfg["hash"] for cfg in grid])] if "hash" in df else df.iloc[:0]
+    if df.empty:
+        raise SystemExit(f"No results for the current dataset in {OUTPUT_CSV}; every config failed")
+    print("\nValidation results saved to", OUTPUT_CSV)
+    print(df.sort_values("MRR", ascending=False))
+
+    # Report best on validation
+    best = df.loc[df["MRR"].idxmax()]
+    best_mrr = best["MRR"]
+    best_cfg = {"model": best["model"], "dim": int(best["dim"]), "negs": int(best["negs"])}
+    best_hash = best["hash"]
+    print(f"\nBest on validation: {best_cfg} with MRR={best_mrr:.4f}")
+    if os.path.exists(BREAKDOWN_CSV):
+        per_group = pd.read_csv(BREAKDOWN_CSV)
+        if "hash" in per_group:
+            per_group = per_group[per_group["hash"] == best_hash]
+            print(per_group.drop(columns=RESULT_KEYS).to_string(index=False))
+
+    # Evaluate best model on test: its best validated weights when early stopping
+    # kept them, otherwise the final checkpoint (reused, not retrained)
+    best_model = checkpoints.best_or_fit_kge(X_train, EPOCHS, kge_config(best_cfg))
+    ranks_test = rank(best_model, X_test, np.vstack([X_train, X_valid, X_test]), dataset)
+    mrr_test    = kge_eval.mrr_score(ranks_test)
+    hits10_test = kge_eval.hits_at_n_score(ranks_test, 10)
+    print(f"Test       → MRR={mrr_test:.4f}, Hits@10={hits10_test:.4f}")
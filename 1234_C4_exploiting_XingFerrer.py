@@ -1,113 +1,84 @@
 import numpy as np
-from ampligraph.datasets import load_from_csv
-from ampligraph.latent_features import ScoringBasedEmbeddingModel
-from ampligraph.compat import evaluate_performance
-from ampligraph.evaluation import mrr_score, hits_at_n_score
 from sklearn.metrics import roc_auc_score, accuracy_score
-from sklearn.linear_model import LogisticRegression
+
+import checkpoints
+import kg_dataset
+import kge_eval
+import negatives
+from calibration import RelationCalibration
+from entity_search import type_groups
+from triple_scoring import CachedScorer
 
 
 # ——— Configuration ———
-TRAIN_FILE  = "train.tsv"
-VALID_FILE  = "valid.tsv"
-TEST_FILE   = "test.tsv"
 EPOCHS      = 200
 BATCHES     = 150
 PCA_DIM     = 20
 K_MIN, K_MAX= 3, 10
 MODEL_PATH  = "complEx_best_model.pkl"
 CLUST_OUT   = "author_clusters_ag2.csv"
+EVAL_BACKEND = "local"  # filtered ranks from kge_eval; "ampligraph" to cross-check
+NEG_PER_POS  = 1        # corrupted triples per positive in the classification sets
+TYPE_CONSTRAINED = True # replace an entity only with one of the same instance type
+NEG_SEED     = 42
+SCORE_CACHE  = "score_cache_{}.npz"  # triple scores per model weights, saved in the checkpoint
 
 # ——— Load splits ———
-X_train_raw = load_from_csv(".", TRAIN_FILE, sep="\t")
-X_valid_raw = load_from_csv(".", VALID_FILE, sep="\t")
-X_test_raw  = load_from_csv(".", TEST_FILE,  sep="\t")
-
-# —– Build vocab from train —–
-all_ents = np.concatenate([
-    X_train_raw[:, 0].astype(str),
-    X_train_raw[:, 2].astype(str)
-])
-mask = all_ents != 'nan'
-ents = np.unique(all_ents[mask])
-rels = np.unique(X_train_raw[:, 1])
-
-ent_to_idx = {e: i for i, e in enumerate(ents)}
-rel_to_idx = {r: i for i, r in enumerate(rels)}
+dataset = kg_dataset.load_or_build()
 
-# —– Helper to map and filter triples —–
-def map_and_filter(X_raw):
-    mapped = []
-    for h, r, t in X_raw:
-        if h in ent_to_idx and r in rel_to_idx and t in ent_to_idx:
-            mapped.append([ent_to_idx[h], rel_to_idx[r], ent_to_idx[t]])
-    return np.array(mapped, dtype=int)
-
-X_train = map_and_filter(X_train_raw)
-X_valid = map_and_filter(X_valid_raw)
-X_test  = map_and_filter(X_test_raw)
+X_train = np.asarray(dataset.train, dtype=int)
+X_valid = kg_dataset.known_to_train(dataset.valid, dataset)
+X_test  = kg_dataset.known_to_train(dataset.test, dataset)
 
 # ——— 1) Train best KGE (ComplEx) ———
+# Same config as the C3 run, so its checkpoint is reused instead of retraining:
+# the best validated weights when C3 stopped early, else the final ones; the
+# model used is also saved to MODEL_PATH
 print("Training ComplEx | dim=100 | negs=5")
-model = ScoringBasedEmbeddingModel(eta=5, k=100, scoring_type="ComplEx", seed=0)
-model.compile(optimizer='adam', loss='pairwise')
-batch_size = max(1, X_train.shape[0] // BATCHES)
-model.fit(X_train, batch_size=batch_size, epochs=EPOCHS, verbose=False)
-
-# Evaluate on validation
-ranks = evaluate_performance(X_valid, model=model, filter_triples=X_train, corrupt_side='s,o', batch_size=256)
-mrr, h10 = mrr_score(ranks), hits_at_n_score(ranks, 10)
+config = checkpoints.kge_config("ComplEx", 100, 5, BATCHES)
+model = checkpoints.best_or_fit_kge(X_train, EPOCHS, config, export_path=MODEL_PATH)
+checkpoint = checkpoints.Checkpoint("kge", config)
+
+# Evaluate on validation; every known triple is filtered out of the corruptions
+n_ent, n_rel = dataset.n_train_entities, dataset.n_train_relations
+X_known = np.vstack([X_train, X_valid, X_test])
+ranks = kge_eval.evaluate_model(X_valid, model, X_known, n_ent, n_rel, backend=EVAL_BACKEND)
+mrr, h10 = kge_eval.mrr_score(ranks), kge_eval.hits_at_n_score(ranks, 10)
 print(f"Validation → MRR={mrr:.4f}, Hits@10={h10:.4f}")
 
 # Evaluate on test
-ranks_test = evaluate_performance(X_test, model=model, filter_triples=X_train, corrupt_side='s,o', batch_size=256)
-mrr_t, h10_t = mrr_score(ranks_test), hits_at_n_score(ranks_test, 10)
+ranks_test = kge_eval.evaluate_model(X_test, model, X_known, n_ent, n_rel, backend=EVAL_BACKEND)
+mrr_t, h10_t = kge_eval.mrr_score(ranks_test), kge_eval.hits_at_n_score(ranks_test, 10)
 print(f"Test       → MRR={mrr_t:.4f}, Hits@10={h10_t:.4f}")
 
-# Prepare classification dataset
-# Positives: test triples
-pos = X_test.copy()
-# Negatives: corrupt tail for each positive
-negs = []
-all_ents = np.unique(np.concatenate([X_train[:,0], X_train[:,2]]))
-for h, r, t in pos:
-    corrupt = t
-    while corrupt == t:
-        corrupt = np.random.choice(all_ents)
-    negs.append([h, r, corrupt])
-negs = np.array(negs)
-
-# Combine and label
-X_cls = np.vstack([pos, negs])
-y = np.hstack([np.ones(len(pos)), np.zeros(len(negs))])
-
-# Score triples using the KGE model
-# ScoringBasedEmbeddingModel.predict returns scores (higher = more plausible)
-scores_pos = model.predict(pos)
-scores_neg = model.predict(negs)
-X_scores = np.hstack([scores_pos, scores_neg]).reshape(-1,1)
-
-# Train logistic regression on validation
-# Prepare validation similarly
-pos_val = X_valid.copy()
-negs_val = []
-for h, r, t in pos_val:
-    corrupt = t
-    while corrupt == t:
-        corrupt = np.random.choice(all_ents)
-    negs_val.append([h, r, corrupt])
-negs_val = np.array(negs_val)
-X_val = np.vstack([pos_val, negs_val])
-y_val = np.hstack([np.ones(len(pos_val)), np.zeros(len(negs_val))])
-scores_val = np.hstack([model.predict(pos_val), model.predict(negs_val)]).reshape(-1,1)
-
-clf = LogisticRegression(solver='liblinear')
-clf.fit(scores_val, y_val)
-print("Trained Logistic Regression on validation scores")
+# Prepare classification datasets: positives plus NEG_PER_POS corrupted tails
+# each, drawn from the same entity type and never a known train/valid/test triple
+groups, _ = type_groups(dataset.entities[:n_ent]) if TYPE_CONSTRAINED else (None, None)
+sampler = negatives.NegativeSampler(X_known, n_ent, n_rel, groups, seed=NEG_SEED)
+X_cls, y = negatives.classification_set(sampler, X_test, NEG_PER_POS)
+X_val, y_val = negatives.classification_set(sampler, X_valid, NEG_PER_POS)
+
+# Score triples from the exported embeddings (higher = more plausible), in fixed
+# chunks; scores are cached per (h, r, t) and the cache is kept next to the
+# model checkpoint, so a rerun on the same weights does not score them again
+scorer = CachedScorer.from_ampligraph(model, n_ent, n_rel)
+weights = checkpoints.kge_weights_tag(config)
+cache_file = checkpoint.file(SCORE_CACHE.format(weights))
+if scorer.load(cache_file, tag=f"{checkpoint.hash}:{weights}"):
+    print(f"Loaded {len(scorer.keys)} cached scores from {cache_file}")
+
+# Calibrate on validation scores: a threshold and Platt scaler per relation
+scores_val = scorer.score(X_val)
+calib = RelationCalibration.fit(scores_val, X_val[:, 1], y_val, n_rel)
+print("Fitted per-relation thresholds and Platt scalers on validation scores")
 
 # Evaluate classifier on test
-y_pred_prob = clf.predict_proba(X_scores)[:,1]
-y_pred = clf.predict(X_scores)
+test_scores = scorer.score(X_cls)
+y_pred_prob = calib.predict_proba(test_scores, X_cls[:, 1])
+y_pred = calib.predict(test_scores, X_cls[:, 1])
 auc = roc_auc_score(y, y_pred_prob)
 acc = accuracy_score(y, y_pred)
-print(f"Classification AUC: {auc:.4f}, Accuracy: {acc:.4f}")
\ No newline at end of file
+print(f"Classification AUC: {auc:.4f}, Accuracy: {acc:.4f}")
+print("Score cache: {hits} hits, {misses} misses".format(**scorer.stats()))
+scorer.save(cache_file, tag=f"{checkpoint.hash}:{weights}")
+print(calib.report(test_scores, X_cls[:, 1], y, dataset.relations[:n_rel]).to_string(index=False))
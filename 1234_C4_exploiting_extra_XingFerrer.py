@@ -1,120 +1,100 @@
+import os
+
 import numpy as np
 import pandas as pd
-from ampligraph.datasets import load_from_csv
-from ampligraph.latent_features import ScoringBasedEmbeddingModel
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
-from ampligraph.evaluation import mrr_score, hits_at_n_score
-from ampligraph.compat import evaluate_performance
 
+import checkpoints
+import clustering
+import kg_dataset
+import kge_eval
+import reduction
+from entity_search import INSTANCE
 
-# ——— Configuration ———
-TRAIN_FILE = "train.tsv"
-VALID_FILE = "valid.tsv"
-TEST_FILE = "test.tsv"
 
+# ——— Configuration ———
 EPOCHS      = 200
 BATCHES     = 150  # number of batches per epoch
 
 PCA_DIM = 20
+PCA_METHOD = "randomized"   # "randomized", "incremental" (out-of-core, in row batches) or "full"
+PCA_FILE = "author_pca{}_{}_{}.npz"  # fitted projection per dim, method and model weights, saved in the checkpoint
 K_MIN, K_MAX = 3, 10
+SILHOUETTE_SAMPLE = 10_000  # points per silhouette estimate, stratified by cluster
+SWEEP_WORKERS = 0           # k values fitted at once (0 = one per core)
+SEED = 42
 OUTPUT_CSV = "author_clusters_ag2.csv"
 
-# ——— Load splits ———
-X_train_raw = load_from_csv(".", TRAIN_FILE, sep="\t")
-X_valid_raw = load_from_csv(".", VALID_FILE, sep="\t")
-X_test_raw  = load_from_csv(".", TEST_FILE,  sep="\t")
-
-# —– Build vocab from train —–
-all_ents = np.concatenate([
-    X_train_raw[:, 0].astype(str),
-    X_train_raw[:, 2].astype(str)
-])
-mask = all_ents != 'nan'
-ents = np.unique(all_ents[mask])
-rels = np.unique(X_train_raw[:, 1])
-ent_to_idx = {e: i for i, e in enumerate(ents)}
-rel_to_idx = {r: i for i, r in enumerate(rels)}
-
-# —– Helper to map and filter triples —–
-def map_and_filter(X_raw, ent_to_idx, rel_to_idx):
-    mapped = []
-    for h, r, t in X_raw:
-        if h in ent_to_idx and r in rel_to_idx and t in ent_to_idx:
-            mapped.append([ent_to_idx[h], rel_to_idx[r], ent_to_idx[t]])
-    return np.array(mapped, dtype=int)
-
-X_train = map_and_filter(X_train_raw, ent_to_idx, rel_to_idx)
-X_valid = map_and_filter(X_valid_raw, ent_to_idx, rel_to_idx)
-X_test  = map_and_filter(X_test_raw,  ent_to_idx, rel_to_idx)
-
-print(f"Training ComplEx | dim=100 | negs=5")
-# Instantiate model
-model = ScoringBasedEmbeddingModel(
-    eta=5,
-    k=100,
-    scoring_type="ComplEx",
-    seed=0
-)
-model.compile(optimizer='adam', loss='pairwise')
-
-# Fit model
-batch_size = max(1, X_train.shape[0] // BATCHES)
-model.fit(
-    X_train,
-    batch_size=batch_size,
-    epochs=EPOCHS,
-    verbose=False
-)
-
-# Evaluate on validation
-ranks = evaluate_performance(
-    X_valid,
-    model=model,
-    filter_triples=X_train,
-    corrupt_side='s,o',
-    batch_size=256
-)
-mrr  = mrr_score(ranks)
-h10  = hits_at_n_score(ranks, 10)
-print(f"  → MRR={mrr:.4f}, Hits@10={h10:.4f}")
-
-
-# 3) Extract entity embeddings (shape: [n_entities, dim])
-embeddings = model.get_embeddings()
-print(f"Fetched embeddings array of shape {embeddings.shape}")
-
-# 4) Identify author entities by prefix
-author_ids = [ent_to_idx[e] for e in ents if e.startswith("author:")]
-auth_emb = embeddings[author_ids]
-print(f"Selected {len(author_ids)} author embeddings")
-
-# 5) PCA reduction
-pca = PCA(n_components=PCA_DIM)
-reduced = pca.fit_transform(auth_emb)
-print(f"PCA retains {pca.explained_variance_ratio_.sum():.3f} variance")
-
-# 6) Determine best k via silhouette
-best_k, best_score = None, -1
-scores = {}
-for k in range(K_MIN, K_MAX + 1):
-    km = KMeans(n_clusters=k, random_state=42)
-    labels = km.fit_predict(reduced)
-    score = silhouette_score(reduced, labels)
-    scores[k] = score
-    print(f"k={k}, silhouette={score:.3f}")
-    if score > best_score:
-        best_score, best_k = score, k
-print(f"Optimal k: {best_k} (silhouette={best_score:.3f})")
-
-# 7) Final clustering and save
-# km = KMeans(n_clusters=best_k, random_state=42)
-# final_labels = km.fit_predict(reduced)
-# df_out = pd.DataFrame({
-#     'author_id': author_ids,
-#     'author_entity': [idx_to_ent[i] for i in author_ids],
-#     'cluster': final_labels
-# })
-# df_out.to_csv(OUTPUT_CSV, index=False)
-# print(f"Saved author clusters to {OUTPUT_CSV}")
+if __name__ == "__main__":
+    # Guarded: the k sweep runs in spawned workers, which re-import this script
+    # ——— Load splits ———
+    dataset = kg_dataset.load_or_build()
+
+    # Train vocabulary: the first n_train_entities ids
+    ents = np.asarray(dataset.entities[:dataset.n_train_entities], dtype=object)
+
+    X_train = np.asarray(dataset.train, dtype=int)
+    X_valid = kg_dataset.known_to_train(dataset.valid, dataset)
+    X_test  = kg_dataset.known_to_train(dataset.test, dataset)
+
+    print(f"Training ComplEx | dim=100 | negs=5")
+    # Reuses the ComplEx checkpoint written by C3 / C4 for the same config (its
+    # best validated weights when C3 stopped early)
+    config = checkpoints.kge_config("ComplEx", 100, 5, BATCHES)
+    model = checkpoints.best_or_fit_kge(X_train, EPOCHS, config)
+    checkpoint = checkpoints.Checkpoint("kge", config)
+
+    # Evaluate on validation
+    ranks = kge_eval.evaluate_model(
+        X_valid,
+        model,
+        filter_triples=np.vstack([X_train, X_valid, X_test]),
+        num_entities=dataset.n_train_entities,
+        num_relations=dataset.n_train_relations,
+        corrupt_side='s,o'
+    )
+    mrr  = kge_eval.mrr_score(ranks)
+    h10  = kge_eval.hits_at_n_score(ranks, 10)
+    print(f"  → MRR={mrr:.4f}, Hits@10={h10:.4f}")
+
+
+    # 3) Extract entity embeddings (shape: [n_entities, dim]), row i = entity id i
+    embeddings = kge_eval.KGEScorer.from_ampligraph(model, dataset.n_train_entities, dataset.n_train_relations).E
+    print(f"Fetched embeddings array of shape {embeddings.shape}")
+
+    # 4) Identify author entities by their instance URI prefix
+    author_ids = kg_dataset.ids_with_prefix(ents, INSTANCE + "Author_")
+    # Written next to the model checkpoint and memory-mapped from there on
+    auth_emb = reduction.save_matrix(checkpoint.file("author_embeddings.npy"), embeddings[author_ids])
+    print(f"Selected {len(author_ids)} author embeddings")
+
+    # 5) PCA reduction: the projection is fitted once per trained model and then
+    # reused, so later runs (and new authors) are only projected
+    projection_file = checkpoint.file(PCA_FILE.format(PCA_DIM, PCA_METHOD, checkpoints.kge_weights_tag(config)))
+    if os.path.exists(projection_file):
+        pca = reduction.Projection.load(projection_file)
+        print(f"Loaded PCA projection from {projection_file}")
+    else:
+        pca = reduction.Projection.fit(auth_emb, PCA_DIM, method=PCA_METHOD, seed=SEED)
+        pca.save(projection_file)
+    reduced = pca.transform(auth_emb)
+    print(f"PCA retains {pca.explained_variance_ratio.sum():.3f} variance")
+
+    # 6) Determine best k via silhouette: mini-batch k-means per k, in parallel, with
+    # the silhouette estimated on a cluster-stratified sample
+    sweep = clustering.sweep_k(reduced, range(K_MIN, K_MAX + 1), sample=SILHOUETTE_SAMPLE, seed=SEED,
+                               workers=SWEEP_WORKERS or None)
+    for row in sweep:
+        print(f"k={row['k']}, silhouette={row['silhouette']:.3f}")
+    best = clustering.best_k(sweep)
+    best_k, best_score = best["k"], best["silhouette"]
+    print(f"Optimal k: {best_k} (silhouette={best_score:.3f})")
+
+    # 7) Final clustering and save
+    km = clustering.fit_kmeans(reduced, best_k, SEED)
+    df_out = pd.DataFrame({
+        'author_id': author_ids,
+        'author_entity': ents[author_ids],
+        'cluster': km.labels_
+    })
+    df_out.to_csv(OUTPUT_CSV, index=False)
+    print(f"Saved author clusters to {OUTPUT_CSV}")
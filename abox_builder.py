@@ -0,0 +1,932 @@
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+# ——— Namespaces (plain strings, rdflib is only needed to build a Graph) ———
+RESEARCH = "http://research.publications.com/ontology#"
+INSTANCE = "http://research.publications.com/instance#"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+XSD_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
+XSD_DATE = "http://www.w3.org/2001/XMLSchema#date"
+
+DATA_DIR = "data/semantic_scholar/sc_data_csv"
+
+SOURCES = {
+    "papers":       "papers-processed.csv",
+    "authors":      "authors-sample.csv",
+    "keywords":     "keywords.csv",
+    "journals":     "journals.csv",
+    "conferences":  "conferences.csv",
+    "volumes":      "volume.csv",
+    "editions":     "editions.csv",
+    "universities": "universities.csv",
+    "companies":    "companies.csv",
+    # Relationships
+    "related_to":   "related-to.csv",
+    "written_by":   "written-by.csv",
+    "reviewed_by":  "reviewed-by.csv",
+    "cited_by":     "cited-by.csv",
+    "published_in": "published-in.csv",
+    "is_from":      "is_from.csv",
+    "volume_from":  "volume_from.csv",
+    "affiliations": "affiliated-to.csv",
+}
+
+
+def load_sources(data_dir=DATA_DIR):
+    frames = {}
+    try:
+        for name, filename in SOURCES.items():
+            frames[name] = pd.read_csv(os.path.join(data_dir, filename))
+    except FileNotFoundError as e:
+        print(f"Error: Could not find file - {e}")
+        raise
+    frames["authors"] = frames["authors"].fillna('')
+    return frames
+
+
+# ——— Row-wise builder (original per-row loops, kept as the reference) ———
+def add_rowwise(abox_graph, frames):
+    from rdflib import Literal, Namespace, RDF
+    from rdflib.namespace import XSD
+
+    research = Namespace(RESEARCH)
+    instance = Namespace(INSTANCE)
+
+    papers, authors, keywords = frames["papers"], frames["authors"], frames["keywords"]
+    journals, conferences = frames["journals"], frames["conferences"]
+    volumes, editions = frames["volumes"], frames["editions"]
+    universities, companies = frames["universities"], frames["companies"]
+    related_to, written_by = frames["related_to"], frames["written_by"]
+    reviewed_by, cited_by = frames["reviewed_by"], frames["cited_by"]
+    published_in, is_from = frames["published_in"], frames["is_from"]
+    volume_from, affiliations = frames["volume_from"], frames["affiliations"]
+
+    def create_uri(namespace, id_value):
+        # Replace spaces and special characters with underscores
+        safe_id = str(id_value).replace(' ', '_').replace(',', '_').replace(':', '_')
+        return namespace[safe_id]
+
+    for _, row in authors.iterrows():
+        author_uri = create_uri(instance, f"Author_{row['authorid']}")
+        abox_graph.add((author_uri, RDF.type, research.Author))
+        abox_graph.add((author_uri, research.hasName, Literal(row['name'])))
+
+        if row.get('homepage'):
+            abox_graph.add((author_uri, research.homepage, Literal(row['homepage'])))
+        if row.get('hindex'):
+            abox_graph.add((author_uri, research.hindex, Literal(int(row['hindex']), datatype=XSD.integer)))
+
+    reviewer_ids = reviewed_by['reviewerID'].unique()
+    for reviewer_id in reviewer_ids:
+        reviewer_uri = create_uri(instance, f"Reviewer_{reviewer_id}")
+        # Get author name
+        author_data = authors[authors['authorid'] == str(reviewer_id)]
+        if not author_data.empty:
+            abox_graph.add((reviewer_uri, RDF.type, research.Reviewer))
+            abox_graph.add((reviewer_uri, research.hasName, Literal(author_data.iloc[0]['name'])))
+
+    for _, row in papers.iterrows():
+        paper_uri = create_uri(instance, f"Paper_{row['corpusid']}")
+        abox_graph.add((paper_uri, RDF.type, research.Paper))
+        abox_graph.add((paper_uri, research.hasTitle, Literal(row['title'])))
+
+        abstract = f"Abstract for paper: {row['title']}"
+        abox_graph.add((paper_uri, research.hasAbstract, Literal(abstract)))
+
+        if row.get('year') and not pd.isna(row['year']):
+            abox_graph.add((paper_uri, research.hasYear, Literal(int(row['year']), datatype=XSD.integer)))
+        if row.get('DOI'):
+            abox_graph.add((paper_uri, research.doi, Literal(row['DOI'])))
+
+    for _, row in keywords.iterrows():
+        keyword_uri = create_uri(instance, f"Keyword_{row['keyword']}")
+        abox_graph.add((keyword_uri, RDF.type, research.Keyword))
+        abox_graph.add((keyword_uri, research.hasName, Literal(row['keyword'])))
+
+    for _, row in conferences.iterrows():
+        conf_uri = create_uri(instance, f"Conference_{row['conferenceID']}")
+        abox_graph.add((conf_uri, RDF.type, research.Conference))
+        abox_graph.add((conf_uri, research.hasName, Literal(row['conferenceName'])))
+        if row.get('url'):
+            abox_graph.add((conf_uri, research.url, Literal(row['url'])))
+
+    for _, row in journals.iterrows():
+        journal_uri = create_uri(instance, f"Journal_{row['venueID']}")
+        abox_graph.add((journal_uri, RDF.type, research.Journal))
+        abox_graph.add((journal_uri, research.hasName, Literal(row['journalName'])))
+        if row.get('issn'):
+            abox_graph.add((journal_uri, research.issn, Literal(row['issn'])))
+        if row.get('url'):
+            abox_graph.add((journal_uri, research.url, Literal(row['url'])))
+
+    cities_created = set()
+    for _, row in editions.iterrows():
+        edition_uri = create_uri(instance, f"Edition_{row['editionID']}")
+        abox_graph.add((edition_uri, RDF.type, research.Edition))
+        abox_graph.add((edition_uri, research.hasName, Literal(row['edition'])))
+
+        try:
+            year = int(row['edition'].split()[-1])
+            abox_graph.add((edition_uri, research.hasYear, Literal(year, datatype=XSD.integer)))
+        except:
+            pass
+
+        if row.get('startDate'):
+            abox_graph.add((edition_uri, research.hasStartDate, Literal(row['startDate'], datatype=XSD.date)))
+        if row.get('endDate'):
+            abox_graph.add((edition_uri, research.hasEndDate, Literal(row['endDate'], datatype=XSD.date)))
+
+        city_name = f"City_for_{row['edition']}"
+        city_uri = create_uri(instance, city_name)
+        if city_name not in cities_created:
+            abox_graph.add((city_uri, RDF.type, research.City))
+            abox_graph.add((city_uri, research.hasName, Literal(city_name)))
+            cities_created.add(city_name)
+        abox_graph.add((edition_uri, research.heldIn, city_uri))
+
+    for _, row in volumes.iterrows():
+        volume_uri = create_uri(instance, f"Volume_{row['volumeID']}")
+        abox_graph.add((volume_uri, RDF.type, research.Volume))
+        abox_graph.add((volume_uri, research.hasName, Literal(f"Volume {row['volume']}")))
+        if row.get('year'):
+            abox_graph.add((volume_uri, research.hasYear, Literal(int(row['year']), datatype=XSD.integer)))
+
+    proceedings_created = {}
+    for _, row in is_from.iterrows():
+        edition_id = row['editionID']
+        conf_id = row['conferenceID']
+
+        proceedings_uri = create_uri(instance, f"Proceedings_Edition_{edition_id}")
+        if edition_id not in proceedings_created:
+            abox_graph.add((proceedings_uri, RDF.type, research.Proceedings))
+            # Get edition name
+            edition_data = editions[editions['editionID'] == edition_id]
+            if not edition_data.empty:
+                proceedings_name = f"Proceedings of {edition_data.iloc[0]['edition']}"
+                abox_graph.add((proceedings_uri, research.hasName, Literal(proceedings_name)))
+            proceedings_created[edition_id] = proceedings_uri
+
+    for _, row in written_by.iterrows():
+        paper_uri = create_uri(instance, f"Paper_{row['paperID']}")
+        author_uri = create_uri(instance, f"Author_{row['authorID']}")
+
+        abox_graph.add((paper_uri, research.writtenBy, author_uri))
+
+        if row.get('is_corresponding', False):
+            abox_graph.add((paper_uri, research.correspondingAuthor, author_uri))
+
+    for _, row in related_to.iterrows():
+        paper_uri = create_uri(instance, f"Paper_{row['paperID']}")
+        keyword_uri = create_uri(instance, f"Keyword_{row['keyword']}")
+        abox_graph.add((paper_uri, research.hasKeyword, keyword_uri))
+
+    for _, row in cited_by.iterrows():
+        citing_paper = create_uri(instance, f"Paper_{row['paperID_citing']}")
+        cited_paper = create_uri(instance, f"Paper_{row['paperID_cited']}")
+        abox_graph.add((citing_paper, research.cites, cited_paper))
+
+    for _, row in is_from.iterrows():
+        conf_uri = create_uri(instance, f"Conference_{row['conferenceID']}")
+        edition_uri = create_uri(instance, f"Edition_{row['editionID']}")
+        abox_graph.add((conf_uri, research.hasEdition, edition_uri))
+
+    for _, row in volume_from.iterrows():
+        journal_id = row.get('journalID', row.get('venueID'))
+        if journal_id:
+            journal_uri = create_uri(instance, f"Journal_{journal_id}")
+            volume_uri = create_uri(instance, f"Volume_{row['volumeID']}")
+            abox_graph.add((journal_uri, research.hasVolume, volume_uri))
+
+    for _, row in published_in.iterrows():
+        paper_uri = create_uri(instance, f"Paper_{row['paperID']}")
+        venue_id = row['venueID']
+
+        if venue_id in journals['venueID'].values:
+            journal_volumes = volume_from[volume_from.get('journalID', volume_from.get('venueID')) == venue_id]
+            if not journal_volumes.empty:
+                volume_uri = create_uri(instance, f"Volume_{journal_volumes.iloc[0]['volumeID']}")
+                abox_graph.add((paper_uri, research.publishedInJournal, volume_uri))
+        else:
+            for edition_id, proceedings_uri in proceedings_created.items():
+                abox_graph.add((paper_uri, research.publishedInProceedings, proceedings_uri))
+                abox_graph.add((proceedings_uri, research.includesPaper, paper_uri))
+                break
+
+    for _, row in reviewed_by.iterrows():
+        review_uri = create_uri(instance, f"Review_{row['paperID']}_{row['reviewerID']}")
+        paper_uri = create_uri(instance, f"Paper_{row['paperID']}")
+        reviewer_uri = create_uri(instance, f"Reviewer_{row['reviewerID']}")
+
+        abox_graph.add((review_uri, RDF.type, research.Review))
+        abox_graph.add((review_uri, research.reviewOf, paper_uri))
+        abox_graph.add((review_uri, research.writtenByReviewer, reviewer_uri))
+
+        if row.get('review'):
+            abox_graph.add((review_uri, research.reviewContent, Literal(row['review'])))
+        if row.get('grade'):
+            abox_graph.add((review_uri, research.grade, Literal(int(row['grade']), datatype=XSD.integer)))
+
+        abox_graph.add((paper_uri, research.assignedTo, reviewer_uri))
+
+    # Affiliations
+    for _, row in affiliations.iterrows():
+        author_uri = create_uri(instance, f"Author_{row['authorID']}")
+        affiliation_id = row['affiliationID']
+
+        # Check if it's a university
+        if affiliation_id in universities['affiliationID'].values:
+            uni_data = universities[universities['affiliationID'] == affiliation_id].iloc[0]
+            uni_uri = create_uri(instance, f"University_{affiliation_id}")
+            abox_graph.add((uni_uri, RDF.type, research.University))
+            abox_graph.add((uni_uri, research.hasName, Literal(uni_data['affiliation'])))
+            abox_graph.add((author_uri, research.affiliatedTo, uni_uri))
+
+        # Check if it's a company
+        elif affiliation_id in companies['affiliationID'].values:
+            comp_data = companies[companies['affiliationID'] == affiliation_id].iloc[0]
+            comp_uri = create_uri(instance, f"Company_{affiliation_id}")
+            abox_graph.add((comp_uri, RDF.type, research.Company))
+            abox_graph.add((comp_uri, research.hasName, Literal(comp_data['affiliation'])))
+            abox_graph.add((author_uri, research.affiliatedTo, comp_uri))
+
+    return abox_graph
+
+
+# ——— Columnar builder ———
+# A section maps one or more CSVs to a list of Blocks. Every Block holds one
+# predicate and whole columns of subjects/objects, so URIs and literals are
+# built with pandas string ops instead of one create_uri call per row.
+# kind is "iri" or "literal"; datatype=None means "as rdflib's Literal(value)".
+Block = namedtuple("Block", ["subjects", "predicate", "objects", "kind", "datatype"])
+
+
+def uris(prefix, values):
+    # Vectorized create_uri(INSTANCE, f"{prefix}{value}")
+    safe = (pd.Series(values, dtype=object).astype(str)
+            .str.replace(' ', '_', regex=False)
+            .str.replace(',', '_', regex=False)
+            .str.replace(':', '_', regex=False))
+    return (INSTANCE + prefix) + safe.reset_index(drop=True)
+
+
+def truthy(values):
+    # Same test as `if row.get(col):` (NaN is truthy, '' and 0 are not)
+    return pd.Series(values).astype(bool).to_numpy()
+
+
+def iri(subjects, predicate, objects):
+    subjects = list(subjects)
+    if isinstance(objects, str):
+        objects = [objects] * len(subjects)
+    return Block(subjects, predicate, list(objects), "iri", None)
+
+
+def literal(subjects, predicate, values, datatype=None):
+    return Block(list(subjects), predicate, pd.Series(values).tolist(), "literal", datatype)
+
+
+def _journal_column(volume_from):
+    if 'journalID' in volume_from:
+        return 'journalID'
+    return 'venueID' if 'venueID' in volume_from else None
+
+
+# ——— Keyed lookups, built once per source table ———
+# Keys map to the first matching row, like the `frame[frame[key] == x].iloc[0]`
+# scans they replace. NaN keys never matched those scans, so they are dropped.
+Lookup = namedtuple("Lookup", ["keys", "values"])
+
+
+def first_lookup(frame, key, value):
+    firsts = frame[frame[key].notna()].drop_duplicates(key)
+    return Lookup(pd.Index(firsts[key]), firsts[value].to_numpy(dtype=object))
+
+
+def resolve(lookup, keys):
+    # Vectorized hash join: (found mask, values of the found keys)
+    positions = lookup.keys.get_indexer(pd.Index(pd.Series(keys, dtype=object)))
+    found = positions >= 0
+    return found, lookup.values[positions[found]]
+
+
+def build_indexes(frames):
+    volume_from, is_from = frames["volume_from"], frames["is_from"]
+    column = _journal_column(volume_from)
+    return {
+        # Papers outside journals all go to the first proceedings created from is_from
+        "first_proceedings": (uris("Proceedings_Edition_", is_from['editionID'].iloc[:1])[0]
+                              if len(is_from) else None),
+        "author_name":     first_lookup(frames["authors"], 'authorid', 'name'),
+        "edition_name":    first_lookup(frames["editions"], 'editionID', 'edition'),
+        "journal":         first_lookup(frames["journals"], 'venueID', 'venueID'),
+        "journal_volume":  first_lookup(volume_from, column, 'volumeID') if column else None,
+        "university_name": first_lookup(frames["universities"], 'affiliationID', 'affiliation'),
+        "company_name":    first_lookup(frames["companies"], 'affiliationID', 'affiliation'),
+    }
+
+
+def authors_section(frames, indexes):
+    authors = frames["authors"]
+    uri = uris("Author_", authors['authorid'])
+    blocks = [
+        iri(uri, RDF_TYPE, RESEARCH + "Author"),
+        literal(uri, RESEARCH + "hasName", authors['name']),
+    ]
+    if 'homepage' in authors:
+        mask = truthy(authors['homepage'])
+        blocks.append(literal(uri[mask], RESEARCH + "homepage", authors['homepage'][mask]))
+    if 'hindex' in authors:
+        mask = truthy(authors['hindex'])
+        blocks.append(literal(uri[mask], RESEARCH + "hindex",
+                              authors['hindex'][mask].astype('int64'), XSD_INTEGER))
+    return blocks
+
+
+def reviewers_section(frames, indexes):
+    reviewer_ids = pd.Series(frames["reviewed_by"]['reviewerID'].unique())
+    # Author ids are compared as strings, as in the original lookup
+    found, names = resolve(indexes["author_name"], reviewer_ids.astype(str))
+    uri = uris("Reviewer_", reviewer_ids)[found]
+    return [
+        iri(uri, RDF_TYPE, RESEARCH + "Reviewer"),
+        literal(uri, RESEARCH + "hasName", names),
+    ]
+
+
+def papers_section(frames, indexes):
+    papers = frames["papers"]
+    uri = uris("Paper_", papers['corpusid'])
+    blocks = [
+        iri(uri, RDF_TYPE, RESEARCH + "Paper"),
+        literal(uri, RESEARCH + "hasTitle", papers['title']),
+        literal(uri, RESEARCH + "hasAbstract", "Abstract for paper: " + papers['title'].astype(str)),
+    ]
+    if 'year' in papers:
+        mask = truthy(papers['year']) & papers['year'].notna().to_numpy()
+        blocks.append(literal(uri[mask], RESEARCH + "hasYear",
+                              papers['year'][mask].astype('int64'), XSD_INTEGER))
+    if 'DOI' in papers:
+        mask = truthy(papers['DOI'])
+        blocks.append(literal(uri[mask], RESEARCH + "doi", papers['DOI'][mask]))
+    return blocks
+
+
+def keywords_section(frames, indexes):
+    keywords = frames["keywords"]
+    uri = uris("Keyword_", keywords['keyword'])
+    return [
+        iri(uri, RDF_TYPE, RESEARCH + "Keyword"),
+        literal(uri, RESEARCH + "hasName", keywords['keyword']),
+    ]
+
+
+def conferences_section(frames, indexes):
+    conferences = frames["conferences"]
+    uri = uris("Conference_", conferences['conferenceID'])
+    blocks = [
+        iri(uri, RDF_TYPE, RESEARCH + "Conference"),
+        literal(uri, RESEARCH + "hasName", conferences['conferenceName']),
+    ]
+    if 'url' in conferences:
+        mask = truthy(conferences['url'])
+        blocks.append(literal(uri[mask], RESEARCH + "url", conferences['url'][mask]))
+    return blocks
+
+
+def journals_section(frames, indexes):
+    journals = frames["journals"]
+    uri = uris("Journal_", journals['venueID'])
+    blocks = [
+        iri(uri, RDF_TYPE, RESEARCH + "Journal"),
+        literal(uri, RESEARCH + "hasName", journals['journalName']),
+    ]
+    for column in ('issn', 'url'):
+        if column in journals:
+            mask = truthy(journals[column])
+            blocks.append(literal(uri[mask], RESEARCH + column, journals[column][mask]))
+    return blocks
+
+
+def editions_section(frames, indexes):
+    editions = frames["editions"]
+    uri = uris("Edition_", editions['editionID'])
+    blocks = [
+        iri(uri, RDF_TYPE, RESEARCH + "Edition"),
+        literal(uri, RESEARCH + "hasName", editions['edition']),
+    ]
+
+    # Year = last token of a textual edition name ("ICSE 2019"); anything else is skipped
+    is_text = editions['edition'].map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    last_token = editions['edition'][is_text].astype(str).str.split().str[-1]
+    is_year = last_token.str.fullmatch(r'[+-]?\d+', na=False).to_numpy(dtype=bool)
+    blocks.append(literal(uri[is_text][is_year], RESEARCH + "hasYear",
+                          last_token[is_year].map(int), XSD_INTEGER))
+
+    for column, prop in (('startDate', "hasStartDate"), ('endDate', "hasEndDate")):
+        if column in editions:
+            mask = truthy(editions[column])
+            blocks.append(literal(uri[mask], RESEARCH + prop, editions[column][mask], XSD_DATE))
+
+    city_names = "City_for_" + editions['edition'].astype(str)
+    city_uri = uris("City_for_", editions['edition'])
+    first = ~city_names.duplicated().to_numpy()
+    blocks += [
+        iri(city_uri[first], RDF_TYPE, RESEARCH + "City"),
+        literal(city_uri[first], RESEARCH + "hasName", city_names[first]),
+        iri(uri, RESEARCH + "heldIn", city_uri),
+    ]
+    return blocks
+
+
+def volumes_section(frames, indexes):
+    volumes = frames["volumes"]
+    uri = uris("Volume_", volumes['volumeID'])
+    blocks = [
+        iri(uri, RDF_TYPE, RESEARCH + "Volume"),
+        literal(uri, RESEARCH + "hasName", "Volume " + volumes['volume'].astype(str)),
+    ]
+    if 'year' in volumes:
+        mask = truthy(volumes['year'])
+        blocks.append(literal(uri[mask], RESEARCH + "hasYear",
+                              volumes['year'][mask].astype('int64'), XSD_INTEGER))
+    return blocks
+
+
+def proceedings_section(frames, indexes):
+    edition_ids = pd.Series(frames["is_from"]['editionID'].unique())
+    uri = uris("Proceedings_Edition_", edition_ids)
+    found, names = resolve(indexes["edition_name"], edition_ids)
+    return [
+        iri(uri, RDF_TYPE, RESEARCH + "Proceedings"),
+        literal(uri[found], RESEARCH + "hasName", "Proceedings of " + pd.Series(names, dtype=object).astype(str)),
+    ]
+
+
+def written_by_section(frames, indexes):
+    written_by = frames["written_by"]
+    paper_uri = uris("Paper_", written_by['paperID'])
+    author_uri = uris("Author_", written_by['authorID'])
+    blocks = [iri(paper_uri, RESEARCH + "writtenBy", author_uri)]
+    if 'is_corresponding' in written_by:
+        mask = truthy(written_by['is_corresponding'])
+        blocks.append(iri(paper_uri[mask], RESEARCH + "correspondingAuthor", author_uri[mask]))
+    return blocks
+
+
+def related_to_section(frames, indexes):
+    related_to = frames["related_to"]
+    return [iri(uris("Paper_", related_to['paperID']), RESEARCH + "hasKeyword",
+                uris("Keyword_", related_to['keyword']))]
+
+
+def cited_by_section(frames, indexes):
+    cited_by = frames["cited_by"]
+    return [iri(uris("Paper_", cited_by['paperID_citing']), RESEARCH + "cites",
+                uris("Paper_", cited_by['paperID_cited']))]
+
+
+def is_from_section(frames, indexes):
+    is_from = frames["is_from"]
+    return [iri(uris("Conference_", is_from['conferenceID']), RESEARCH + "hasEdition",
+                uris("Edition_", is_from['editionID']))]
+
+
+def volume_from_section(frames, indexes):
+    volume_from = frames["volume_from"]
+    column = _journal_column(volume_from)
+    if column is None:
+        return []
+    mask = truthy(volume_from[column])
+    return [iri(uris("Journal_", volume_from[column][mask]), RESEARCH + "hasVolume",
+                uris("Volume_", volume_from['volumeID'][mask]))]
+
+
+def published_in_section(frames, indexes):
+    published_in = frames["published_in"]
+    paper_uri = uris("Paper_", published_in['paperID'])
+    in_journal, _ = resolve(indexes["journal"], published_in['venueID'])
+
+    blocks = []
+    if indexes["journal_volume"] is not None:
+        # Each journal paper goes to the first volume listed for its journal
+        has_volume, volume_ids = resolve(indexes["journal_volume"], published_in['venueID'][in_journal])
+        blocks.append(iri(paper_uri[in_journal][has_volume], RESEARCH + "publishedInJournal",
+                          uris("Volume_", volume_ids)))
+
+    first_proceedings = indexes["first_proceedings"]
+    if first_proceedings is not None:
+        others = paper_uri[~in_journal]
+        blocks += [
+            iri(others, RESEARCH + "publishedInProceedings", first_proceedings),
+            iri([first_proceedings] * len(others), RESEARCH + "includesPaper", others),
+        ]
+    return blocks
+
+
+def reviewed_by_section(frames, indexes):
+    reviewed_by = frames["reviewed_by"]
+    review_uri = uris("Review_", reviewed_by['paperID'].astype(str) + "_" + reviewed_by['reviewerID'].astype(str))
+    paper_uri = uris("Paper_", reviewed_by['paperID'])
+    reviewer_uri = uris("Reviewer_", reviewed_by['reviewerID'])
+    blocks = [
+        iri(review_uri, RDF_TYPE, RESEARCH + "Review"),
+        iri(review_uri, RESEARCH + "reviewOf", paper_uri),
+        iri(review_uri, RESEARCH + "writtenByReviewer", reviewer_uri),
+        iri(paper_uri, RESEARCH + "assignedTo", reviewer_uri),
+    ]
+    if 'review' in reviewed_by:
+        mask = truthy(reviewed_by['review'])
+        blocks.append(literal(review_uri[mask], RESEARCH + "reviewContent", reviewed_by['review'][mask]))
+    if 'grade' in reviewed_by:
+        mask = truthy(reviewed_by['grade'])
+        blocks.append(literal(review_uri[mask], RESEARCH + "grade",
+                              reviewed_by['grade'][mask].astype('int64'), XSD_INTEGER))
+    return blocks
+
+
+def affiliations_section(frames, indexes):
+    affiliations = frames["affiliations"]
+    author_uri = uris("Author_", affiliations['authorID'])
+    affiliation_ids = affiliations['affiliationID']
+
+    is_uni, uni_names = resolve(indexes["university_name"], affiliation_ids)
+    is_comp, comp_names = resolve(indexes["company_name"], affiliation_ids)
+    # A university match wins over a company with the same id
+    comp_names = comp_names[~is_uni[is_comp]]
+    is_comp &= ~is_uni
+
+    blocks = []
+    for mask, names, prefix, cls in ((is_uni, uni_names, "University_", "University"),
+                                     (is_comp, comp_names, "Company_", "Company")):
+        org_uri = uris(prefix, affiliation_ids[mask])
+        blocks += [
+            iri(org_uri, RDF_TYPE, RESEARCH + cls),
+            literal(org_uri, RESEARCH + "hasName", names),
+            iri(author_uri[mask], RESEARCH + "affiliatedTo", org_uri),
+        ]
+    return blocks
+
+
+SECTIONS = {
+    "authors":      authors_section,
+    "reviewers":    reviewers_section,
+    "papers":       papers_section,
+    "keywords":     keywords_section,
+    "conferences":  conferences_section,
+    "journals":     journals_section,
+    "editions":     editions_section,
+    "volumes":      volumes_section,
+    "proceedings":  proceedings_section,
+    "written_by":   written_by_section,
+    "related_to":   related_to_section,
+    "cited_by":     cited_by_section,
+    "is_from":      is_from_section,
+    "volume_from":  volume_from_section,
+    "published_in": published_in_section,
+    "reviewed_by":  reviewed_by_section,
+    "affiliations": affiliations_section,
+}
+
+
+def build_blocks(frames, sections=None, indexes=None):
+    indexes = indexes or build_indexes(frames)
+    for name in sections or SECTIONS:
+        yield from SECTIONS[name](frames, indexes)
+
+
+def add_columnar(abox_graph, frames, sections=None, indexes=None):
+    from rdflib import Literal, URIRef
+
+    for block in build_blocks(frames, sections, indexes):
+        predicate = URIRef(block.predicate)
+        if block.kind == "iri":
+            objects = map(URIRef, block.objects)
+        elif block.datatype is None:
+            objects = map(Literal, block.objects)
+        else:
+            datatype = URIRef(block.datatype)
+            objects = (Literal(o, datatype=datatype) for o in block.objects)
+        abox_graph.addN((URIRef(s), predicate, o, abox_graph)
+                        for s, o in zip(block.subjects, objects))
+    return abox_graph
+
+
+# ——— Streaming N-Triples export ———
+# Every section only reads its own CSV, in chunks, plus the keyed lookups, so
+# memory is bounded by the chunk size and the lookup columns instead of by the
+# whole ABox. Triples repeated across chunks (an organisation shared by two
+# affiliation chunks, say) are written again; N-Triples loaders treat the file
+# as a set, and each chunk is de-duplicated before it is written.
+XSD_BOOLEAN = "http://www.w3.org/2001/XMLSchema#boolean"
+XSD_DOUBLE = "http://www.w3.org/2001/XMLSchema#double"
+TBOX_NT = "research_tbox.nt"
+
+SECTION_SOURCES = {
+    "authors":      "authors",
+    "reviewers":    "reviewed_by",
+    "papers":       "papers",
+    "keywords":     "keywords",
+    "conferences":  "conferences",
+    "journals":     "journals",
+    "editions":     "editions",
+    "volumes":      "volumes",
+    "proceedings":  "is_from",
+    "written_by":   "written_by",
+    "related_to":   "related_to",
+    "cited_by":     "cited_by",
+    "is_from":      "is_from",
+    "volume_from":  "volume_from",
+    "published_in": "published_in",
+    "reviewed_by":  "reviewed_by",
+    "affiliations": "affiliations",
+}
+
+# Only the columns build_indexes needs (is_from: just its first row)
+LOOKUP_COLUMNS = {
+    "authors":      ['authorid', 'name'],
+    "editions":     ['editionID', 'edition'],
+    "journals":     ['venueID'],
+    "volume_from":  ['journalID', 'venueID', 'volumeID'],
+    "universities": ['affiliationID', 'affiliation'],
+    "companies":    ['affiliationID', 'affiliation'],
+    "is_from":      ['editionID'],
+}
+
+
+def load_lookups(data_dir=DATA_DIR):
+    frames = {}
+    for name, columns in LOOKUP_COLUMNS.items():
+        frames[name] = pd.read_csv(os.path.join(data_dir, SOURCES[name]),
+                                   usecols=lambda c, columns=columns: c in columns,
+                                   nrows=1 if name == "is_from" else None)
+    frames["authors"] = frames["authors"].fillna('')
+    return frames
+
+
+def iter_section_chunks(name, data_dir=DATA_DIR, chunksize=100_000):
+    source = SECTION_SOURCES[name]
+    for chunk in pd.read_csv(os.path.join(data_dir, SOURCES[source]), chunksize=chunksize):
+        if source == "authors":
+            chunk = chunk.fillna('')
+        yield {source: chunk}
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def nt_literal(value, datatype=None):
+    # Same lexical forms rdflib gives Literal(value) / Literal(value, datatype=...)
+    if datatype is not None:
+        return f'"{_escape(str(value))}"^^<{datatype}>'
+    if isinstance(value, str):
+        return f'"{_escape(value)}"'
+    if isinstance(value, bool):
+        return f'"{str(value).lower()}"^^<{XSD_BOOLEAN}>'
+    if isinstance(value, int):
+        return f'"{value}"^^<{XSD_INTEGER}>'
+    if isinstance(value, float):
+        if value != value:
+            lexical = "NaN"
+        elif value in (float('inf'), float('-inf')):
+            lexical = "INF" if value > 0 else "-INF"
+        else:
+            lexical = str(value)
+        return f'"{lexical}"^^<{XSD_DOUBLE}>'
+    return f'"{_escape(str(value))}"'
+
+
+def block_lines(block):
+    if block.kind == "iri":
+        objects = (f"<{o}>" for o in block.objects)
+    else:
+        objects = (nt_literal(o, block.datatype) for o in block.objects)
+    predicate = block.predicate
+    return [f"<{s}> <{predicate}> {o} .\n" for s, o in zip(block.subjects, objects)]
+
+
+def open_output(path, compress=False):
+    if compress or path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def open_input(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def write_section(out, name, indexes, data_dir=DATA_DIR, chunksize=100_000):
+    written = 0
+    for frames in iter_section_chunks(name, data_dir, chunksize):
+        lines = dict.fromkeys(line for block in SECTIONS[name](frames, indexes)
+                              for line in block_lines(block))
+        out.writelines(lines)
+        written += len(lines)
+    return written
+
+
+def copy_tbox(out, tbox_path=TBOX_NT):
+    written = 0
+    with open_input(tbox_path) as tbox:
+        for line in tbox:
+            if line.strip():
+                out.write(line)
+                written += 1
+    return written
+
+
+def stream_ntriples(path, data_dir=DATA_DIR, tbox_path=TBOX_NT, sections=None,
+                    chunksize=100_000, compress=False):
+    indexes = build_indexes(load_lookups(data_dir))
+    written = 0
+    with open_output(path, compress) as out:
+        if tbox_path:
+            written += copy_tbox(out, tbox_path)
+        for name in sections or SECTIONS:
+            written += write_section(out, name, indexes, data_dir, chunksize)
+    return written
+
+
+# ——— Parallel export ———
+# The parent reads each section's CSV in row ranges and hands them to a process
+# pool; workers return the N-Triples text of their range. Results are written
+# in submission order, so the output is the same for any number of workers.
+_worker_indexes = None
+
+
+def _init_worker(indexes):
+    global _worker_indexes
+    _worker_indexes = indexes
+
+
+def _section_chunk(name, frames):
+    lines = dict.fromkeys(line for block in SECTIONS[name](frames, _worker_indexes)
+                          for line in block_lines(block))
+    return len(lines), "".join(lines)
+
+
+def _parallel_chunks(sections, data_dir, chunksize, workers):
+    # (section, triple count, N-Triples text) per chunk, in section and row order
+    indexes = build_indexes(load_lookups(data_dir))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(indexes,)) as pool:
+        # Keep a bounded window of chunks in flight so memory does not grow with the corpus
+        pending = deque()
+        for name in sections:
+            for frames in iter_section_chunks(name, data_dir, chunksize):
+                pending.append((name, pool.submit(_section_chunk, name, frames)))
+                if len(pending) >= 2 * workers:
+                    done, future = pending.popleft()
+                    yield (done, *future.result())
+        while pending:
+            done, future = pending.popleft()
+            yield (done, *future.result())
+
+
+def parallel_ntriples(path, data_dir=DATA_DIR, tbox_path=TBOX_NT, sections=None,
+                      chunksize=100_000, compress=False, workers=None):
+    written = 0
+    with open_output(path, compress) as out:
+        if tbox_path:
+            written += copy_tbox(out, tbox_path)
+        for _, count, text in _parallel_chunks(sections or SECTIONS, data_dir, chunksize,
+                                               workers or os.cpu_count()):
+            out.write(text)
+            written += count
+    return written
+
+
+def validate_ntriples(path, data_dir=DATA_DIR, tbox_path="research_tbox.ttl"):
+    # Parse the streamed file back and compare it with the in-memory build
+    from rdflib import Graph
+
+    streamed = Graph()
+    with open_input(path) as source:
+        streamed.parse(source, format="nt")
+    expected = Graph()
+    if tbox_path:
+        expected.parse(tbox_path, format="turtle")
+    add_columnar(expected, load_sources(data_dir))
+    return len(streamed), set(streamed) == set(expected)
+
+
+# ——— Incremental rebuild ———
+# Each section's triples are cached as N-Triples under CACHE_DIR together with a
+# digest of the CSVs it reads (and of this module). The manifest also records
+# every input file's size, mtime and sha256, so a file is only re-hashed when
+# its size or mtime changed. A rebuild only re-derives
+# the sections whose digest changed (in a process pool when workers != 1),
+# then splices TBox + all section files.
+CACHE_DIR = ".abox_cache"
+MANIFEST = "manifest.json"
+FILES_KEY = "_files"       # manifest entry with the per-file size / mtime / digest
+
+SECTION_INPUTS = {
+    "authors":      ["authors"],
+    "reviewers":    ["reviewed_by", "authors"],
+    "papers":       ["papers"],
+    "keywords":     ["keywords"],
+    "conferences":  ["conferences"],
+    "journals":     ["journals"],
+    "editions":     ["editions"],
+    "volumes":      ["volumes"],
+    "proceedings":  ["is_from", "editions"],
+    "written_by":   ["written_by"],
+    "related_to":   ["related_to"],
+    "cited_by":     ["cited_by"],
+    "is_from":      ["is_from"],
+    "volume_from":  ["volume_from"],
+    "published_in": ["published_in", "journals", "volume_from", "is_from"],
+    "reviewed_by":  ["reviewed_by"],
+    "affiliations": ["affiliations", "universities", "companies"],
+}
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cached_digest(path, files):
+    # files: {abspath: {"size", "mtime_ns", "sha256"}}, updated in place
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    entry = files.get(path)
+    if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+        entry = files[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_digest(path)}
+    return entry["sha256"]
+
+
+def section_digests(data_dir=DATA_DIR, files=None):
+    files = {} if files is None else files
+    code = cached_digest(__file__, files)
+    sources = {name: cached_digest(os.path.join(data_dir, SOURCES[name]), files) for name in SOURCES}
+    return {
+        section: hashlib.sha256(":".join([code] + [sources[n] for n in inputs]).encode()).hexdigest()
+        for section, inputs in SECTION_INPUTS.items()
+    }
+
+
+def _write_sections(names, data_dir, cache_dir, chunksize, workers):
+    # Writes each section's cache file; yields a section's name once it is complete
+    if workers == 1:
+        indexes = build_indexes(load_lookups(data_dir))
+        for name in names:
+            with open_output(os.path.join(cache_dir, f"{name}.nt.tmp")) as out:
+                write_section(out, name, indexes, data_dir, chunksize)
+            yield name
+        return
+    chunks = _parallel_chunks(names, data_dir, chunksize, workers or os.cpu_count())
+    chunk = next(chunks, None)
+    for name in names:
+        with open_output(os.path.join(cache_dir, f"{name}.nt.tmp")) as out:
+            while chunk is not None and chunk[0] == name:
+                out.write(chunk[2])
+                chunk = next(chunks, None)
+        yield name
+
+
+def rebuild_incremental(path, data_dir=DATA_DIR, cache_dir=CACHE_DIR, tbox_path=TBOX_NT,
+                        chunksize=100_000, compress=False, workers=1):
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    files = manifest.setdefault(FILES_KEY, {})
+    digests = section_digests(data_dir, files)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    stale = [name for name in SECTIONS
+             if manifest.get(name) != digests[name]
+             or not os.path.exists(os.path.join(cache_dir, f"{name}.nt"))]
+
+    if stale:
+        for name in _write_sections(stale, data_dir, cache_dir, chunksize, workers):
+            section_path = os.path.join(cache_dir, f"{name}.nt")
+            os.replace(section_path + ".tmp", section_path)
+            manifest[name] = digests[name]
+            # Save after every section so an interrupted rebuild keeps its progress
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+
+    with open_output(path, compress) as out:
+        if tbox_path:
+            copy_tbox(out, tbox_path)
+        for name in SECTIONS:
+            with open_input(os.path.join(cache_dir, f"{name}.nt")) as section:
+                shutil.copyfileobj(section, out)
+    return stale
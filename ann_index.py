@@ -0,0 +1,169 @@
+import numpy as np
+
+# ——— Approximate nearest-neighbour index: IVF + product quantization ———
+# Coarse k-means splits the vectors into nlist inverted lists. Inside a list
+# every vector is stored as the PQ code of its residual (vector - centroid):
+# m sub-vectors, each replaced by the id of its nearest of ks sub-centroids
+# (one byte). A query only visits its nprobe closest lists and scores their
+# codes with per-list lookup tables (asymmetric distance). With refine > 0 the
+# best refine * k candidates are re-ranked on the stored full vectors. Queries
+# are searched in batches: the lookup tables of a whole batch are one array
+# operation and the candidate distances one gather per sub-quantizer.
+
+TABLE_ELEMENTS = 1 << 20   # lookup-table entries per query batch (4 MB of float32)
+
+
+def _sq_dists(X, C):
+    return np.einsum("ij,ij->i", X, X)[:, None] - 2 * (X @ C.T) + np.einsum("ij,ij->i", C, C)[None, :]
+
+
+def assign(X, centroids, chunk=65_536):
+    labels = np.empty(len(X), dtype=np.int64)
+    for start in range(0, len(X), chunk):
+        labels[start:start + chunk] = _sq_dists(X[start:start + chunk], centroids).argmin(axis=1)
+    return labels
+
+
+def kmeans(X, k, iters=20, sample=100_000, seed=0):
+    # Lloyd's k-means on (a sample of) X; empty clusters are re-seeded from random points
+    rng = np.random.default_rng(seed)
+    if sample and len(X) > sample:
+        X = X[rng.choice(len(X), sample, replace=False)]
+    centroids = X[rng.choice(len(X), k, replace=False)].copy()
+    for _ in range(iters):
+        labels = assign(X, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=X[:, d], minlength=k) for d in range(X.shape[1])], axis=1)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        centroids[empty] = X[rng.choice(len(X), int(empty.sum()))]
+    return centroids
+
+
+class IVFPQIndex:
+    def __init__(self, centroids, codebooks, codes, ids, offsets, vectors=None):
+        self.centroids = centroids    # (nlist, dim)
+        self.codebooks = codebooks    # (m, ks, sub)
+        self.codes = codes            # (n, m) uint8, grouped by list
+        self.ids = ids                # (n,) entity id of every row
+        self.offsets = offsets        # (nlist + 1,) row range of every list
+        self.vectors = vectors        # (n, dim) float32 for re-ranking, or None
+
+    @property
+    def dim(self):
+        return self.centroids.shape[1]
+
+    def _split(self, X):
+        # (n, dim) -> (n, m, sub), zero-padding dim up to m * sub
+        m, _, sub = self.codebooks.shape
+        padded = np.zeros((len(X), m * sub), dtype=np.float32)
+        padded[:, :X.shape[1]] = X
+        return padded.reshape(len(X), m, sub)
+
+    @classmethod
+    def build(cls, matrix, ids=None, nlist=None, m=None, ks=256, iters=10, seed=0, keep_vectors=True):
+        # Quantizers are trained on samples (64 points per centroid), then every vector is encoded
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        n, dim = matrix.shape
+        ids = np.arange(n) if ids is None else np.asarray(ids)
+        nlist = nlist or max(1, min(n, int(4 * np.sqrt(n))))
+        m = m or max(1, dim // 5)
+        ks = min(ks, 256, n)
+        sub = -(-dim // m)
+
+        centroids = kmeans(matrix, nlist, iters, sample=64 * nlist, seed=seed)
+        lists = assign(matrix, centroids)
+        order = np.argsort(lists, kind="stable")
+        offsets = np.searchsorted(lists[order], np.arange(nlist + 1))
+
+        index = cls(centroids, np.zeros((m, ks, sub), dtype=np.float32), None, ids[order], offsets,
+                    matrix[order] if keep_vectors else None)
+        residuals = index._split(matrix[order] - centroids[lists[order]])
+        codes = np.empty((n, m), dtype=np.uint8)
+        for j in range(m):
+            index.codebooks[j] = kmeans(residuals[:, j], ks, iters, sample=64 * ks, seed=seed + j + 1)
+            codes[:, j] = assign(residuals[:, j], index.codebooks[j])
+        index.codes = codes
+        return index
+
+    def search(self, queries, k=10, nprobe=8, refine=0, table_elements=TABLE_ELEMENTS):
+        # (Q, dim) queries -> entity ids and (approximate) L2 distances, each (Q, k);
+        # table_elements bounds the lookup tables of a query batch
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe, len(self.centroids))
+        batch = max(1, table_elements // (nprobe * self.codebooks.shape[0] * self.codebooks.shape[1]))
+        out_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        out_dist = np.full((len(queries), k), np.inf, dtype=np.float32)
+        for start in range(0, len(queries), batch):
+            ids, dist = self._search_batch(queries[start:start + batch], k, nprobe, refine)
+            out_ids[start:start + batch, :ids.shape[1]] = ids
+            out_dist[start:start + batch, :dist.shape[1]] = dist
+        return out_ids, out_dist
+
+    def _search_batch(self, queries, k, nprobe, refine):
+        n_queries = len(queries)
+        m, ks, _ = self.codebooks.shape
+        probes = np.argpartition(_sq_dists(queries, self.centroids), nprobe - 1, axis=1)[:, :nprobe].ravel()
+        # Lookup tables of every (query, probed list) pair in one go: squared distance
+        # of each residual sub-vector to each sub-centroid, (pairs, m, ks)
+        residual = self._split(np.repeat(queries, nprobe, axis=0) - self.centroids[probes])
+        tables = (np.einsum("pjs,pjs->pj", residual, residual)[:, :, None]
+                  - 2 * np.matmul(residual.transpose(1, 0, 2), self.codebooks.transpose(0, 2, 1)).transpose(1, 0, 2)
+                  + np.einsum("jks,jks->jk", self.codebooks, self.codebooks)[None])
+
+        # Candidates of all pairs, pairs probing the same list side by side so each
+        # inverted list is scanned once for every query that probes it. slot_start
+        # is where a pair's list begins among its query's candidates.
+        sizes = (self.offsets[1:] - self.offsets[:-1])[probes]
+        slot_start = (np.cumsum(sizes.reshape(n_queries, nprobe), axis=1) - sizes.reshape(n_queries, nprobe)).ravel()
+        pairs = np.argsort(probes, kind="stable")
+        counts = sizes[pairs]
+        pair_of = np.repeat(pairs, counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = self.offsets[probes[pair_of]] + within
+        codes = self.codes[rows]
+        flat = tables.reshape(-1)
+        dist = flat[pair_of * (m * ks) + codes[:, 0]]
+        for j in range(1, m):
+            dist += flat[pair_of * (m * ks) + j * ks + codes[:, j]]
+
+        # Per query candidate matrix, padded with inf, then the usual top-k
+        width = max(int(sizes.reshape(n_queries, nprobe).sum(axis=1).max()), 1)
+        query_of, col = pair_of // nprobe, slot_start[pair_of] + within
+        cand_dist = np.full((n_queries, width), np.inf, dtype=np.float32)
+        cand_rows = np.zeros((n_queries, width), dtype=np.int64)
+        cand_dist[query_of, col] = dist
+        cand_rows[query_of, col] = rows
+        keep = min(width, max(k, refine * k) if refine and self.vectors is not None else k)
+        top = np.argpartition(cand_dist, keep - 1, axis=1)[:, :keep] if keep < width else \
+            np.broadcast_to(np.arange(width), cand_dist.shape)
+        top_dist = np.take_along_axis(cand_dist, top, axis=1)
+        top_rows = np.take_along_axis(cand_rows, top, axis=1)
+        if refine and self.vectors is not None:
+            diff = self.vectors[top_rows] - queries[:, None, :]
+            top_dist = np.where(np.isfinite(top_dist), np.einsum("qcd,qcd->qc", diff, diff), np.inf)
+        order = np.argsort(top_dist, axis=1, kind="stable")[:, :k]
+        top_dist = np.take_along_axis(top_dist, order, axis=1)
+        ids = np.where(np.isfinite(top_dist), self.ids[np.take_along_axis(top_rows, order, axis=1)], -1)
+        return ids, np.sqrt(np.maximum(top_dist, 0))
+
+    def save(self, path):
+        arrays = dict(centroids=self.centroids, codebooks=self.codebooks, codes=self.codes,
+                      ids=self.ids, offsets=self.offsets)
+        if self.vectors is not None:
+            arrays["vectors"] = self.vectors
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            vectors = data["vectors"] if "vectors" in data else None
+            return cls(data["centroids"], data["codebooks"], data["codes"], data["ids"],
+                       data["offsets"], vectors)
+
+
+def recall_at_k(approx_ids, exact_ids):
+    # Share of the exact top-k neighbours the approximate search also returned
+    k = exact_ids.shape[1]
+    hits = sum(np.isin(a[:k], e).sum() for a, e in zip(approx_ids, exact_ids))
+    return hits / exact_ids.size
@@ -0,0 +1,115 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+from rdflib import Graph
+
+import abox_builder
+
+# Columns holding entity ids; every replica gets its own suffix on them so the
+# scaled-up dataset grows the graph instead of repeating the same triples
+ID_COLUMNS = {
+    "papers":       ["corpusid"],
+    "authors":      ["authorid"],
+    "keywords":     ["keyword"],
+    "journals":     ["venueID"],
+    "conferences":  ["conferenceID"],
+    "volumes":      ["volumeID"],
+    "editions":     ["editionID"],
+    "universities": ["affiliationID"],
+    "companies":    ["affiliationID"],
+    "related_to":   ["paperID", "keyword"],
+    "written_by":   ["paperID", "authorID"],
+    "reviewed_by":  ["paperID", "reviewerID"],
+    "cited_by":     ["paperID_cited", "paperID_citing"],
+    "published_in": ["venueID", "paperID"],
+    "is_from":      ["editionID", "conferenceID"],
+    "volume_from":  ["journalID", "volumeID"],
+    "affiliations": ["authorID", "affiliationID"],
+}
+
+
+def write_scaled_copy(src_dir, dst_dir, scale):
+    for name, filename in abox_builder.SOURCES.items():
+        df = pd.read_csv(os.path.join(src_dir, filename))
+        replicas = []
+        for i in range(scale):
+            replica = df.copy()
+            for column in ID_COLUMNS.get(name, []):
+                if column in replica:
+                    replica[column] = replica[column].astype(str) + f"r{i}"
+            replicas.append(replica)
+        pd.concat(replicas, ignore_index=True).to_csv(os.path.join(dst_dir, filename), index=False)
+
+
+# Sections resolving rows against another table (reviewer names, proceedings
+# names, journal volumes, affiliation names)
+JOIN_SECTIONS = ["reviewers", "proceedings", "published_in", "affiliations"]
+JOIN_TABLES = ["reviewed_by", "is_from", "published_in", "affiliations",
+               "authors", "editions", "journals", "volume_from", "universities", "companies"]
+
+
+def time_joins(frames):
+    start = time.perf_counter()
+    indexes = abox_builder.build_indexes(frames)
+    blocks = list(abox_builder.build_blocks(frames, JOIN_SECTIONS, indexes))
+    return time.perf_counter() - start, sum(len(b.subjects) for b in blocks)
+
+
+def time_workers(data_dir, scale, worker_counts):
+    out = os.path.join(data_dir, "bench.nt")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        if workers == 1:
+            written = abox_builder.stream_ntriples(out, data_dir, chunksize=20_000)
+        else:
+            written = abox_builder.parallel_ntriples(out, data_dir, chunksize=20_000, workers=workers)
+        seconds = time.perf_counter() - start
+        print(f"scale {scale:>4}  workers {workers:>2}  {written:>9} triples  {seconds:>7.2f} s")
+
+
+def timed(build, frames):
+    start = time.perf_counter()
+    graph = build(Graph(), frames)
+    return time.perf_counter() - start, graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-wise vs columnar ABox build time")
+    parser.add_argument("--data-dir", default=abox_builder.DATA_DIR)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--workers", type=int, nargs="*", default=[],
+                        help="also time the streaming export with these worker counts")
+    parser.add_argument("--joins-only", action="store_true",
+                        help="only time the lookup sections (no rdflib graph), to see how they scale")
+    args = parser.parse_args()
+
+    scaled = {}
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_scaled_copy(args.data_dir, tmp, scale)
+            scaled[scale] = abox_builder.load_sources(tmp)
+            if args.workers:
+                time_workers(tmp, scale, args.workers)
+
+    if not args.joins_only:
+        print(f"{'scale':>5} {'rows':>8} {'triples':>9} {'rowwise s':>10} {'columnar s':>11} {'speedup':>8}  same graph")
+        for scale, frames in scaled.items():
+            rows = sum(len(df) for df in frames.values())
+            t_row, g_row = timed(abox_builder.add_rowwise, frames)
+            t_col, g_col = timed(abox_builder.add_columnar, frames)
+            same = len(g_row) == len(g_col) and set(g_row) == set(g_col)
+            print(f"{scale:>5} {rows:>8} {len(g_col):>9} {t_row:>10.2f} {t_col:>11.2f} {t_row / t_col:>7.1f}x  {same}")
+
+    # Linear joins keep the time per input row flat as the tables grow
+    print(f"\n{'scale':>5} {'join rows':>10} {'triples':>9} {'joins s':>8} {'us/row':>7}")
+    for scale, frames in scaled.items():
+        rows = sum(len(frames[name]) for name in JOIN_TABLES)
+        seconds, triples = time_joins(frames)
+        print(f"{scale:>5} {rows:>10} {triples:>9} {seconds:>8.3f} {seconds / rows * 1e6:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
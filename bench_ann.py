@@ -0,0 +1,73 @@
+import argparse
+import time
+
+import numpy as np
+import torch
+
+import kg_dataset
+import transe
+from ann_index import IVFPQIndex, recall_at_k
+from entity_search import EntitySearch
+
+# Recall@k and QPS of the IVF-PQ index against exact search. The vectors are
+# the project's own TransE entity embeddings (a short training run), tiled with
+# small Gaussian jitter to reach the larger sizes.
+
+
+def project_embeddings(dim, epochs):
+    dataset = kg_dataset.load_or_build()
+    triples = torch.from_numpy(np.asarray(dataset.train, dtype=np.int64))
+    torch.manual_seed(0)
+    model = transe.TransEModel(dataset.n_train_entities, dataset.n_train_relations, dim)
+    optimizer = transe.make_optimizer(model, 0.01)
+    transe.train(model, optimizer, triples, epochs, 512, 1.0, negatives=5, log=None)
+    return model.entity_embeddings.weight.detach().numpy()
+
+
+def scaled(base, size, rng):
+    reps = -(-size // len(base))
+    tiled = np.tile(base, (reps, 1))[:size]
+    return tiled + rng.normal(scale=0.05 * base.std(), size=tiled.shape).astype(np.float32)
+
+
+def qps(search, queries):
+    start = time.perf_counter()
+    result = search(queries)
+    return result, len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF-PQ recall@k and QPS vs exact search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=50)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 64])
+    parser.add_argument("--refine", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    base = project_embeddings(args.dim, args.epochs).astype(np.float32)
+    print(f"{'vectors':>9} {'search':>16} {'recall@k':>9} {'QPS':>9} {'build s':>8}")
+    for size in args.sizes:
+        matrix = scaled(base, size, rng)
+        queries = matrix[rng.choice(size, args.queries, replace=False)] + rng.normal(
+            scale=0.05 * base.std(), size=(args.queries, args.dim)).astype(np.float32)
+
+        exact = EntitySearch(matrix, np.empty(size, dtype=object))
+        (exact_ids, _), exact_qps = qps(lambda q: exact.nearest(q, args.k), queries)
+        print(f"{size:>9} {'exact':>16} {1.0:>9.3f} {exact_qps:>9,.0f}")
+
+        start = time.perf_counter()
+        index = IVFPQIndex.build(matrix)
+        build = time.perf_counter() - start
+        for nprobe in args.nprobe:
+            for refine in sorted({0, args.refine}):
+                (ids, _), rate = qps(lambda q: index.search(q, args.k, nprobe, refine), queries)
+                label = f"nprobe={nprobe}" + (f" r={refine}" if refine else "")
+                print(f"{size:>9} {label:>16} {recall_at_k(ids, exact_ids):>9.3f} {rate:>9,.0f} {build:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
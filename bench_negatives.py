@@ -0,0 +1,56 @@
+import argparse
+import time
+
+import numpy as np
+
+import kg_dataset
+import negatives
+from entity_search import type_groups
+
+# Build time of a triple-classification set (positives + corrupted tails): the
+# old per-triple rejection loop against NegativeSampler, unconstrained and
+# type-constrained. Positives are project train triples drawn with replacement.
+
+
+def loop_negatives(pos, all_ents):
+    negs = []
+    for h, r, t in pos:
+        corrupt = t
+        while corrupt == t:
+            corrupt = np.random.choice(all_ents)
+        negs.append([h, r, corrupt])
+    return np.array(negs)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Negative generation: Python loop vs vectorized")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--negatives", type=int, default=1)
+    parser.add_argument("--loop-max", type=int, default=100_000, help="largest size timed with the loop")
+    args = parser.parse_args()
+
+    dataset = kg_dataset.load_or_build()
+    n_ent, n_rel = dataset.n_train_entities, dataset.n_train_relations
+    X_train = np.asarray(dataset.train, dtype=np.int64)
+    groups, _ = type_groups(dataset.entities[:n_ent])
+    rng = np.random.default_rng(0)
+    all_ents = np.arange(n_ent)
+
+    print(f"{'positives':>10} {'loop s':>8} {'any s':>8} {'typed s':>8} {'typed valid':>12}")
+    for size in args.sizes:
+        pos = X_train[rng.integers(0, len(X_train), size)]
+        loop_s = timed(lambda: loop_negatives(pos, all_ents))[1] if size <= args.loop_max else float("nan")
+        any_s = timed(lambda: negatives.NegativeSampler(X_train, n_ent, n_rel).sample(pos, args.negatives))[1]
+        (_, valid), typed_s = timed(
+            lambda: negatives.NegativeSampler(X_train, n_ent, n_rel, groups).sample(pos, args.negatives))
+        print(f"{size:>10,} {loop_s:>8.2f} {any_s:>8.2f} {typed_s:>8.2f} {valid.mean():>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
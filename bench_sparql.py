@@ -0,0 +1,136 @@
+import argparse
+import csv
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from rdflib import Graph, URIRef
+from rdflib.plugins.sparql import prepareQuery
+
+# Parse time, execution time, result count and peak memory of the queries in
+# 1234_B3_XingFerrer.sql against research_ontology.ttl, at several synthetic
+# scale factors. The file holds several queries, each introduced by a
+# "-- Query N: title" line, with SQL-style "--" comments that SPARQL does not
+# accept; those are stripped before parsing. A scale factor s replicates every
+# instance triple s times under renamed instance URIs (the TBox once), so the
+# graph grows like a bigger corpus instead of repeating the same triples.
+# Timings come from untraced runs; peak memory (tracemalloc, Python heap) from
+# one extra traced run, as tracing slows rdflib down. A query that fails to
+# parse or execute is recorded with its error rather than stopping the run.
+# A persistent store plugin (--store, e.g. BerkeleyDB) is opened in a fresh
+# directory per scale under --store-dir, removed again after the run.
+QUERY_FILE = "1234_B3_XingFerrer.sql"
+GRAPH_FILE = "research_ontology.ttl"
+INSTANCE = "http://research.publications.com/instance#"
+MEMORY_STORES = {"default", "Memory", "SimpleMemory"}
+COLUMNS = ["query", "title", "scale", "triples", "run", "parse_s", "exec_s", "results", "peak_mb", "error"]
+
+
+def extract_queries(path):
+    # [(title, query text)] with the "--" comments removed
+    with open(path) as f:
+        text = f.read()
+    queries = []
+    for match in re.finditer(r"(?ms)^--\s*Query\s+\d+:\s*(.*?)$(.*?)(?=^--\s*Query\s+\d+:|\Z)", text):
+        body = re.sub(r"(?m)(^|\s)--(\s.*)?$", "", match.group(2)).strip()
+        queries.append((match.group(1).strip(), body))
+    return queries
+
+
+def scaled_graph(base, scale, store="default", path=None):
+    graph = Graph(store=store)
+    if path:
+        graph.open(path, create=True)
+    for triple in base:
+        if not any(isinstance(term, URIRef) and term.startswith(INSTANCE) for term in triple):
+            graph.add(triple)
+            continue
+        for i in range(scale):
+            graph.add(tuple(URIRef(f"{term}_r{i}") if isinstance(term, URIRef) and term.startswith(INSTANCE)
+                            else term for term in triple))
+    return graph
+
+
+def run_query(graph, text, traced=False):
+    if traced:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        prepared = prepareQuery(text)
+        parsed = time.perf_counter()
+        results = len(list(graph.query(prepared)))
+        done = time.perf_counter()
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20 if traced else None
+        return {"parse_s": parsed - start, "exec_s": done - parsed, "results": results, "peak_mb": peak,
+                "error": ""}
+    except Exception as exc:
+        return {"parse_s": None, "exec_s": None, "results": None, "peak_mb": None, "error": repr(exc)}
+    finally:
+        if traced:
+            tracemalloc.stop()
+
+
+def report(number, scale, triples, runs):
+    timed, traced = runs[:-1], runs[-1]
+    if traced["error"] or any(r["error"] for r in timed):
+        error = traced["error"] or next(r["error"] for r in timed if r["error"])
+        print(f"{number:>5} {scale:>5} {triples:>9}  failed: {error}")
+        return
+    print(f"{number:>5} {scale:>5} {triples:>9} {statistics.median(r['parse_s'] for r in timed):>8.3f} "
+          f"{statistics.median(r['exec_s'] for r in timed):>9.3f} {traced['results']:>8} "
+          f"{traced['peak_mb']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPARQL query timings over research_ontology.ttl")
+    parser.add_argument("--queries", default=QUERY_FILE)
+    parser.add_argument("--graph", default=GRAPH_FILE)
+    parser.add_argument("--store", default="default", help="rdflib store plugin (e.g. an on-disk store)")
+    parser.add_argument("--store-dir", help="where a persistent store is created (default: a temporary directory)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--only", type=int, nargs="+", help="query numbers to run (1-based)")
+    parser.add_argument("--out", default="sparql_bench.csv")
+    args = parser.parse_args()
+
+    queries = list(enumerate(extract_queries(args.queries), 1))
+    if args.only:
+        queries = [(n, q) for n, q in queries if n in args.only]
+    base = Graph()
+    base.parse(args.graph)
+
+    persistent = args.store not in MEMORY_STORES
+    store_dir = tempfile.mkdtemp(prefix="sparql_store_", dir=args.store_dir) if persistent else None
+
+    print(f"{'query':>5} {'scale':>5} {'triples':>9} {'parse s':>8} {'exec s':>9} {'results':>8} {'peak MB':>8}")
+    try:
+        with open(args.out, "w", newline="") as out:
+            writer = csv.DictWriter(out, fieldnames=COLUMNS)
+            writer.writeheader()
+            for scale in args.scales:
+                path = os.path.join(store_dir, f"scale{scale}") if persistent else None
+                graph = scaled_graph(base, scale, args.store, path)
+                try:
+                    for number, (title, text) in queries:
+                        runs = [run_query(graph, text) for _ in range(args.repeats)]
+                        runs.append(run_query(graph, text, traced=True))
+                        writer.writerows({"query": number, "title": title, "scale": scale,
+                                          "triples": len(graph), "run": run, **row}
+                                         for run, row in enumerate(runs))
+                        out.flush()
+                        report(number, scale, len(graph), runs)
+                finally:
+                    if persistent:
+                        graph.close()
+    finally:
+        if store_dir:
+            shutil.rmtree(store_dir, ignore_errors=True)
+    print(f"\nPer-run rows written to {args.out} (run {args.repeats} is the traced one)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import time
+
+import numpy as np
+import torch
+
+import kg_dataset
+import transe
+
+# Synthetic triples over a growing entity table: a batch always touches about
+# the same number of rows, so with sparse gradients the step time should stay
+# flat while the dense Adam step grows with the table.
+
+
+def step_latency(num_entities, sparse, renorm, args):
+    torch.manual_seed(0)
+    model = transe.TransEModel(num_entities, args.relations, args.dim, sparse=sparse)
+    optimizer = transe.make_optimizer(model, 0.01)
+    n = args.batch_size * (args.steps + args.warmup)
+    triples = torch.stack([torch.randint(0, num_entities, (n,)),
+                           torch.randint(0, args.relations, (n,)),
+                           torch.randint(0, num_entities, (n,))], dim=1)
+    times = []
+    for step in range(args.steps + args.warmup):
+        # One batch per train_epoch call, so every call is a single optimizer step
+        batch = triples[step * args.batch_size:(step + 1) * args.batch_size]
+        start = time.perf_counter()
+        transe.train_epoch(model, optimizer, batch, args.batch_size, 1.0, args.negatives, renorm=renorm)
+        if step >= args.warmup:
+            times.append(time.perf_counter() - start)
+    return np.median(times) * 1e3
+
+
+def epoch_speedup(worker_counts, args):
+    # Hogwild epochs (sparse model + SparseAdam, as train_hogwild requires) on the
+    # project's own train split, relative to one worker
+    dataset = kg_dataset.load_or_build(vocab=False)
+    triples = torch.from_numpy(np.asarray(dataset.train, dtype=np.int64))
+    print(f"\n{'workers':>7} {'triples/s':>10} {'speedup':>8}")
+    base = None
+    for workers in worker_counts:
+        torch.manual_seed(0)
+        model = transe.TransEModel(dataset.n_train_entities, dataset.n_train_relations, args.dim, sparse=True)
+        history = transe.train_hogwild(model, triples, args.epochs, args.batch_size, 1.0, 0.01,
+                                       negatives=args.negatives, workers=workers, log=None)
+        # The first epoch includes process start-up
+        rate = np.median([r for _, r in history[1:]] or [history[0][1]])
+        base = base or rate
+        print(f"{workers:>7} {rate:>10,.0f} {rate / base:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TransE step latency vs entity count (dense vs sparse) and Hogwild scaling")
+    parser.add_argument("--entities", type=int, nargs="*", default=[10_000, 100_000, 1_000_000, 4_000_000])
+    parser.add_argument("--relations", type=int, default=20)
+    parser.add_argument("--dim", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--negatives", type=int, default=1)
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--workers", type=int, nargs="*", default=[],
+                        help="also time Hogwild epochs on the project dataset with these worker counts")
+    parser.add_argument("--epochs", type=int, default=5)
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    if args.entities:
+        print(f"{'entities':>10} {'dense ms':>9} {'sparse ms':>10} {'sparse+renorm ms':>17} {'speedup':>8}")
+    for num_entities in args.entities:
+        dense = step_latency(num_entities, False, False, args)
+        sparse = step_latency(num_entities, True, False, args)
+        renorm = step_latency(num_entities, True, True, args)
+        print(f"{num_entities:>10} {dense:>9.2f} {sparse:>10.2f} {renorm:>17.2f} {dense / sparse:>7.1f}x")
+
+    if args.workers:
+        epoch_speedup(args.workers, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+# ——— Per-relation score calibration for triple classification ———
+# Scores of different relations live on different scales, so every relation
+# gets its own decision threshold and Platt scaler p = sigmoid(a * score + b).
+# All relations are fitted together: group sums are np.bincount over relation
+# ids, so a fit is a few passes over the validation scores whatever the number
+# of relations. The result is a (num_relations, 3) table [a, b, threshold];
+# classifying a batch is a single gather table[relations]. Relations with too
+# few validation triples (or only one class) fall back to the global fit.
+MIN_TRIPLES = 10
+
+
+def _sigmoid(z):
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+def platt_fit(scores, groups, labels, n_groups, iters=30, ridge=1e-6):
+    # Newton's method on all groups at once, with Platt's smoothed targets; each
+    # step solves every group's 2x2 system in closed form. Scores are
+    # standardised per group for the fit and (a, b) mapped back afterwards.
+    scores, labels = np.asarray(scores, dtype=np.float64), np.asarray(labels, dtype=np.float64)
+    counts = np.maximum(np.bincount(groups, minlength=n_groups), 1)
+    mean = np.bincount(groups, weights=scores, minlength=n_groups) / counts
+    std = np.sqrt(np.bincount(groups, weights=(scores - mean[groups]) ** 2, minlength=n_groups) / counts)
+    std = np.where(std > 0, std, 1.0)
+    z = (scores - mean[groups]) / std[groups]
+    n_pos = np.bincount(groups, weights=labels, minlength=n_groups)
+    n_neg = counts - n_pos
+    target = np.where(labels > 0, ((n_pos + 1) / (n_pos + 2))[groups], (1 / (n_neg + 2))[groups])
+    a, b = np.zeros(n_groups), np.log((n_pos + 1) / (n_neg + 1))
+    for _ in range(iters):
+        p = _sigmoid(a[groups] * z + b[groups])
+        err, w = p - target, np.maximum(p * (1 - p), 1e-12)
+        g_a = np.bincount(groups, weights=err * z, minlength=n_groups)
+        g_b = np.bincount(groups, weights=err, minlength=n_groups)
+        h_aa = np.bincount(groups, weights=w * z * z, minlength=n_groups) + ridge
+        h_ab = np.bincount(groups, weights=w * z, minlength=n_groups)
+        h_bb = np.bincount(groups, weights=w, minlength=n_groups) + ridge
+        det = h_aa * h_bb - h_ab * h_ab
+        a -= (h_bb * g_a - h_ab * g_b) / det
+        b -= (h_aa * g_b - h_ab * g_a) / det
+    return a / std, b - a * mean / std
+
+
+def best_thresholds(scores, groups, labels, n_groups):
+    # Per group, the score t maximising the accuracy of "score >= t is positive";
+    # candidates are the group's distinct scores, all evaluated in one sweep
+    scores, labels = np.asarray(scores, dtype=np.float64), np.asarray(labels, dtype=np.float64)
+    order = np.lexsort((scores, groups))
+    s, g, y = scores[order], groups[order], labels[order]
+    counts = np.bincount(g, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    # Positives / negatives before each position, within its group
+    pos_before = np.cumsum(y) - y
+    pos_before -= np.concatenate([[0], np.cumsum(y)])[starts][g]
+    neg_before = (np.arange(len(s)) - starts[g]) - pos_before
+    n_pos = np.bincount(g, weights=y, minlength=n_groups)
+    correct = neg_before + (n_pos[g] - pos_before)
+    # Only the first of tied scores is a valid cut
+    first = np.ones(len(s), dtype=bool)
+    first[1:] = (s[1:] != s[:-1]) | (g[1:] != g[:-1])
+    correct = np.where(first, correct, -1)
+    best = np.lexsort((-correct, g))
+    best = best[np.concatenate([[True], g[best][1:] != g[best][:-1]])] if len(best) else best
+    thresholds = np.full(n_groups, np.nan)
+    thresholds[g[best]] = s[best]
+    return thresholds
+
+
+def group_auc(scores, groups, labels, n_groups):
+    # Mann-Whitney AUC per group from within-group average ranks (NaN for one class)
+    labels = np.asarray(labels, dtype=np.float64)
+    dense = np.unique(scores, return_inverse=True)[1].ravel()
+    ranks = rankdata(groups.astype(np.int64) * (dense.max() + 1 if len(dense) else 1) + dense)
+    counts = np.bincount(groups, minlength=n_groups)
+    ranks -= np.concatenate([[0], np.cumsum(counts)[:-1]])[groups]
+    n_pos = np.bincount(groups, weights=labels, minlength=n_groups)
+    n_neg = counts - n_pos
+    rank_sum = np.bincount(groups, weights=ranks * labels, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (rank_sum - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+def group_accuracy(predicted, groups, labels, n_groups):
+    counts = np.bincount(groups, minlength=n_groups)
+    correct = np.bincount(groups, weights=np.asarray(predicted) == np.asarray(labels), minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return correct / counts
+
+
+class RelationCalibration:
+    def __init__(self, table):
+        self.table = np.asarray(table, dtype=np.float64)
+
+    @classmethod
+    def fit(cls, scores, relations, labels, num_relations, min_triples=MIN_TRIPLES):
+        relations = np.asarray(relations, dtype=np.int64)
+        labels = np.asarray(labels, dtype=np.float64)
+        everything = np.zeros(len(relations), dtype=np.int64)
+        a, b = platt_fit(scores, relations, labels, num_relations)
+        thresholds = best_thresholds(scores, relations, labels, num_relations)
+        global_a, global_b = platt_fit(scores, everything, labels, 1)
+        global_t = best_thresholds(scores, everything, labels, 1)
+        counts = np.bincount(relations, minlength=num_relations)
+        n_pos = np.bincount(relations, weights=labels, minlength=num_relations)
+        own = (counts >= min_triples) & (n_pos > 0) & (n_pos < counts)
+        table = np.column_stack([np.where(own, a, global_a[0]), np.where(own, b, global_b[0]),
+                                 np.where(own, thresholds, global_t[0])])
+        return cls(table)
+
+    def predict_proba(self, scores, relations):
+        a, b, _ = self.table[relations].T
+        return _sigmoid(a * scores + b)
+
+    def predict(self, scores, relations):
+        return (np.asarray(scores) >= self.table[relations, 2]).astype(np.float64)
+
+    def report(self, scores, relations, labels, relation_names=None):
+        # AUC and accuracy per relation that has test triples
+        relations = np.asarray(relations, dtype=np.int64)
+        n = len(self.table)
+        counts = np.bincount(relations, minlength=n)
+        frame = pd.DataFrame({
+            "relation": relation_names if relation_names is not None else np.arange(n),
+            "n": counts,
+            "positives": np.bincount(relations, weights=labels, minlength=n).astype(int),
+            "AUC": group_auc(scores, relations, labels, n),
+            "accuracy": group_accuracy(self.predict(scores, relations), relations, labels, n),
+        })
+        return frame[counts > 0].reset_index(drop=True)
+
+    def save(self, path):
+        np.savez(path, table=self.table)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["table"])
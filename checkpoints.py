@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import shutil
+
+import kg_dataset
+
+# ——— Model checkpoints keyed by config + dataset ———
+# checkpoints/<stage>-<hash>/
+#     meta.json                      config, hash, epochs trained so far
+#     entities.json, relations.json  the vocabulary the ids refer to
+#     model files                    written by the stage (torch state dict, ampligraph weights)
+#
+# The hash covers the training config (without the epoch count) and the
+# binary dataset, so a checkpoint is only reused for the same model trained on
+# the same triples. Asking for more epochs than a checkpoint holds resumes it.
+CHECKPOINT_DIR = "checkpoints"
+CHECKPOINT_EVERY = 10      # epochs between checkpoints while training
+
+
+def _digest_files(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def config_hash(config, dataset_dir=kg_dataset.DATASET_DIR):
+    data = _digest_files(os.path.join(dataset_dir, name)
+                         for name in ("train.npy", "entities.json", "relations.json"))
+    payload = json.dumps({"config": config, "dataset": data}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Checkpoint:
+    def __init__(self, stage, config, dataset_dir=kg_dataset.DATASET_DIR, root=CHECKPOINT_DIR):
+        self.stage = stage
+        self.config = config
+        self.dataset_dir = dataset_dir
+        self.hash = config_hash(config, dataset_dir)
+        self.path = os.path.join(root, f"{stage}-{self.hash[:12]}")
+
+    def file(self, name, create=True):
+        if create:
+            os.makedirs(self.path, exist_ok=True)
+        return os.path.join(self.path, name)
+
+    def load_meta(self):
+        # None when nothing (matching) has been saved yet
+        try:
+            with open(self.file("meta.json", create=False)) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        return meta if meta.get("hash") == self.hash else None
+
+    def epochs_done(self):
+        meta = self.load_meta()
+        return meta["epoch"] if meta else 0
+
+    def save_meta(self, epoch, **extra):
+        # Keeps extra fields of earlier saves (e.g. best_epoch) unless overridden
+        extra = {**{k: v for k, v in (self.load_meta() or {}).items()
+                    if k not in ("stage", "hash", "config", "epoch")}, **extra}
+        for name in ("entities.json", "relations.json"):
+            if not os.path.exists(self.file(name)):
+                shutil.copyfile(os.path.join(self.dataset_dir, name), self.file(name))
+        meta = {"stage": self.stage, "hash": self.hash, "config": self.config, "epoch": epoch, **extra}
+        tmp = self.file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, self.file("meta.json"))
+
+
+# ——— AmpliGraph models ———
+# Weights go through ampligraph.utils.save_model / restore_model; a Keras
+# callback writes them every CHECKPOINT_EVERY epochs, so an interrupted fit
+# restarts from the last saved epoch via initial_epoch.
+def kge_config(scoring_type, k, eta, batches, loss="pairwise", optimizer="adam", seed=0):
+    return {"scoring_type": scoring_type, "k": k, "eta": eta, "batches": batches,
+            "loss": loss, "optimizer": optimizer, "seed": seed}
+
+
+def _save_kge(model, checkpoint, epoch):
+    from ampligraph.utils import save_model
+    save_model(model, model_name_path=checkpoint.file("model"))
+    checkpoint.save_meta(epoch)
+
+
+def _epoch_callback(checkpoint, every):
+    from tensorflow.keras.callbacks import Callback
+
+    class EpochCheckpoint(Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            if (epoch + 1) % every == 0:
+                _save_kge(self.model, checkpoint, epoch + 1)
+
+    return EpochCheckpoint()
+
+
+def fit_kge(X_train, epochs, config, export_path=None, every=CHECKPOINT_EVERY, log=print, model=None):
+    # Returns a ScoringBasedEmbeddingModel trained for `epochs`, reusing or resuming
+    # the matching checkpoint. export_path: also save the final model there.
+    # model: the in-memory model of this config at its last checkpoint, trained
+    # further without reloading it. The hash leaves the epoch count out, so a
+    # checkpoint may already hold more epochs than asked for: that model is
+    # returned with a warning, and model.epochs_trained always tells which.
+    from ampligraph.latent_features import ScoringBasedEmbeddingModel
+    from ampligraph.utils import restore_model
+
+    checkpoint = Checkpoint("kge", config)
+    done = checkpoint.epochs_done()
+    if model is None and done:
+        model = restore_model(model_name_path=checkpoint.file("model"))
+        log(f"  checkpoint {checkpoint.path}: {done}/{epochs} epochs")
+    elif model is None:
+        model = ScoringBasedEmbeddingModel(eta=config["eta"], k=config["k"],
+                                           scoring_type=config["scoring_type"], seed=config["seed"])
+        model.compile(optimizer=config["optimizer"], loss=config["loss"])
+
+    if done > epochs:
+        log(f"  warning: checkpoint {checkpoint.path} holds {done} epochs, more than the {epochs} "
+            f"asked for; returning the {done}-epoch model")
+    if done < epochs:
+        batch_size = max(1, X_train.shape[0] // config["batches"])
+        model.fit(X_train, batch_size=batch_size, epochs=epochs, initial_epoch=done, verbose=False,
+                  callbacks=[_epoch_callback(checkpoint, every)])
+        _save_kge(model, checkpoint, epochs)
+    model.epochs_trained = max(done, epochs)
+    if export_path:
+        from ampligraph.utils import save_model
+        save_model(model, model_name_path=export_path)
+    return model
+
+
+# The best model seen by periodic validation is kept beside the latest one
+def save_kge_best(model, config, epoch, score, **extra):
+    from ampligraph.utils import save_model
+    checkpoint = Checkpoint("kge", config)
+    save_model(model, model_name_path=checkpoint.file("best"))
+    checkpoint.save_meta(checkpoint.epochs_done(), best_epoch=epoch, best_score=score, **extra)
+
+
+def load_kge_best(config):
+    # Best validated model of a config, or None when it was never validated
+    from ampligraph.utils import restore_model
+    checkpoint = Checkpoint("kge", config)
+    meta = checkpoint.load_meta()
+    if not meta or "best_epoch" not in meta:
+        return None
+    model = restore_model(model_name_path=checkpoint.file("best"))
+    model.epochs_trained = meta["best_epoch"]
+    return model
+
+
+def kge_weights_tag(config):
+    # Names the weights best_or_fit_kge returns, for files derived from them
+    meta = Checkpoint("kge", config).load_meta() or {}
+    return f"best{meta['best_epoch']}" if "best_epoch" in meta else f"e{meta.get('epoch', 0)}"
+
+
+def best_or_fit_kge(X_train, epochs, config, export_path=None, log=print):
+    # The best validated weights when early stopping kept them (C3), otherwise the
+    # final checkpoint, trained or resumed up to `epochs`
+    model = load_kge_best(config)
+    if model is None:
+        return fit_kge(X_train, epochs, config, export_path=export_path, log=log)
+    log(f"  best validated checkpoint: epoch {model.epochs_trained}")
+    if export_path:
+        from ampligraph.utils import save_model
+        save_model(model, model_name_path=export_path)
+    return model
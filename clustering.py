@@ -0,0 +1,76 @@
+import os
+import tempfile
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+import grid_runner
+
+# ——— Scalable k sweep: mini-batch k-means + sampled silhouette ———
+# Exact silhouette needs all pairwise distances (O(n^2)), so it is estimated on
+# a sample stratified by cluster: every cluster contributes in proportion to
+# its size (at least MIN_PER_CLUSTER points), so small clusters are not lost.
+# Each k is one task in grid_runner's process pool; the points are written
+# once to a .npy file that every worker memory-maps instead of receiving a copy.
+SILHOUETTE_SAMPLE = 10_000
+MIN_PER_CLUSTER = 20
+BATCH_SIZE = 4096
+
+
+def stratified_sample(labels, size, seed=0):
+    # Indices of about `size` points, proportional per label, all points if fewer
+    labels = np.asarray(labels)
+    if len(labels) <= size:
+        return np.arange(len(labels))
+    rng = np.random.default_rng(seed)
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    quota = np.minimum(counts, np.maximum(np.ceil(counts * size / len(labels)), MIN_PER_CLUSTER))
+    # Random order, then the position of each point inside its label
+    order = rng.permutation(len(labels))
+    order = order[np.argsort(inverse[order], kind="stable")]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    within = np.arange(len(order)) - np.repeat(starts, counts)
+    return np.sort(order[within < np.repeat(quota, counts)])
+
+
+def sampled_silhouette(X, labels, size=SILHOUETTE_SAMPLE, seed=0):
+    if len(np.unique(labels)) < 2:
+        return float("nan")
+    idx = stratified_sample(labels, size, seed)
+    return float(silhouette_score(X[idx], labels[idx]))
+
+
+def fit_kmeans(X, k, seed=0, batch_size=BATCH_SIZE):
+    return MiniBatchKMeans(n_clusters=k, random_state=seed, batch_size=batch_size, n_init=3).fit(X)
+
+
+def score_k(config):
+    # One k of the sweep, run in a pool worker
+    X = np.load(config["path"], mmap_mode="r")
+    km = fit_kmeans(X, config["k"], config["seed"])
+    return {"k": config["k"], "silhouette": sampled_silhouette(X, km.labels_, config["sample"], config["seed"]),
+            "inertia": float(km.inertia_)}
+
+
+def sweep_k(X, ks, sample=SILHOUETTE_SAMPLE, seed=0, workers=None, log=print):
+    # Sampled silhouette per k, computed in parallel; returns rows sorted by k
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "points.npy")
+        np.save(path, np.ascontiguousarray(X, dtype=np.float32))
+        configs = [{"k": k, "path": path, "sample": sample, "seed": seed} for k in ks]
+        rows = [row for _, row in grid_runner.map_configs(configs, score_k, workers, log=log)]
+    if not rows:
+        # map_configs logs and skips failed configs; with none left there is no k to pick
+        raise RuntimeError(f"k sweep failed for every k in {list(ks)} (errors logged above)")
+    return sorted(rows, key=lambda row: row["k"])
+
+
+def best_k(rows):
+    # Sweep row with the highest silhouette; NaN rows (a sample that collapsed
+    # to one cluster) are skipped, as max() would compare them in list order
+    scores = np.array([row["silhouette"] for row in rows], dtype=np.float64)
+    finite = np.isfinite(scores)
+    if not finite.any():
+        raise RuntimeError(f"no finite silhouette for any k in {[row['k'] for row in rows]}")
+    return rows[int(np.nanargmax(np.where(finite, scores, np.nan)))]
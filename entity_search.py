@@ -0,0 +1,83 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# ——— Exact top-k nearest-entity search over an embedding matrix ———
+# Entities are partitioned once by the type in their instance URI
+# (instance#Paper_123 -> "Paper"): the matrix is stored once, rows sorted by
+# type, so every partition is a contiguous view of it (ids, rows, cached
+# squared norms) and the untyped search covers the whole of it. A query batch
+# is then one matrix product per chunk: ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2,
+# with argpartition picking the k smallest before only those k are sorted.
+INSTANCE = "http://research.publications.com/instance#"
+
+
+def entity_types(entities, prefix=INSTANCE):
+    # Type name per entity ("Paper", "Author", ...), None when not an instance URI
+    pattern = "^" + re.escape(prefix) + r"([A-Za-z]+)_"
+    types = pd.Series(entities, dtype=object).str.extract(pattern, expand=False)
+    return types.where(types.notna(), None).to_numpy(dtype=object)
+
+
+def type_groups(entities, prefix=INSTANCE):
+    # Group id per entity and the group names; non-instance entities are "other"
+    types = pd.Series(entity_types(entities, prefix), dtype=object)
+    codes, names = pd.factorize(types.fillna("other"))
+    return codes, list(names)
+
+
+class EntitySearch:
+    def __init__(self, entity_matrix, entities, prefix=INSTANCE, chunk_elements=16_000_000):
+        # chunk_elements bounds the (queries x candidates) distance block held at once
+        self.entities = np.asarray(entities, dtype=object)
+        self.chunk_elements = chunk_elements
+        types = entity_types(self.entities, prefix)
+        codes, names = pd.factorize(pd.Series(types, dtype=object))   # untyped -> -1, sorted last
+        codes = np.where(codes < 0, len(names), codes)
+        order = np.argsort(codes, kind="stable")
+        # One float32 copy, in type order; row_of maps an entity id to its row
+        self.matrix = np.ascontiguousarray(np.asarray(entity_matrix)[order], dtype=np.float32)
+        self.row_of = np.empty(len(order), dtype=np.int64)
+        self.row_of[order] = np.arange(len(order))
+        sq_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+        self.partitions = {None: (order, self.matrix, sq_norms)}
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        for code, name in enumerate(names):
+            rows = slice(bounds[code], bounds[code + 1])
+            self.partitions[name] = (order[rows], self.matrix[rows], sq_norms[rows])
+
+    def types(self):
+        return [name for name in self.partitions if name is not None]
+
+    def ids(self, entity_type=None):
+        return self.partitions[entity_type][0]
+
+    def nearest(self, queries, k=1, entity_type=None):
+        # queries: (dim,) or (Q, dim) -> entity ids and L2 distances, each (Q, k), closest first
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        ids, matrix, sq_norms = self.partitions[entity_type]
+        k = min(k, len(ids))
+        out_ids = np.empty((len(queries), k), dtype=np.int64)
+        out_dist = np.empty((len(queries), k), dtype=np.float32)
+        step = max(1, self.chunk_elements // max(len(ids), 1))
+        for start in range(0, len(queries), step):
+            q = queries[start:start + step]
+            sq_dist = sq_norms[None, :] - 2 * (q @ matrix.T) + np.einsum("ij,ij->i", q, q)[:, None]
+            if k < len(ids):
+                top = np.argpartition(sq_dist, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(len(ids)), sq_dist.shape)
+            top_dist = np.take_along_axis(sq_dist, top, axis=1)
+            order = np.argsort(top_dist, axis=1, kind="stable")
+            out_ids[start:start + step] = ids[np.take_along_axis(top, order, axis=1)]
+            out_dist[start:start + step] = np.sqrt(np.maximum(np.take_along_axis(top_dist, order, axis=1), 0))
+        return out_ids, out_dist
+
+    def translate(self, head_ids, relation_vec, k=1, entity_type=None, sign=1):
+        # Many heads x one relation: nearest entities to e_h + sign * w_r for every head
+        heads = self.matrix[self.row_of[np.atleast_1d(head_ids)]]
+        return self.nearest(heads + sign * np.asarray(relation_vec, dtype=np.float32), k, entity_type)
+
+    def names(self, ids):
+        return self.entities[ids]
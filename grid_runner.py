@@ -0,0 +1,120 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import contextlib
+import csv
+import multiprocessing
+import os
+
+# ——— Parallel hyperparameter grid ———
+# Configurations run in a process pool (spawned, so TensorFlow starts fresh in
+# every worker) with each worker's math libraries capped at `threads` threads,
+# i.e. workers x threads cores in total. Every result row is appended to the CSV
+# by the parent as soon as its config finishes, so a crash keeps the finished
+# rows, and configs already in the CSV are skipped on the next run. Rows are
+# matched on `keys`; a row missing one of them (an older CSV) matches nothing.
+THREAD_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+               "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS")
+
+
+@contextlib.contextmanager
+def _thread_env(threads):
+    # Spawned workers copy the parent's environment when they start, before they
+    # re-import the main script (and NumPy / sklearn with it), so the caps must
+    # be set here rather than in the worker; restored once the workers started
+    saved = {var: os.environ.get(var) for var in THREAD_VARS}
+    os.environ.update({var: str(threads) for var in THREAD_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _limit_threads(threads):
+    # Worker initializer: also caps the thread pools of libraries already loaded
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(threads)
+
+
+def config_key(row, keys):
+    return tuple(str(row.get(k) or "") for k in keys)
+
+
+def read_results(csv_path):
+    if not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0:
+        return []
+    with open(csv_path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def append_result(csv_path, row, columns):
+    rows = read_results(csv_path)
+    header = list(rows[0].keys()) if rows else []
+    if rows and header != columns:
+        # Older file with other columns: rewrite it once under the new header
+        columns = header + [c for c in columns if c not in header]
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+    with open(csv_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        if not rows:
+            writer.writeheader()
+        writer.writerow(row)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def default_workers(threads=1):
+    return max(1, (os.cpu_count() or 1) // threads)
+
+
+def run_grid(configs, run, csv_path, keys, columns, workers=None, threads=1, log=print,
+             on_result=None):
+    # run(config) -> result row (dict with `columns`); it must be importable by
+    # the spawned workers (a module-level function, script body behind __main__).
+    # on_result(row) runs after each row is written (e.g. for side tables).
+    # Returns the newly computed rows in completion order; failed configs are
+    # logged and left out.
+    done = {config_key(row, keys) for row in read_results(csv_path)}
+    pending = [config for config in configs if config_key(config, keys) not in done]
+    if len(pending) < len(configs):
+        log(f"Skipping {len(configs) - len(pending)} configs already in {csv_path}")
+    if not pending:
+        return []
+
+    rows = []
+    for config, row in map_configs(pending, run, workers, threads, log):
+        append_result(csv_path, row, columns)
+        if on_result:
+            on_result(row)
+        rows.append(row)
+        log(f"[{len(rows)}/{len(pending)}] " + ", ".join(f"{c}={row[c]}" for c in columns))
+    return rows
+
+
+def map_configs(configs, run, workers=None, threads=1, log=print):
+    # Yields (config, run(config)) as each finishes; failures are logged and skipped
+    if not configs:
+        return
+    workers = min(workers or default_workers(threads), len(configs))
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_limit_threads,
+                             initargs=(threads,)) as pool:
+        # A spawn pool starts all its workers on the first submit
+        with _thread_env(threads):
+            futures = {pool.submit(run, config): config for config in configs}
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except Exception as exc:
+                # Not written to the CSV, so the next run retries it
+                log(f"Config {futures[future]} failed: {exc!r}")
+                continue
+            yield futures[future], row
@@ -0,0 +1,250 @@
+from collections import namedtuple
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# ——— Binary dataset: int32 triple arrays + vocabularies ———
+# <dir>/{train,valid,test}.npy   int32 arrays of shape (n, 3): head, relation, tail ids
+# <dir>/entities.json            id -> entity URI / literal
+# <dir>/relations.json           id -> relation URI
+# <dir>/meta.json                sizes; train entities/relations come first
+#
+# Entities and relations seen in train get the lowest ids (sorted, the same
+# order np.unique gave the old per-script vocabularies), followed by the ones
+# only found in valid/test. "Known to train" is then just `id < n_train_*`.
+# C1 drops triples with a missing head or tail (NaN literals, written out as
+# "nan") while streaming, before the split; TSVs written by older versions are
+# still cleaned of them when encoded, as the old `!= 'nan'` mask did.
+DATASET_DIR = "kg_dataset"
+SPLITS = ("train", "valid", "test")
+TSV_FILES = {"train": "train.tsv", "valid": "valid.tsv", "test": "test.tsv"}
+
+KGDataset = namedtuple("KGDataset", ["train", "valid", "test", "entities", "relations",
+                                     "n_train_entities", "n_train_relations"])
+
+
+def _drop_missing(df):
+    ends = df[["head", "tail"]]
+    missing = ends.isna().any(axis=1) | (ends.astype(str) == 'nan').any(axis=1)
+    return df[~missing]
+
+
+def _train_first_ids(names, used, in_train):
+    # New ids for the used names: train ones first, each group sorted
+    frame = pd.DataFrame({"extra": ~in_train[used], "name": names[used]})
+    order = np.flatnonzero(used)[frame.sort_values(["extra", "name"], kind="stable").index.to_numpy()]
+    new_ids = np.full(len(names), -1, dtype=np.int64)
+    new_ids[order] = np.arange(len(order))
+    return new_ids, names[order], int(in_train.sum())
+
+
+def save_arrays(arrays, entities, relations, dataset_dir=DATASET_DIR):
+    # arrays: {"train": (n, 3) ids, ...} over any vocabulary order; re-encoded train-first
+    entities = np.asarray(entities, dtype=object)
+    relations = np.asarray(relations, dtype=object)
+    arrays = {name: np.asarray(X) for name, X in arrays.items()}
+
+    used_ent = np.zeros(len(entities), dtype=bool)
+    used_rel = np.zeros(len(relations), dtype=bool)
+    for X in arrays.values():
+        used_ent[X[:, 0]] = used_ent[X[:, 2]] = True
+        used_rel[X[:, 1]] = True
+    train = arrays["train"]
+    train_ent = np.zeros(len(entities), dtype=bool)
+    train_ent[train[:, 0]] = train_ent[train[:, 2]] = True
+    train_rel = np.zeros(len(relations), dtype=bool)
+    train_rel[train[:, 1]] = True
+
+    ent_ids, entities, n_train_entities = _train_first_ids(entities, used_ent, train_ent)
+    rel_ids, relations, n_train_relations = _train_first_ids(relations, used_rel, train_rel)
+
+    os.makedirs(dataset_dir, exist_ok=True)
+    for name, X in arrays.items():
+        encoded = np.stack([ent_ids[X[:, 0]], rel_ids[X[:, 1]], ent_ids[X[:, 2]]], axis=1)
+        np.save(os.path.join(dataset_dir, f"{name}.npy"), encoded.astype(np.int32))
+    with open(os.path.join(dataset_dir, "entities.json"), "w", encoding="utf-8") as f:
+        json.dump(list(entities), f, ensure_ascii=False)
+    with open(os.path.join(dataset_dir, "relations.json"), "w", encoding="utf-8") as f:
+        json.dump(list(relations), f, ensure_ascii=False)
+    meta = {
+        "n_entities": len(entities),
+        "n_relations": len(relations),
+        "n_train_entities": n_train_entities,
+        "n_train_relations": n_train_relations,
+        "n_triples": {name: len(X) for name, X in arrays.items()},
+    }
+    with open(os.path.join(dataset_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def save_dataset(splits, dataset_dir=DATASET_DIR):
+    # splits: {"train": df, "valid": df, "test": df} with head/relation/tail string columns
+    splits = {name: _drop_missing(df) for name, df in splits.items()}
+    entities = pd.Index(pd.unique(pd.concat([df[c] for df in splits.values() for c in ("head", "tail")])))
+    relations = pd.Index(pd.unique(pd.concat([df["relation"] for df in splits.values()])))
+    arrays = {
+        name: np.stack([entities.get_indexer(df["head"]),
+                        relations.get_indexer(df["relation"]),
+                        entities.get_indexer(df["tail"])], axis=1)
+        for name, df in splits.items()
+    }
+    return save_arrays(arrays, entities.to_numpy(dtype=object), relations.to_numpy(dtype=object), dataset_dir)
+
+
+def load_dataset(dataset_dir=DATASET_DIR, mmap=True, vocab=True):
+    with open(os.path.join(dataset_dir, "meta.json")) as f:
+        meta = json.load(f)
+    mode = "r" if mmap else None
+    arrays = {name: np.load(os.path.join(dataset_dir, f"{name}.npy"), mmap_mode=mode) for name in SPLITS}
+    entities = relations = None
+    if vocab:
+        with open(os.path.join(dataset_dir, "entities.json"), encoding="utf-8") as f:
+            entities = np.array(json.load(f), dtype=object)
+        with open(os.path.join(dataset_dir, "relations.json"), encoding="utf-8") as f:
+            relations = np.array(json.load(f), dtype=object)
+    return KGDataset(arrays["train"], arrays["valid"], arrays["test"], entities, relations,
+                     meta["n_train_entities"], meta["n_train_relations"])
+
+
+def read_tsv_splits(tsv_files=TSV_FILES):
+    return {
+        name: pd.read_csv(path, sep="\t", names=["head", "relation", "tail"], dtype=str)
+        for name, path in tsv_files.items()
+    }
+
+
+def load_or_build(dataset_dir=DATASET_DIR, tsv_files=TSV_FILES, mmap=True, vocab=True):
+    # Encode the TSV splits once; later runs just map the .npy files
+    meta_path = os.path.join(dataset_dir, "meta.json")
+    tsv_times = [os.path.getmtime(path) for path in tsv_files.values() if os.path.exists(path)]
+    if not os.path.exists(meta_path) or (tsv_times and os.path.getmtime(meta_path) < max(tsv_times)):
+        save_dataset(read_tsv_splits(tsv_files), dataset_dir)
+    return load_dataset(dataset_dir, mmap=mmap, vocab=vocab)
+
+
+def known_to_train(X, dataset):
+    # Keep triples whose entities and relation all appear in train
+    keep = ((X[:, 0] < dataset.n_train_entities) & (X[:, 2] < dataset.n_train_entities)
+            & (X[:, 1] < dataset.n_train_relations))
+    return np.asarray(X[keep], dtype=int)
+
+
+# ——— Packed triple keys ———
+# A triple packs into one int64 key ((h * R) + r) * E + t, so a whole batch is
+# checked against a sorted array of keys with a single searchsorted instead of
+# a set lookup per triple. triple_keys only uses indexing and arithmetic, so it
+# also packs torch tensors.
+def triple_keys(triples, num_entities, num_relations):
+    return (triples[..., 0] * num_relations + triples[..., 1]) * num_entities + triples[..., 2]
+
+
+def find_keys(sorted_keys, keys):
+    # Position of each key in sorted_keys and whether it is there
+    if not len(sorted_keys):
+        return np.zeros(np.shape(keys), dtype=np.int64), np.zeros(np.shape(keys), dtype=bool)
+    pos = np.searchsorted(sorted_keys, keys).clip(max=len(sorted_keys) - 1)
+    return pos, sorted_keys[pos] == keys
+
+
+# ——— Stratified split on integer triples ———
+# The same two steps as the old train_test_split calls: train vs held-out
+# (valid + test), then valid vs test on the held-out triples. Relations with
+# fewer than min_count triples (counted again within the held-out part for
+# the second step) share one "rare" stratum. Each step sizes its strata the way
+# sklearn's stratified split does (_allocate), and takes that many triples of
+# each stratum at random. Held-out triples whose head, tail or relation never
+# made it into train are then moved to train, so C3/C4 no longer have to drop
+# them.
+def _allocate(counts, n_draws, rng):
+    # sklearn's _approximate_mode: n_draws spread over the strata in proportion
+    # to counts, the remainder going to the largest fractional parts (ties at random)
+    continuous = counts / counts.sum() * n_draws
+    floored = np.floor(continuous).astype(int)
+    need = n_draws - floored.sum()
+    if need > 0:
+        floored[np.lexsort((rng.random(len(counts)), floored - continuous))[:need]] += 1
+    return floored
+
+
+def _stratified_pick(relations, n_draws, min_count, rng):
+    # Mask of n_draws positions, stratified by relation as described above
+    counts = np.bincount(relations)
+    stratum = np.where(counts[relations] >= min_count, relations, -1)
+    names, inverse, sizes = np.unique(stratum, return_inverse=True, return_counts=True)
+    quota = _allocate(sizes, n_draws, rng)
+    order = np.lexsort((rng.random(len(relations)), inverse))
+    rank = np.empty(len(relations), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return rank < quota[inverse]
+
+
+def split_triples(triples, fractions=(0.8, 0.1, 0.1), seed=42, min_count=3):
+    triples = np.asarray(triples)
+    rng = np.random.default_rng(seed)
+    relations = triples[:, 1]
+    counts = np.bincount(relations, minlength=1)
+    held_fraction = fractions[1] + fractions[2]
+
+    split = np.zeros(len(triples), dtype=np.int8)
+    if len(triples):
+        n_held = int(np.ceil(len(triples) * held_fraction))
+        held = np.flatnonzero(~_stratified_pick(relations, len(triples) - n_held, min_count, rng))
+        n_test = int(np.ceil(len(held) * fractions[2] / held_fraction))
+        is_valid = _stratified_pick(relations[held], len(held) - n_test, min_count, rng)
+        split[held] = np.where(is_valid, 1, 2)
+
+    # Entity / relation coverage: held-out triples must only use train vocabulary
+    train = triples[split == 0]
+    in_train_ent = np.zeros(triples[:, [0, 2]].max() + 1 if len(triples) else 0, dtype=bool)
+    in_train_ent[train[:, 0]] = in_train_ent[train[:, 2]] = True
+    in_train_rel = np.zeros(len(counts), dtype=bool)
+    in_train_rel[train[:, 1]] = True
+    uncovered = (split > 0) & ~(in_train_ent[triples[:, 0]] & in_train_ent[triples[:, 2]]
+                                & in_train_rel[relations])
+    split[uncovered] = 0
+
+    return {
+        "train": np.flatnonzero(split == 0),
+        "valid": np.flatnonzero(split == 1),
+        "test": np.flatnonzero(split == 2),
+    }, int(uncovered.sum())
+
+
+def write_tsv(path, triples, entities, relations, chunksize=1_000_000):
+    # Writes id triples as head/relation/tail strings, one chunk at a time
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for start in range(0, len(triples), chunksize):
+            chunk = triples[start:start + chunksize]
+            pd.DataFrame({
+                "head": entities[chunk[:, 0]],
+                "relation": relations[chunk[:, 1]],
+                "tail": entities[chunk[:, 2]],
+            }).to_csv(f, sep="\t", index=False, header=False)
+
+
+# ——— Vocabulary lookups ———
+# Hashed pd.Index over the cached vocabularies: whole arrays of names are mapped
+# with one get_indexer call instead of a dict lookup per triple.
+Vocab = namedtuple("Vocab", ["entities", "relations"])
+
+
+def build_vocab(dataset):
+    return Vocab(pd.Index(dataset.entities), pd.Index(dataset.relations))
+
+
+def map_and_filter(X_raw, dataset, vocab=None):
+    # String (head, relation, tail) triples -> id triples known to train
+    vocab = vocab or build_vocab(dataset)
+    X_raw = np.asarray(X_raw, dtype=object).reshape(-1, 3)
+    ids = np.stack([vocab.entities.get_indexer(X_raw[:, 0]),
+                    vocab.relations.get_indexer(X_raw[:, 1]),
+                    vocab.entities.get_indexer(X_raw[:, 2])], axis=1)
+    return known_to_train(ids[(ids >= 0).all(axis=1)], dataset)
+
+
+def ids_with_prefix(names, prefix):
+    # Ids of the names starting with prefix (e.g. an instance# URI prefix)
+    return np.flatnonzero(pd.Series(names, dtype=object).str.startswith(prefix, na=False).to_numpy())
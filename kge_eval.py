@@ -0,0 +1,260 @@
+import numpy as np
+
+from entity_search import type_groups
+
+# ——— Filtered-rank evaluation (MRR / Hits@N) ———
+# Same protocol as ampligraph's evaluate_performance(filter_triples=..., corrupt_side='s,o')
+# with its default "worst" ranking: every test triple is scored against all
+# head and all tail corruptions, corruptions that are known triples (and the
+# test triple itself) are left out, and the rank is 1 + the number of remaining
+# corruptions scoring at least as high. ampligraph gives the same ranks when the
+# filter contains the test triples (e.g. train + valid + test); with a filter
+# that leaves them out it counts the positive among its own corruptions and
+# returns one more. Scores come from the exported embedding matrices, a block of
+# test triples x all entities at a time. Like ampligraph, scores are compared
+# after truncating score * COMPARISON_PRECISION to an integer, so near-equal
+# scores tie (precision=None compares the raw floats).
+DEFAULT_BLOCK_ELEMENTS = 32_000_000   # floats per score block (~128 MB)
+COMPARISON_PRECISION = 1e3
+
+
+# ——— Filter index ———
+# Known triples as two CSR maps: key (h, r) -> sorted tails, key (r, t) -> sorted
+# heads. Keys are kept as a sorted array of the keys that exist (not E x R
+# rows), so the index stays proportional to the number of known triples.
+class CSRMap:
+    def __init__(self, keys, values):
+        order = np.lexsort((values, keys))
+        keys, self.values = keys[order], values[order]
+        self.keys, starts = np.unique(keys, return_index=True)
+        self.indptr = np.append(starts, len(keys))
+
+    def gather(self, query_keys):
+        # Flattened (row, value) pairs for every query key that has values
+        if not len(self.keys):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        pos = np.searchsorted(self.keys, query_keys).clip(max=len(self.keys) - 1)
+        rows = np.flatnonzero(self.keys[pos] == query_keys)
+        starts, ends = self.indptr[pos[rows]], self.indptr[pos[rows] + 1]
+        counts = ends - starts
+        row_of = np.repeat(rows, counts)
+        # start of each run + position inside the run
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return row_of, self.values[np.repeat(starts, counts) + offsets]
+
+
+class FilterIndex:
+    def __init__(self, triples, num_relations):
+        triples = np.asarray(triples, dtype=np.int64)
+        self.num_relations = num_relations
+        h, r, t = triples[:, 0], triples[:, 1], triples[:, 2]
+        self.by_head = CSRMap(h * num_relations + r, t)
+        self.by_tail = CSRMap(t * num_relations + r, h)
+
+    def known_tails(self, h, r):
+        return self.by_head.gather(np.asarray(h, dtype=np.int64) * self.num_relations + r)
+
+    def known_heads(self, r, t):
+        return self.by_tail.gather(np.asarray(t, dtype=np.int64) * self.num_relations + r)
+
+
+# ——— Scoring from embedding matrices ———
+class KGEScorer:
+    def __init__(self, entity_matrix, relation_matrix, scoring_type, norm=1):
+        self.E = np.ascontiguousarray(entity_matrix, dtype=np.float32)
+        self.R = np.ascontiguousarray(relation_matrix, dtype=np.float32)
+        self.scoring_type = scoring_type
+        self.norm = norm
+        if scoring_type not in ("TransE", "DistMult", "ComplEx"):
+            raise ValueError(f"unsupported scoring type {scoring_type!r}")
+
+    @property
+    def num_entities(self):
+        return len(self.E)
+
+    @classmethod
+    def from_ampligraph(cls, model, num_entities, num_relations):
+        # Rows re-ordered so that row i belongs to our entity / relation id i
+        indexer = model.data_indexer
+        ent_rows = indexer.get_indexes(np.arange(num_entities), type_of="e", order="raw2ind")
+        rel_rows = indexer.get_indexes(np.arange(num_relations), type_of="r", order="raw2ind")
+        ent_emb = model.encoding_layer.ent_emb.numpy()
+        rel_emb = model.encoding_layer.rel_emb.numpy()
+        return cls(ent_emb[np.asarray(ent_rows, dtype=np.int64)],
+                   rel_emb[np.asarray(rel_rows, dtype=np.int64)], model.scoring_type)
+
+    def score(self, h, r, t):
+        hv, rv, tv = self.E[h], self.R[r], self.E[t]
+        if self.scoring_type == "TransE":
+            return -np.linalg.norm(hv + rv - tv, ord=self.norm, axis=1)
+        if self.scoring_type == "DistMult":
+            return np.einsum("ij,ij,ij->i", hv, rv, tv)
+        return np.einsum("ij,ij->i", self._complex_query(hv, rv), tv)
+
+    @staticmethod
+    def _complex_query(xv, rv, head_side=False):
+        # The ComplEx score Re(<h, r, conj(t)>) is linear in either end, so all
+        # corruptions of one side are a single product q @ E.T:
+        #   tails (xv = h): q = [Re(h r), Im(h r)]
+        #   heads (xv = t): q = [Re(r conj(t)), -Im(r conj(t))]
+        xr, xi = np.split(xv, 2, axis=1)
+        rr, ri = np.split(rv, 2, axis=1)
+        if head_side:
+            return np.concatenate([rr * xr + ri * xi, rr * xi - ri * xr], axis=1)
+        return np.concatenate([xr * rr - xi * ri, xr * ri + xi * rr], axis=1)
+
+    def score_tails(self, h, r, block=None):
+        # (B,) heads x relations -> (B, num_entities) scores of every tail
+        hv, rv = self.E[h], self.R[r]
+        if self.scoring_type == "TransE":
+            return self._transe_all(hv + rv, block)
+        if self.scoring_type == "DistMult":
+            return (hv * rv) @ self.E.T
+        return self._complex_query(hv, rv) @ self.E.T
+
+    def score_heads(self, r, t, block=None):
+        # (B,) relations x tails -> (B, num_entities) scores of every head
+        rv, tv = self.R[r], self.E[t]
+        if self.scoring_type == "TransE":
+            return self._transe_all(tv - rv, block)
+        if self.scoring_type == "DistMult":
+            return (rv * tv) @ self.E.T
+        return self._complex_query(tv, rv, head_side=True) @ self.E.T
+
+    def _transe_all(self, queries, block):
+        # -||x - q|| for every entity x: tails with q = h + r, heads with q = t - r
+        out = np.empty((len(queries), len(self.E)), dtype=np.float32)
+        block = block or max(1, DEFAULT_BLOCK_ELEMENTS // (len(queries) * self.E.shape[1]))
+        for start in range(0, len(self.E), block):
+            diff = self.E[None, start:start + block, :] - queries[:, None, :]
+            out[:, start:start + block] = -np.linalg.norm(diff, ord=self.norm, axis=2)
+        return out
+
+
+# ——— Ranks ———
+def _side_ranks(scores, known_rows, known_ents, true_ents, strategy, precision=None):
+    if precision:
+        scores = np.trunc(scores * np.float32(precision))
+    # The positive's score is read from the same matrix, so it ties exactly with itself
+    pos_scores = scores[np.arange(len(scores)), true_ents].copy()
+    scores[known_rows, known_ents] = -np.inf
+    scores[np.arange(len(scores)), true_ents] = -np.inf
+    higher = (scores > pos_scores[:, None]).sum(axis=1)
+    ties = (scores == pos_scores[:, None]).sum(axis=1)
+    if strategy == "worst":
+        return higher + ties + 1
+    if strategy == "best":
+        return higher + 1
+    return higher + ties // 2 + 1   # "middle"
+
+
+def iter_ranks(X, scorer, filter_index=None, corrupt_side="s,o", strategy="worst",
+               block_elements=DEFAULT_BLOCK_ELEMENTS, precision=COMPARISON_PRECISION):
+    # Yields (start, ranks) per block of test triples; ranks is (B, 2) for 's,o'
+    # (head rank, tail rank) and (B,) for a single side, like ampligraph
+    X = np.asarray(X, dtype=np.int64)
+    sides = corrupt_side.split(",")
+    batch = max(1, block_elements // max(scorer.num_entities, 1))
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    for start in range(0, len(X), batch):
+        h, r, t = X[start:start + batch].T
+        columns = []
+        if "s" in sides:
+            rows, ents = filter_index.known_heads(r, t) if filter_index else empty
+            columns.append(_side_ranks(scorer.score_heads(r, t), rows, ents, h, strategy, precision))
+        if "o" in sides:
+            rows, ents = filter_index.known_tails(h, r) if filter_index else empty
+            columns.append(_side_ranks(scorer.score_tails(h, r), rows, ents, t, strategy, precision))
+        yield start, np.stack(columns, axis=1) if len(columns) > 1 else columns[0]
+
+
+def evaluate_ranks(X, scorer, filter_index=None, corrupt_side="s,o", strategy="worst",
+                   block_elements=DEFAULT_BLOCK_ELEMENTS, precision=COMPARISON_PRECISION):
+    blocks = [ranks for _, ranks in iter_ranks(X, scorer, filter_index, corrupt_side, strategy,
+                                               block_elements, precision)]
+    return np.concatenate(blocks) if blocks else np.empty((0, 2), dtype=np.int64)
+
+
+# ——— Streaming breakdown ———
+# Running sums per group (count, sum of 1/rank, hits@1/3/10), updated one rank
+# block at a time with np.bincount, so the breakdown costs one pass over the ranks
+# and never needs them all in memory. Groups: the relation of the test triple,
+# and the type of the entity being predicted (the head for head ranks, the tail
+# for tail ranks).
+HITS_AT = (1, 3, 10)
+
+
+class RankBreakdown:
+    def __init__(self, relation_names, entity_groups, group_names):
+        # entity_groups: group id per entity id; group_names: name per group id
+        self.relation_names = list(relation_names)
+        self.entity_groups = np.asarray(entity_groups, dtype=np.int64)
+        self.group_names = list(group_names)
+        self.by_relation = np.zeros((len(self.relation_names), 2 + len(HITS_AT)))
+        self.by_type = np.zeros((len(self.group_names), 2 + len(HITS_AT)))
+
+    @staticmethod
+    def _add(table, keys, ranks):
+        ranks = ranks.astype(np.float64)
+        n = len(table)
+        table[:, 0] += np.bincount(keys, minlength=n)
+        table[:, 1] += np.bincount(keys, weights=1.0 / ranks, minlength=n)
+        for j, k in enumerate(HITS_AT):
+            table[:, 2 + j] += np.bincount(keys, weights=ranks <= k, minlength=n)
+
+    def update(self, X, ranks):
+        # X: (B, 3) test triples, ranks: (B, 2) head / tail ranks from iter_ranks
+        X = np.asarray(X, dtype=np.int64)
+        self._add(self.by_relation, np.concatenate([X[:, 1], X[:, 1]]), ranks.T.ravel())
+        self._add(self.by_type, self.entity_groups[np.concatenate([X[:, 0], X[:, 2]])], ranks.T.ravel())
+
+    def rows(self):
+        out = []
+        for group, names, table in (("relation", self.relation_names, self.by_relation),
+                                    ("entity_type", self.group_names, self.by_type)):
+            for name, stats in zip(names, table):
+                if stats[0]:
+                    row = {"group": group, "key": name, "n": int(stats[0]), "MRR": stats[1] / stats[0]}
+                    row.update({f"Hits@{k}": stats[2 + j] / stats[0] for j, k in enumerate(HITS_AT)})
+                    out.append(row)
+        return out
+
+
+def dataset_breakdown(dataset):
+    # Relations and instance#<Type>_ groups of the train vocabulary (needs vocab=True)
+    codes, names = type_groups(dataset.entities[:dataset.n_train_entities])
+    return RankBreakdown(dataset.relations[:dataset.n_train_relations], codes, names)
+
+
+def mrr_score(ranks):
+    return float(np.mean(1.0 / np.asarray(ranks).ravel()))
+
+
+def hits_at_n_score(ranks, n):
+    return float(np.mean(np.asarray(ranks).ravel() <= n))
+
+
+def summarize(ranks):
+    return {"MRR": mrr_score(ranks), "Hits@1": hits_at_n_score(ranks, 1),
+            "Hits@3": hits_at_n_score(ranks, 3), "Hits@10": hits_at_n_score(ranks, 10)}
+
+
+def evaluate_model(X, model, filter_triples, num_entities, num_relations, corrupt_side="s,o",
+                   backend="local", breakdown=None):
+    # Ranks for a fitted ampligraph model; backend="ampligraph" runs ampligraph's
+    # own evaluate_performance instead, to cross-check the two. breakdown: a
+    # RankBreakdown fed every rank block as it is computed ('s,o' only).
+    if backend == "ampligraph":
+        from ampligraph.compat import evaluate_performance
+        ranks = evaluate_performance(X, model=model, filter_triples=filter_triples,
+                                     corrupt_side=corrupt_side, batch_size=256)
+        if breakdown is not None:
+            breakdown.update(X, ranks)
+        return ranks
+    scorer = KGEScorer.from_ampligraph(model, num_entities, num_relations)
+    blocks = []
+    for start, ranks in iter_ranks(X, scorer, FilterIndex(filter_triples, num_relations), corrupt_side):
+        if breakdown is not None:
+            breakdown.update(X[start:start + len(ranks)], ranks)
+        blocks.append(ranks)
+    return np.concatenate(blocks) if blocks else np.empty((0, 2), dtype=np.int64)
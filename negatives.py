@@ -0,0 +1,74 @@
+import numpy as np
+
+import kg_dataset
+
+# ——— Vectorized negatives for triple classification ———
+# Every positive gets n corruptions in one shot: the head or tail is replaced by
+# a uniformly drawn entity, optionally only from the entities of the same
+# instance type (an author by an author). A batch is checked against the known
+# triples through their sorted packed keys (kg_dataset.triple_keys /
+# find_keys). Clashes are redrawn a few times; whatever still clashes is
+# reported in the valid mask.
+
+
+class NegativeSampler:
+    def __init__(self, known_triples, num_entities, num_relations, entity_groups=None, seed=0):
+        # entity_groups: group id per entity id (None = corrupt with any entity)
+        self.num_entities = num_entities
+        self.num_relations = num_relations
+        self.keys = np.unique(self.encode(np.asarray(known_triples, dtype=np.int64)))
+        self.rng = np.random.default_rng(seed)
+        if entity_groups is None:
+            entity_groups = np.zeros(num_entities, dtype=np.int64)
+        self.groups = np.asarray(entity_groups, dtype=np.int64)
+        # Entities sorted by group: group g owns pool[start[g]:start[g] + size[g]]
+        self.pool = np.argsort(self.groups, kind="stable")
+        self.size = np.bincount(self.groups)
+        self.start = np.concatenate([[0], np.cumsum(self.size)[:-1]])
+
+    def encode(self, triples):
+        return kg_dataset.triple_keys(triples, self.num_entities, self.num_relations)
+
+    def contains(self, triples):
+        return kg_dataset.find_keys(self.keys, self.encode(np.asarray(triples, dtype=np.int64)))[1]
+
+    def _draw(self, entities):
+        # A random entity from the same group as each of `entities`
+        groups = self.groups[entities]
+        offset = (self.rng.random(entities.shape) * self.size[groups]).astype(np.int64)
+        return self.pool[self.start[groups] + offset]
+
+    def _corrupt(self, positive, on_head):
+        negative = positive.copy()
+        column = np.where(on_head, 0, 2)
+        original = np.take_along_axis(negative, column[..., None], axis=-1)[..., 0]
+        np.put_along_axis(negative, column[..., None], self._draw(original)[..., None], axis=-1)
+        return negative
+
+    def sample(self, positives, n=1, side="o", retries=5):
+        # (B, 3) positives -> (B, n, 3) negatives and a (B, n) valid mask.
+        # side: "s" (heads), "o" (tails) or "s,o" (either, half and half)
+        positive = np.repeat(np.asarray(positives, dtype=np.int64)[:, None, :], n, axis=1)
+        if side == "s,o":
+            on_head = self.rng.random(positive.shape[:2]) < 0.5
+        else:
+            on_head = np.full(positive.shape[:2], side == "s")
+        negative = self._corrupt(positive, on_head)
+        clash = self.contains(negative) | (negative == positive).all(axis=-1)
+        for _ in range(retries):
+            if not clash.any():
+                break
+            redraw = self._corrupt(positive[clash], on_head[clash])
+            negative[clash] = redraw
+            clash[clash] = self.contains(redraw) | (redraw == positive[clash]).all(axis=-1)
+        return negative, ~clash
+
+
+def classification_set(sampler, positives, n=1, side="o"):
+    # Positives followed by their valid negatives, with 1 / 0 labels
+    positives = np.asarray(positives, dtype=np.int64)
+    negative, valid = sampler.sample(positives, n, side)
+    negative = negative[valid]
+    X = np.vstack([positives, negative])
+    y = np.concatenate([np.ones(len(positives)), np.zeros(len(negative))])
+    return X, y
@@ -0,0 +1,65 @@
+import numpy as np
+from sklearn.decomposition import PCA, IncrementalPCA
+
+# ——— PCA for embedding matrices, fitted once and reused ———
+# "randomized" fits sklearn's randomized SVD (a few passes over the data rather
+# than a full SVD); "incremental" streams the rows batch by batch through
+# IncrementalPCA, so a memory-mapped embedding file is never loaded whole;
+# "full" is the exact PCA. Whatever the method, the fit is kept as a Projection
+# (mean + components) saved to .npz: entities added later are projected with
+# it, without refitting, and the transform also runs a chunk of rows at a time.
+METHODS = ("randomized", "incremental", "full")
+DEFAULT_BATCH = 65_536
+
+
+def save_matrix(path, matrix):
+    # Writes a float32 .npy and returns it memory-mapped read-only
+    np.save(path, np.ascontiguousarray(matrix, dtype=np.float32))
+    return np.load(path, mmap_mode="r")
+
+
+class Projection:
+    def __init__(self, mean, components, explained_variance_ratio):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.explained_variance_ratio = np.asarray(explained_variance_ratio, dtype=np.float64)
+
+    @property
+    def n_components(self):
+        return len(self.components)
+
+    @classmethod
+    def fit(cls, X, n_components, method="randomized", batch_size=DEFAULT_BATCH, seed=0):
+        if method not in METHODS:
+            raise ValueError(f"unknown PCA method {method!r}, expected one of {METHODS}")
+        if method == "incremental":
+            # Every batch needs at least n_components rows; a short tail is merged
+            # into the batch before it
+            batch_size = max(batch_size, n_components)
+            pca = IncrementalPCA(n_components=n_components)
+            starts = list(range(0, len(X), batch_size))
+            if len(starts) > 1 and len(X) - starts[-1] < n_components:
+                starts.pop()
+            for i, start in enumerate(starts):
+                end = starts[i + 1] if i + 1 < len(starts) else len(X)
+                pca.partial_fit(np.asarray(X[start:end], dtype=np.float32))
+        else:
+            pca = PCA(n_components=n_components, svd_solver=method, random_state=seed)
+            pca.fit(np.asarray(X, dtype=np.float32))
+        return cls(pca.mean_, pca.components_, pca.explained_variance_ratio_)
+
+    def transform(self, X, batch_size=DEFAULT_BATCH):
+        out = np.empty((len(X), self.n_components), dtype=np.float32)
+        for start in range(0, len(X), batch_size):
+            out[start:start + batch_size] = (np.asarray(X[start:start + batch_size], dtype=np.float32)
+                                             - self.mean) @ self.components.T
+        return out
+
+    def save(self, path):
+        np.savez(path, mean=self.mean, components=self.components,
+                 explained_variance_ratio=self.explained_variance_ratio)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"], data["explained_variance_ratio"])
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import calibration
+
+# Per-relation calibration: Platt scaling against sklearn, thresholds against a
+# brute-force sweep, and the global fallback for relations with too few triples.
+
+
+def fixture(seed=0, n=400, n_groups=3):
+    rng = np.random.default_rng(seed)
+    groups = rng.integers(0, n_groups, n)
+    labels = (rng.random(n) < 0.5).astype(float)
+    # Each group on its own scale, positives shifted up
+    scores = (labels * 1.5 + rng.normal(size=n)) * (groups + 1) + groups
+    return scores, groups, labels
+
+
+def test_platt_fit_matches_sklearn_logistic_regression():
+    scores, _, labels = fixture()
+    groups = np.zeros(len(scores), dtype=np.int64)
+    a, b = calibration.platt_fit(scores, groups, labels, 1)
+    # Platt's smoothed targets as sample weights on a positive and a negative copy
+    n_pos = labels.sum()
+    n_neg = len(labels) - n_pos
+    target = np.where(labels > 0, (n_pos + 1) / (n_pos + 2), 1 / (n_neg + 2))
+    X = np.concatenate([scores, scores])[:, None]
+    y = np.concatenate([np.ones(len(scores)), np.zeros(len(scores))])
+    weights = np.concatenate([target, 1 - target])
+    reference = LogisticRegression(C=np.inf, tol=1e-10, max_iter=10_000).fit(X, y, sample_weight=weights)
+    assert a[0] == pytest.approx(reference.coef_[0, 0], rel=1e-4)
+    assert b[0] == pytest.approx(reference.intercept_[0], rel=1e-4, abs=1e-6)
+
+
+def test_platt_fit_groups_match_separate_fits():
+    scores, groups, labels = fixture(1)
+    a, b = calibration.platt_fit(scores, groups, labels, 3)
+    for g in range(3):
+        mask = groups == g
+        a_g, b_g = calibration.platt_fit(scores[mask], np.zeros(mask.sum(), dtype=np.int64), labels[mask], 1)
+        assert a[g] == pytest.approx(a_g[0]) and b[g] == pytest.approx(b_g[0])
+
+
+def test_best_thresholds_match_brute_force():
+    scores, groups, labels = fixture(2, n=150)
+    scores = np.round(scores, 1)   # ties
+    thresholds = calibration.best_thresholds(scores, groups, labels, 4)
+    for g in range(3):
+        s, y = scores[groups == g], labels[groups == g]
+        accuracy = {t: ((s >= t) == (y > 0)).mean() for t in np.unique(s)}
+        assert accuracy[thresholds[g]] == pytest.approx(max(accuracy.values()))
+    assert np.isnan(thresholds[3])
+
+
+def test_small_and_one_class_relations_fall_back_to_global():
+    scores, groups, labels = fixture(3)
+    # Relation 3: below MIN_TRIPLES; relation 4: enough triples but only positives
+    scores = np.concatenate([scores, [0.5, 1.0, 2.0], np.linspace(0, 1, 20)])
+    groups = np.concatenate([groups, [3, 3, 3], np.full(20, 4)])
+    labels = np.concatenate([labels, [1, 0, 1], np.ones(20)])
+    calib = calibration.RelationCalibration.fit(scores, groups, labels, 6)
+    everything = np.zeros(len(scores), dtype=np.int64)
+    global_a, global_b = calibration.platt_fit(scores, everything, labels, 1)
+    global_t = calibration.best_thresholds(scores, everything, labels, 1)
+    for relation in (3, 4, 5):
+        np.testing.assert_allclose(calib.table[relation], [global_a[0], global_b[0], global_t[0]])
+    own_a, own_b = calibration.platt_fit(scores, groups, labels, 6)
+    np.testing.assert_allclose(calib.table[:3, 0], own_a[:3])
+    np.testing.assert_allclose(calib.table[:3, 1], own_b[:3])
+    assert not np.allclose(calib.table[:3], calib.table[3])
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import train_test_split
+
+import kg_dataset
+
+# split_triples: the splits partition the input, held-out triples only use
+# train entities and relations, and the stratum sizes follow the old two-step
+# train_test_split of C1.
+MIN_COUNT = 3
+
+
+def random_triples(seed, n_entities=6):
+    rng = np.random.default_rng(seed)
+    # A few frequent relations, plus rare ones that share the "rare" stratum
+    sizes = np.concatenate([rng.integers(5, 80, 6), [1, 2, 2, 1]])
+    relations = np.repeat(np.arange(len(sizes)), sizes)
+    return np.stack([rng.integers(0, n_entities, len(relations)), relations,
+                     rng.integers(0, n_entities, len(relations))], axis=1)
+
+
+def old_split(triples):
+    # The original C1 make_splits (relation names as strings, as they were)
+    df = pd.DataFrame({"relation": [f"r{r}" for r in triples[:, 1]]})
+
+    def stratum(frame):
+        counts = frame["relation"].value_counts()
+        return frame["relation"].map(lambda r: r if counts[r] >= MIN_COUNT else "rare")
+
+    train, temp = train_test_split(df, test_size=0.2, random_state=42, stratify=stratum(df))
+    valid, test = train_test_split(temp, test_size=0.5, random_state=42, stratify=stratum(temp))
+    return train, valid, test, stratum(temp)
+
+
+def relation_counts(relations, n):
+    return np.bincount(np.asarray(relations, dtype=np.int64), minlength=n)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_splits_partition_the_input_and_cover_heldout(seed):
+    triples = random_triples(seed, n_entities=200)
+    splits, moved = kg_dataset.split_triples(triples, seed=seed)
+    everything = np.concatenate([splits["train"], splits["valid"], splits["test"]])
+    np.testing.assert_array_equal(np.sort(everything), np.arange(len(triples)))
+    assert moved > 0     # 200 entities over a few hundred triples: coverage has work to do
+
+    train = triples[splits["train"]]
+    for name in ("valid", "test"):
+        held = triples[splits[name]]
+        assert np.isin(held[:, [0, 2]], train[:, [0, 2]]).all()
+        assert np.isin(held[:, 1], train[:, 1]).all()
+
+
+# Seeds for which the old split runs at all: train_test_split refuses a
+# held-out "rare" stratum with a single triple
+@pytest.mark.parametrize("seed", [0, 1, 5, 14, 22])
+def test_stratum_sizes_match_old_train_test_split(seed):
+    # Few entities, so nothing is moved and the sizes are the stratified ones
+    triples = random_triples(seed)
+    splits, moved = kg_dataset.split_triples(triples, seed=seed, min_count=MIN_COUNT)
+    assert moved == 0
+    train, valid, test, held_stratum = old_split(triples)
+    n = triples[:, 1].max() + 1
+
+    def old_counts(frame):
+        return relation_counts(frame["relation"].str[1:].astype(int), n)
+
+    # Train vs held-out: same size for every relation that has its own stratum
+    frequent = relation_counts(triples[:, 1], n) >= MIN_COUNT
+    ours = relation_counts(triples[splits["train"], 1], n)
+    np.testing.assert_array_equal(ours[frequent], old_counts(train)[frequent])
+    assert ours.sum() == len(train)
+    # Valid vs test: same totals; per held-out stratum the sizes only differ
+    # where sklearn breaks a tie (an odd stratum split in half) at random
+    assert len(splits["valid"]) == len(valid) and len(splits["test"]) == len(test)
+    held_counts = relation_counts(triples[np.concatenate([splits["valid"], splits["test"]]), 1], n)
+    own = held_counts >= MIN_COUNT
+    diff = relation_counts(triples[splits["valid"], 1], n) - old_counts(valid)
+    assert np.abs(diff[own]).max(initial=0) <= 1
+    assert (diff[own & (held_counts % 2 == 0)] == 0).all()
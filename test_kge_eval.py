@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+import kge_eval
+
+# Filtered ranks from kge_eval against a naive loop over every corruption, and
+# (when ampligraph is installed) against ampligraph's own evaluate_performance.
+NUM_ENTITIES, NUM_RELATIONS, DIM = 60, 4, 8
+
+
+def random_triples(rng, n):
+    return np.stack([rng.integers(0, NUM_ENTITIES, n), rng.integers(0, NUM_RELATIONS, n),
+                     rng.integers(0, NUM_ENTITIES, n)], axis=1)
+
+
+def naive_ranks(X, scorer, known, precision):
+    # Worst-case filtered rank, one corruption at a time
+    known = {tuple(t) for t in known}
+
+    def key(score):
+        return np.trunc(np.float32(score) * np.float32(precision)) if precision else score
+
+    ranks = []
+    for h, r, t in X:
+        row = []
+        for side in (0, 2):
+            pos = key(scorer.score(np.array([h]), np.array([r]), np.array([t]))[0])
+            rank = 1
+            for e in range(NUM_ENTITIES):
+                corrupt = (e, r, t) if side == 0 else (h, r, e)
+                if corrupt == (h, r, t) or corrupt in known:
+                    continue
+                if key(scorer.score(*np.array([corrupt]).T)[0]) >= pos:
+                    rank += 1
+            row.append(rank)
+        ranks.append(row)
+    return np.array(ranks)
+
+
+@pytest.mark.parametrize("scoring_type", ["TransE", "DistMult", "ComplEx"])
+@pytest.mark.parametrize("precision", [None, kge_eval.COMPARISON_PRECISION])
+def test_ranks_match_naive_loop(scoring_type, precision):
+    rng = np.random.default_rng(0)
+    scorer = kge_eval.KGEScorer(rng.normal(size=(NUM_ENTITIES, DIM)), rng.normal(size=(NUM_RELATIONS, DIM)),
+                                scoring_type)
+    known, X = random_triples(rng, 300), random_triples(rng, 40)
+    filter_index = kge_eval.FilterIndex(known, NUM_RELATIONS)
+    # Small blocks so that several score blocks are stitched together
+    ranks = kge_eval.evaluate_ranks(X, scorer, filter_index, block_elements=NUM_ENTITIES * 7,
+                                    precision=precision)
+    np.testing.assert_array_equal(ranks, naive_ranks(X, scorer, known, precision))
+
+
+def test_breakdown_totals_match_global_metrics():
+    rng = np.random.default_rng(1)
+    X = random_triples(rng, 500)
+    ranks = rng.integers(1, 50, (len(X), 2))
+    groups = rng.integers(0, 3, NUM_ENTITIES)
+    breakdown = kge_eval.RankBreakdown(range(NUM_RELATIONS), groups, ["a", "b", "c"])
+    for start in range(0, len(X), 64):
+        breakdown.update(X[start:start + 64], ranks[start:start + 64])
+    for group in ("relation", "entity_type"):
+        rows = [row for row in breakdown.rows() if row["group"] == group]
+        n = sum(row["n"] for row in rows)
+        assert n == ranks.size
+        assert sum(row["n"] * row["MRR"] for row in rows) / n == pytest.approx(kge_eval.mrr_score(ranks))
+
+
+@pytest.mark.parametrize("scoring_type", ["TransE", "DistMult", "ComplEx"])
+def test_local_backend_matches_ampligraph(scoring_type):
+    pytest.importorskip("ampligraph")
+    from ampligraph.latent_features import ScoringBasedEmbeddingModel
+
+    rng = np.random.default_rng(2)
+    X_train = np.unique(random_triples(rng, 1500), axis=0)
+    # Every entity and relation appears in train, so all have an embedding
+    X_train = np.vstack([X_train, np.stack([np.arange(NUM_ENTITIES), np.arange(NUM_ENTITIES) % NUM_RELATIONS,
+                                            np.roll(np.arange(NUM_ENTITIES), 1)], axis=1)])
+    X_train = np.unique(X_train, axis=0)
+    known = {tuple(t) for t in X_train}
+    X_test = np.array([t for t in np.unique(random_triples(rng, 200), axis=0) if tuple(t) not in known])
+    model = ScoringBasedEmbeddingModel(eta=2, k=DIM, scoring_type=scoring_type, seed=0)
+    model.compile(optimizer="adam", loss="pairwise")
+    model.fit(X_train, batch_size=256, epochs=5, verbose=False)
+
+    X_filter = np.vstack([X_train, X_test])
+    local = kge_eval.evaluate_model(X_test, model, X_filter, NUM_ENTITIES, NUM_RELATIONS)
+    reference = kge_eval.evaluate_model(X_test, model, X_filter, NUM_ENTITIES, NUM_RELATIONS,
+                                        backend="ampligraph")
+    np.testing.assert_array_equal(local, np.asarray(reference))
+    scorer = kge_eval.KGEScorer.from_ampligraph(model, NUM_ENTITIES, NUM_RELATIONS)
+    np.testing.assert_allclose(scorer.score(*X_test.T), np.asarray(model.predict(X_test)).ravel(),
+                               rtol=1e-5, atol=1e-5)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import negatives
+
+# Negatives from NegativeSampler: never a known triple or the positive itself,
+# and with entity groups (C4's TYPE_CONSTRAINED) always of the replaced entity's type.
+NUM_ENTITIES, NUM_RELATIONS = 40, 3
+
+
+def known_triples(rng, n=600):
+    triples = np.stack([rng.integers(0, NUM_ENTITIES, n), rng.integers(0, NUM_RELATIONS, n),
+                        rng.integers(0, NUM_ENTITIES, n)], axis=1)
+    return np.unique(triples, axis=0)
+
+
+def test_contains_matches_set():
+    rng = np.random.default_rng(0)
+    known = known_triples(rng)
+    sampler = negatives.NegativeSampler(known, NUM_ENTITIES, NUM_RELATIONS)
+    probe = known_triples(rng, 300)
+    expected = [tuple(t) in {tuple(k) for k in known} for t in probe]
+    np.testing.assert_array_equal(sampler.contains(probe), expected)
+    assert not negatives.NegativeSampler(np.empty((0, 3)), NUM_ENTITIES, NUM_RELATIONS).contains(probe).any()
+
+
+@pytest.mark.parametrize("side", ["s", "o", "s,o"])
+@pytest.mark.parametrize("typed", [False, True])
+def test_valid_negatives_are_unknown_and_typed(side, typed):
+    rng = np.random.default_rng(1)
+    known = known_triples(rng)
+    groups = rng.integers(0, 4, NUM_ENTITIES) if typed else None
+    sampler = negatives.NegativeSampler(known, NUM_ENTITIES, NUM_RELATIONS, groups, seed=2)
+    positives = known[:200]
+    negative, valid = sampler.sample(positives, n=5, side=side)
+    assert valid.mean() > 0.9
+
+    known_set = {tuple(t) for t in known}
+    positive = np.repeat(positives[:, None, :], 5, axis=1)
+    assert not any(tuple(t) in known_set for t in negative[valid])
+    # Exactly one end replaced, the relation kept
+    changed = negative != positive
+    assert not changed[..., 1].any()
+    assert (changed[valid][:, [0, 2]].sum(axis=1) == 1).all()
+    if side != "s,o":
+        assert not changed[..., 2 if side == "s" else 0].any()
+    if typed:
+        column = np.where(changed[..., 0], 0, 2)
+        new = np.take_along_axis(negative, column[..., None], axis=-1)[..., 0]
+        old = np.take_along_axis(positive, column[..., None], axis=-1)[..., 0]
+        np.testing.assert_array_equal(groups[new[valid]], groups[old[valid]])
+
+
+def test_classification_set_labels():
+    rng = np.random.default_rng(3)
+    known = known_triples(rng)
+    sampler = negatives.NegativeSampler(known, NUM_ENTITIES, NUM_RELATIONS, seed=4)
+    X, y = negatives.classification_set(sampler, known[:50], n=2)
+    assert len(X) == len(y) and y[:50].all() and not y[50:].any()
+    np.testing.assert_array_equal(X[:50], known[:50])
+    assert not sampler.contains(X[50:]).any()
@@ -0,0 +1,86 @@
+import numpy as np
+
+import kge_eval
+from triple_scoring import CachedScorer
+
+# CachedScorer: scores equal the uncached scorer, least recently used entries
+# are evicted past capacity, and a saved cache only loads for its own tag.
+NUM_ENTITIES, NUM_RELATIONS, DIM = 50, 4, 8
+
+
+def make_scorer(seed=0):
+    rng = np.random.default_rng(seed)
+    return kge_eval.KGEScorer(rng.normal(size=(NUM_ENTITIES, DIM)), rng.normal(size=(NUM_RELATIONS, DIM)),
+                              "DistMult")
+
+
+def random_triples(rng, n):
+    return np.stack([rng.integers(0, NUM_ENTITIES, n), rng.integers(0, NUM_RELATIONS, n),
+                     rng.integers(0, NUM_ENTITIES, n)], axis=1)
+
+
+def test_scores_match_and_hits_are_counted():
+    rng = np.random.default_rng(1)
+    scorer = make_scorer()
+    cached = CachedScorer(scorer, chunk=16)
+    X = random_triples(rng, 100)
+    for _ in range(2):
+        np.testing.assert_allclose(cached.score(X), scorer.score(*X.T), rtol=1e-6)
+    unique = len(np.unique(X, axis=0))
+    assert cached.stats()["misses"] == unique and cached.stats()["hits"] == unique
+    assert (np.diff(cached.keys) > 0).all()
+
+
+def test_lru_eviction_past_capacity():
+    scorer = make_scorer()
+    cached = CachedScorer(scorer, capacity=4)
+    old, recent, new = np.array([[0, 0, 1], [0, 0, 2]]), np.array([[1, 1, 1], [1, 1, 2]]), \
+        np.array([[2, 2, 1], [2, 2, 2]])
+    cached.score(old)
+    cached.score(recent)
+    cached.score(old)        # old is now the most recently used
+    cached.score(new)        # evicts recent
+    assert len(cached.keys) == 4
+    assert set(cached.keys) == set(cached.encode(np.vstack([old, new])))
+    assert (np.diff(cached.keys) > 0).all()
+
+
+def test_save_load_round_trip(tmp_path):
+    rng = np.random.default_rng(2)
+    path = str(tmp_path / "cache.npz")
+    cached = CachedScorer(make_scorer())
+    X = random_triples(rng, 60)
+    cached.score(X[:30])
+    cached.score(X[30:])
+    cached.save(path, tag="weights-a")
+
+    loaded = CachedScorer(make_scorer())
+    assert loaded.load(path, tag="weights-a")
+    np.testing.assert_array_equal(loaded.keys, cached.keys)
+    np.testing.assert_array_equal(loaded.values, cached.values)
+    np.testing.assert_array_equal(loaded.last_used, cached.last_used)
+    loaded.score(X)
+    assert loaded.stats()["misses"] == 0
+
+    # Recency survives the round trip: the second batch outlives the first
+    small = CachedScorer(make_scorer(), capacity=len(np.unique(cached.encode(X[30:]))))
+    assert small.load(path, tag="weights-a")
+    assert set(small.keys) == set(cached.encode(X[30:]))
+
+
+def test_load_rejects_other_tags_and_bad_files(tmp_path):
+    path = str(tmp_path / "cache.npz")
+    cached = CachedScorer(make_scorer())
+    cached.score(random_triples(np.random.default_rng(3), 20))
+    cached.save(path, tag="weights-a")
+    other = CachedScorer(make_scorer())
+    assert not other.load(path, tag="weights-b")
+    assert not other.load(str(tmp_path / "missing.npz"))
+    assert len(other.keys) == 0
+
+    np.savez(path, keys=cached.keys[::-1], values=cached.values, last_used=cached.last_used,
+             tag=np.array("weights-a"))
+    assert not other.load(path, tag="weights-a")
+    np.savez(path, keys=cached.keys, values=cached.values[:-1], last_used=cached.last_used,
+             tag=np.array("weights-a"))
+    assert not other.load(path, tag="weights-a")
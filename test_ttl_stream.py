@@ -0,0 +1,83 @@
+import importlib
+
+import pytest
+from rdflib import BNode, Graph
+
+import ttl_stream
+
+# The streaming reader against rdflib: same (str(s), str(p), str(o)) triple set
+# on a fixture covering the Turtle our ABox builder writes, on the bundled
+# research_ontology.ttl, and C1's fallback to rdflib outside that subset.
+FIXTURE = r'''@prefix ex: <http://example.org/ns#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+ex:Paper_1 a ex:Paper ;
+    ex:title "Streaming \"Turtle\" parsers"@en ;
+    ex:abstract """A long string
+spanning "several" lines.""" ;
+    ex:year "2021"^^xsd:integer ;
+    ex:pages 12 ;
+    ex:score 1.5e0 ;
+    ex:weight 0.25 ;
+    ex:open true ;
+    ex:rank "03"^^xsd:int ;
+    ex:ratio "2.50"^^<http://www.w3.org/2001/XMLSchema#double> ;
+    ex:keyword "graphs", "rdf" , "tab\there" ;
+    ex:cites ex:Paper_2, <http://example.org/other#Paper_3> .
+
+<http://example.org/ns#Paper_2> rdfs:label "café \U0001F600" .
+ex:Paper_2 ex:note "ends with a dot." .
+'''
+
+
+def rdflib_triples(path, fmt):
+    graph = Graph()
+    graph.parse(path, format=fmt)
+    return {(str(s), str(p), str(o)) for s, p, o in graph}
+
+
+def test_fixture_matches_rdflib(tmp_path):
+    path = tmp_path / "fixture.ttl"
+    path.write_text(FIXTURE, encoding="utf-8")
+    streamed = list(ttl_stream.iter_triples(str(path)))
+    assert set(streamed) == rdflib_triples(str(path), "turtle")
+    assert len(streamed) == 17
+
+
+def test_research_ontology_matches_rdflib():
+    assert set(ttl_stream.iter_triples("research_ontology.ttl")) == rdflib_triples("research_ontology.ttl",
+                                                                                   "turtle")
+
+
+def test_max_lit_len_drops_long_literals(tmp_path):
+    path = tmp_path / "fixture.ttl"
+    path.write_text(FIXTURE, encoding="utf-8")
+    kept = set(ttl_stream.iter_triples(str(path), max_lit_len=10))
+    assert all(len(o) <= 10 for _, p, o in kept if p.endswith(("title", "abstract", "note")))
+    assert ("http://example.org/ns#Paper_1", "http://example.org/ns#pages", "12") in kept
+
+
+@pytest.mark.parametrize("statement", [
+    "ex:a ex:b [ ex:c ex:d ] .",
+    "_:node ex:b ex:c .",
+    "ex:a ex:b ( ex:c ex:d ) .",
+    "@base <http://example.org/> .",
+    "ex:a ex:b 'single quoted' .",
+])
+def test_unsupported_syntax_raises_and_c1_falls_back(tmp_path, statement):
+    path = tmp_path / "fallback.ttl"
+    path.write_text("@prefix ex: <http://example.org/ns#> .\nex:x ex:y ex:z .\n" + statement + "\n",
+                    encoding="utf-8")
+    with pytest.raises(ttl_stream.UnsupportedSyntax):
+        list(ttl_stream.iter_triples(str(path)))
+
+    c1 = importlib.import_module("1234_C1_prepare_dataset_XingFerrer")
+    triples, entities, relations = c1.load_triples(str(path))
+    decoded = {(entities[h], relations[r], entities[t]) for h, r, t in triples}
+    graph = Graph()
+    graph.parse(str(path), format="turtle")
+    # Blank node labels differ between parses: same count, same triples without them
+    assert len(decoded) == len(graph)
+    assert {(str(s), str(p), str(o)) for s, p, o in graph
+            if not isinstance(s, BNode) and not isinstance(o, BNode)} <= decoded
@@ -0,0 +1,247 @@
+import os
+import queue
+import time
+
+import torch
+import torch.nn as nn
+import torch.optim as optim
+
+import kg_dataset
+
+# ——— TransE model ———
+# sparse=True makes the embeddings produce sparse gradients: only the rows a
+# batch touches get a gradient, and make_optimizer() then picks SparseAdam so
+# the optimizer state is updated for those rows only, not the whole table.
+class TransEModel(nn.Module):
+    def __init__(self, num_entities, num_relations, dim, sparse=False):
+        super().__init__()
+        self.sparse = sparse
+        self.entity_embeddings = nn.Embedding(num_entities, dim, sparse=sparse)
+        self.relation_embeddings = nn.Embedding(num_relations, dim, sparse=sparse)
+        nn.init.xavier_uniform_(self.entity_embeddings.weight.data)
+        nn.init.xavier_uniform_(self.relation_embeddings.weight.data)
+
+    def forward(self, heads, rels, tails):
+        # L2 norm of (e_h + w_r - e_t); works on any (matching) index shape
+        h_emb = self.entity_embeddings(heads)
+        r_emb = self.relation_embeddings(rels)
+        t_emb = self.entity_embeddings(tails)
+        return torch.norm(h_emb + r_emb - t_emb, p=2, dim=-1)
+
+
+def make_optimizer(model, lr):
+    if model.sparse:
+        return optim.SparseAdam(list(model.parameters()), lr=lr)
+    return optim.Adam(model.parameters(), lr=lr)
+
+
+def renormalize_rows(embedding, rows, max_norm=1.0):
+    # Projects the given entity rows back into the max_norm ball (TransE's
+    # ||e|| <= 1 constraint) without touching the rest of the table
+    with torch.no_grad():
+        rows = torch.unique(rows)
+        weight = embedding.weight
+        vectors = weight.index_select(0, rows)
+        scale = (vectors.norm(p=2, dim=1, keepdim=True) / max_norm).clamp(min=1)
+        weight.index_copy_(0, rows, vectors / scale)
+
+
+# ——— Known-true triples ———
+# The packed keys of kg_dataset.triple_keys, kept sorted on the training
+# device, so a tensor of negatives is checked with one torch.searchsorted.
+class KnownTriples:
+    def __init__(self, triples, num_entities, num_relations, device="cpu"):
+        self.num_entities = num_entities
+        self.num_relations = num_relations
+        triples = torch.as_tensor(triples, dtype=torch.int64, device=device)
+        self.keys = torch.unique(self.encode(triples))
+
+    def encode(self, triples):
+        return kg_dataset.triple_keys(triples, self.num_entities, self.num_relations)
+
+    def contains(self, triples):
+        keys = self.encode(triples)
+        pos = torch.searchsorted(self.keys, keys).clamp_(max=len(self.keys) - 1)
+        return self.keys[pos] == keys
+
+
+# ——— Negative sampling ———
+def corrupt(positive, num_entities, negatives, head_prob=0.5, generator=None):
+    # (B, 3) positives -> (B, k, 3) negatives; each one replaces the head or the tail
+    batch = positive.size(0)
+    device = positive.device
+    negative = positive.unsqueeze(1).repeat(1, negatives, 1)
+    random_ids = torch.randint(0, num_entities, (batch, negatives), device=device, generator=generator)
+    on_head = torch.rand((batch, negatives), device=device, generator=generator) < head_prob
+    negative[:, :, 0] = torch.where(on_head, random_ids, negative[:, :, 0])
+    negative[:, :, 2] = torch.where(on_head, negative[:, :, 2], random_ids)
+    return negative
+
+
+def sample_negatives(positive, num_entities, negatives, known=None, head_prob=0.5,
+                     retries=3, generator=None):
+    # Corrupted triples that happen to be true are redrawn a few times; any left
+    # after that are masked out of the loss
+    negative = corrupt(positive, num_entities, negatives, head_prob, generator)
+    if known is None:
+        return negative, None
+    clash = known.contains(negative)
+    for _ in range(retries):
+        if not clash.any():
+            break
+        redraw = corrupt(positive, num_entities, negatives, head_prob, generator)
+        negative = torch.where(clash.unsqueeze(-1), redraw, negative)
+        clash = known.contains(negative)
+    return negative, ~clash
+
+
+# ——— Training ———
+def margin_loss(pos_scores, neg_scores, margin, valid=None):
+    # Same as MarginRankingLoss(pos, neg, target=-1), averaged over all k negatives
+    losses = torch.relu(margin + pos_scores.unsqueeze(1) - neg_scores)
+    if valid is None:
+        return losses.mean()
+    return (losses * valid).sum() / valid.sum().clamp(min=1)
+
+
+def train_epoch(model, optimizer, triples, batch_size, margin, negatives,
+                known=None, head_prob=0.5, renorm=False, generator=None):
+    # triples live on the model's device; the loss stays there until the epoch ends.
+    # renorm re-projects only the entity rows the batch used after every step.
+    num_entities = model.entity_embeddings.num_embeddings
+    permutation = torch.randperm(len(triples), device=triples.device, generator=generator)
+    total = torch.zeros((), device=triples.device)
+    for i in range(0, len(permutation), batch_size):
+        positive = triples[permutation[i:i + batch_size]]
+        negative, valid = sample_negatives(positive, num_entities, negatives, known,
+                                           head_prob, generator=generator)
+
+        optimizer.zero_grad()
+        pos_scores = model(positive[:, 0], positive[:, 1], positive[:, 2])
+        neg_scores = model(negative[..., 0], negative[..., 1], negative[..., 2])
+        loss = margin_loss(pos_scores, neg_scores, margin, valid)
+        loss.backward()
+        optimizer.step()
+        if renorm:
+            touched = torch.cat([positive[:, [0, 2]].reshape(-1), negative[..., [0, 2]].reshape(-1)])
+            renormalize_rows(model.entity_embeddings, touched)
+        total += loss.detach() * positive.size(0)
+    return total / len(triples)
+
+
+def train(model, optimizer, triples, epochs, batch_size, margin, negatives=1,
+          known=None, head_prob=0.5, renorm=False, generator=None, log=print,
+          start_epoch=1, on_epoch=None):
+    # Returns the per-epoch (avg loss, triples/s); the loss is read once per epoch.
+    # on_epoch(epoch) runs after every epoch (checkpointing); start_epoch resumes.
+    history = []
+    for epoch in range(start_epoch, epochs + 1):
+        start = time.perf_counter()
+        avg_loss = train_epoch(model, optimizer, triples, batch_size, margin, negatives,
+                               known, head_prob, renorm, generator).item()
+        rate = len(triples) / (time.perf_counter() - start)
+        history.append((avg_loss, rate))
+        if log:
+            log(f"Epoch {epoch:2d}/{epochs} – Avg Loss: {avg_loss:.4f} – {rate:,.0f} triples/s")
+        if on_epoch:
+            on_epoch(epoch)
+    return history
+
+
+# ——— Hogwild data-parallel training (CPU) ———
+# The model's parameters are moved to shared memory and every worker process
+# trains on its own shard of the triples, writing to the shared embeddings
+# without locks. Each worker keeps its own optimizer state and runs with a
+# single thread, so adding workers adds cores instead of oversubscribing them.
+# The model must be sparse (SparseAdam): a dense optimizer step rewrites the
+# whole entity table, so every worker would overwrite the others' updates
+# wholesale instead of only touching the rows of its batch.
+# Workers meet at a barrier after every epoch; the parent reports the loss and
+# the wall-clock throughput of the epoch as a whole.
+def _hogwild_worker(rank, model, shard, epochs, batch_size, margin, lr, negatives,
+                    known, head_prob, renorm, seed, barrier, results):
+    torch.set_num_threads(1)
+    torch.manual_seed(seed + rank)
+    optimizer = make_optimizer(model, lr)
+    for epoch in range(epochs):
+        avg_loss = train_epoch(model, optimizer, shard, batch_size, margin, negatives,
+                               known, head_prob, renorm).item()
+        results.put((epoch, avg_loss * len(shard)))
+        barrier.wait()
+
+
+def train_hogwild(model, triples, epochs, batch_size, margin, lr, negatives=1, known=None,
+                  head_prob=0.5, renorm=False, workers=2, seed=0, log=print,
+                  start_epoch=1, on_epoch=None):
+    # Same model and history as train(), but built by `workers` processes
+    if not model.sparse:
+        raise ValueError("Hogwild training needs a sparse model (TransEModel(..., sparse=True))")
+    if start_epoch > epochs:
+        return []
+    ctx = torch.multiprocessing.get_context("fork")
+    model.share_memory()
+    shards = torch.randperm(len(triples), generator=torch.Generator().manual_seed(seed)).chunk(workers)
+    barrier = ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_hogwild_worker,
+                    args=(rank, model, triples[idx].clone(), epochs - start_epoch + 1, batch_size, margin, lr,
+                          negatives, known, head_prob, renorm, seed, barrier, results))
+        for rank, idx in enumerate(shards)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    history = []
+    try:
+        for epoch in range(start_epoch, epochs + 1):
+            total = sum(_next_result(results, processes) for _ in processes)
+            now = time.perf_counter()
+            avg_loss, rate = total / len(triples), len(triples) / (now - start)
+            history.append((avg_loss, rate))
+            if log:
+                log(f"Epoch {epoch:2d}/{epochs} – Avg Loss: {avg_loss:.4f} – {rate:,.0f} triples/s"
+                    f" ({workers} workers)")
+            # Workers are parked at the barrier, so the weights are not moving here
+            if on_epoch:
+                on_epoch(epoch)
+            barrier.wait()
+            start = time.perf_counter()
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    return history
+
+
+def _next_result(results, processes):
+    # Waits for a worker's epoch loss, failing fast if a worker died
+    while True:
+        try:
+            return results.get(timeout=1.0)[1]
+        except queue.Empty:
+            dead = [p for p in processes if p.exitcode not in (None, 0)]
+            if dead:
+                raise RuntimeError(f"hogwild worker exited with code {dead[0].exitcode}")
+
+
+# ——— Checkpoints ———
+# Model and optimizer state in one torch file; Hogwild runs save the model only
+# (their optimizer state lives in the workers) and resume with a fresh optimizer.
+def save_checkpoint(path, model, optimizer=None):
+    state = {"model": model.state_dict()}
+    if optimizer is not None:
+        state["optimizer"] = optimizer.state_dict()
+    tmp = path + ".tmp"
+    torch.save(state, tmp)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, model, optimizer=None):
+    state = torch.load(path, map_location=model.entity_embeddings.weight.device)
+    model.load_state_dict(state["model"])
+    if optimizer is not None and "optimizer" in state:
+        optimizer.load_state_dict(state["optimizer"])
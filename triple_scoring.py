@@ -0,0 +1,109 @@
+import numpy as np
+
+import kg_dataset
+from kge_eval import KGEScorer
+
+# ——— Batched triple scoring with a score cache ———
+# Scores come straight from the exported embedding matrices (a KGEScorer), a
+# fixed-size chunk of triples at a time. Every scored triple is kept in a cache
+# keyed on its packed triple key (kg_dataset.triple_keys), held sorted so a
+# batch of hits is one kg_dataset.find_keys. Each entry carries the call number
+# it was last used in; past `capacity` entries the least recently used ones are
+# evicted.
+# save() / load() keep the cache across runs, tagged with the weights the
+# scores came from (e.g. the model checkpoint hash) so stale scores are ignored.
+DEFAULT_CHUNK = 65_536
+DEFAULT_CAPACITY = 20_000_000
+
+
+class CachedScorer:
+    def __init__(self, scorer, chunk=DEFAULT_CHUNK, capacity=DEFAULT_CAPACITY):
+        self.scorer = scorer
+        self.num_entities = scorer.num_entities
+        self.num_relations = len(scorer.R)
+        self.chunk = chunk
+        self.capacity = capacity
+        self.keys = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=np.float32)
+        self.last_used = np.empty(0, dtype=np.int64)
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_ampligraph(cls, model, num_entities, num_relations, **kwargs):
+        return cls(KGEScorer.from_ampligraph(model, num_entities, num_relations), **kwargs)
+
+    def encode(self, triples):
+        return kg_dataset.triple_keys(triples, self.num_entities, self.num_relations)
+
+    def _score(self, triples):
+        out = np.empty(len(triples), dtype=np.float32)
+        for start in range(0, len(triples), self.chunk):
+            h, r, t = triples[start:start + self.chunk].T
+            out[start:start + self.chunk] = self.scorer.score(h, r, t)
+        return out
+
+    def _insert(self, keys, values):
+        # keys are sorted and none is cached yet: merged in place of a full re-sort
+        pos = np.searchsorted(self.keys, keys)
+        keys = np.insert(self.keys, pos, keys)
+        values = np.insert(self.values, pos, values)
+        last_used = np.insert(self.last_used, pos, self.calls)
+        self.keys, self.values, self.last_used = self._evict(keys, values, last_used)
+
+    def _evict(self, keys, values, last_used):
+        # Least recently used entries past capacity; a mask keeps the rest in key order
+        if len(keys) <= self.capacity:
+            return keys, values, last_used
+        keep = np.zeros(len(keys), dtype=bool)
+        if self.capacity:
+            keep[np.argpartition(-last_used, self.capacity - 1)[:self.capacity]] = True
+        return keys[keep], values[keep], last_used[keep]
+
+    def score(self, triples):
+        # (N, 3) triples -> (N,) scores, higher = more plausible
+        triples = np.asarray(triples, dtype=np.int64).reshape(-1, 3)
+        self.calls += 1
+        keys, first, inverse = np.unique(self.encode(triples), return_index=True, return_inverse=True)
+        pos, hit = kg_dataset.find_keys(self.keys, keys)
+        scores = np.empty(len(keys), dtype=np.float32)
+        scores[hit] = self.values[pos[hit]]
+        self.last_used[pos[hit]] = self.calls
+        scores[~hit] = self._score(triples[first[~hit]])
+        self.hits += int(hit.sum())
+        self.misses += int((~hit).sum())
+        if self.capacity and (~hit).any():
+            self._insert(keys[~hit], scores[~hit])
+        return scores[inverse.ravel()]
+
+    def save(self, path, tag=""):
+        np.savez(path, keys=self.keys, values=self.values, last_used=self.last_used, tag=np.array(tag))
+
+    def load(self, path, tag=""):
+        # False (cache left as is) when there is no usable saved cache for these
+        # weights: missing, another tag, or arrays that are not a valid cache.
+        # Recency carries over, and new calls count as more recent than all of it.
+        try:
+            with np.load(path) as data:
+                if str(data["tag"]) != tag:
+                    return False
+                keys = data["keys"].astype(np.int64, copy=False)
+                values = data["values"].astype(np.float32, copy=False)
+                last_used = data["last_used"].astype(np.int64, copy=False)
+        except (FileNotFoundError, KeyError):
+            return False
+        if keys.ndim != 1 or values.shape != keys.shape or last_used.shape != keys.shape \
+                or (np.diff(keys) <= 0).any():
+            return False
+        self.keys, self.values, self.last_used = self._evict(keys, values, last_used)
+        self.calls = int(last_used.max(initial=0))
+        return True
+
+    def clear(self):
+        self.__init__(self.scorer, self.chunk, self.capacity)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"cached": len(self.keys), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,196 @@
+import gzip
+import re
+
+# ——— Streaming reader for the Turtle / N-Triples our ABox builder writes ———
+# Reads one statement at a time and yields (head, relation, tail) strings in
+# the same form as str(term) after an rdflib parse: IRIs expanded, literals as
+# their (normalized) lexical form. Anything outside that subset (blank nodes,
+# collections, @base, single-quoted strings...) raises UnsupportedSyntax so the
+# caller can fall back to rdflib. Gzipped files (.gz) are read as they are.
+XSD = "http://www.w3.org/2001/XMLSchema#"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+
+class UnsupportedSyntax(ValueError):
+    pass
+
+
+TOKEN = re.compile(r'''
+    (?P<ws>\s+|\#[^\n]*)
+  | <(?P<iri>[^>\s]*)>
+  | """(?P<long>(?:[^"\\]|\\.|"(?!""))*)"""
+  | "(?P<short>(?:[^"\\\n]|\\.)*)"
+  | (?P<dtype>\^\^)
+  | @(?P<lang>[a-zA-Z]+(?:-[a-zA-Z0-9]+)*)
+  | (?P<number>[+-]?(?:\d+\.\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+|\d+))(?![\w:])
+  | (?P<bool>true|false)(?![\w:-])
+  | (?P<a>a)(?=[\s<"])
+  | (?P<pname>(?:[A-Za-z][\w.-]*)?:(?:[\w:%-]|\\.|\.(?=[\w:%-]))*)
+  | (?P<punct>[;,.])
+''', re.VERBOSE | re.DOTALL)
+
+ESCAPES = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+ESCAPE = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+DIRECTIVE = re.compile(r'\s*(?:@prefix|PREFIX)\s+([A-Za-z][\w.-]*)?:\s*<([^>]*)>\s*\.?\s*$', re.IGNORECASE)
+
+INTEGER_TYPES = {XSD + t for t in ("integer", "int", "long", "short", "byte",
+                                   "nonNegativeInteger", "positiveInteger")}
+
+
+def _unescape(text):
+    if '\\' not in text:
+        return text
+    def repl(m):
+        code = m.group(1)
+        if code[0] in 'uU' and len(code) > 1:
+            return chr(int(code[1:], 16))
+        return ESCAPES.get(code, code)
+    return ESCAPE.sub(repl, text)
+
+
+def _normalize(lexical, datatype):
+    # rdflib rewrites numeric and boolean lexical forms when it parses them
+    try:
+        if datatype in INTEGER_TYPES:
+            return str(int(lexical))
+        if datatype in (XSD + "double", XSD + "float"):
+            return repr(float(lexical))
+        if datatype == XSD + "boolean":
+            return "true" if lexical.strip().lower() in ("true", "1") else "false"
+    except ValueError:
+        pass
+    return lexical
+
+
+def _statements(lines):
+    buffer, in_long = [], False
+    for line in lines:
+        if not buffer and not line.strip():
+            continue
+        if not buffer and DIRECTIVE.match(line):
+            # SPARQL-style PREFIX lines end without a '.'
+            yield line
+            continue
+        buffer.append(line)
+        if line.count('"""') % 2:
+            in_long = not in_long
+        if not in_long and line.rstrip().endswith('.'):
+            yield "".join(buffer)
+            buffer = []
+    if "".join(buffer).strip():
+        raise UnsupportedSyntax("unterminated statement at end of file")
+
+
+def _terms(statement, prefixes):
+    # Yields ("term", value, is_literal) and ("punct", char, None)
+    tokens = list(TOKEN.finditer(statement))
+    pos = 0
+    i = 0
+    while i < len(tokens):
+        m = tokens[i]
+        if m.start() != pos:
+            raise UnsupportedSyntax(f"cannot read {statement[pos:pos + 40]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        i += 1
+        if kind == "ws":
+            continue
+        if kind == "iri":
+            yield "term", m.group("iri"), False
+        elif kind == "a":
+            yield "term", RDF_TYPE, False
+        elif kind == "pname":
+            prefix, _, local = m.group("pname").partition(":")
+            if prefix not in prefixes:
+                raise UnsupportedSyntax(f"unknown prefix {prefix!r}")
+            yield "term", prefixes[prefix] + _unescape(local), False
+        elif kind in ("long", "short"):
+            lexical = _unescape(m.group(kind))
+            # Optional ^^datatype or @lang right after the string
+            j = i
+            while j < len(tokens) and tokens[j].lastgroup == "ws":
+                j += 1
+            if j < len(tokens) and tokens[j].lastgroup == "dtype":
+                k = j + 1
+                while k < len(tokens) and tokens[k].lastgroup == "ws":
+                    k += 1
+                if k >= len(tokens) or tokens[k].lastgroup not in ("iri", "pname"):
+                    raise UnsupportedSyntax("datatype is not an IRI")
+                dt = tokens[k]
+                if dt.lastgroup == "iri":
+                    datatype = dt.group("iri")
+                else:
+                    prefix, _, local = dt.group("pname").partition(":")
+                    if prefix not in prefixes:
+                        raise UnsupportedSyntax(f"unknown prefix {prefix!r}")
+                    datatype = prefixes[prefix] + _unescape(local)
+                lexical = _normalize(lexical, datatype)
+                pos = dt.end()
+                i = k + 1
+            elif j < len(tokens) and tokens[j].lastgroup == "lang":
+                pos = tokens[j].end()
+                i = j + 1
+            yield "term", lexical, True
+        elif kind == "number":
+            text = m.group("number")
+            if re.fullmatch(r'[+-]?\d+', text):
+                yield "term", str(int(text)), True
+            elif 'e' in text or 'E' in text:
+                yield "term", repr(float(text)), True
+            else:
+                yield "term", text, True
+        elif kind == "bool":
+            yield "term", m.group("bool"), True
+        elif kind == "punct":
+            yield "punct", m.group("punct"), None
+        else:
+            raise UnsupportedSyntax(f"unexpected {m.group(0)!r}")
+    if pos != len(statement):
+        raise UnsupportedSyntax(f"cannot read {statement[pos:pos + 40]!r}")
+
+
+def iter_triples(path, max_lit_len=None, encoding="utf-8"):
+    prefixes = {}
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding=encoding) as lines:
+        for statement in _statements(lines):
+            directive = DIRECTIVE.match(statement)
+            if directive:
+                prefixes[directive.group(1) or ""] = directive.group(2)
+                continue
+            if statement.lstrip().startswith(("@", "BASE", "base")):
+                raise UnsupportedSyntax(statement.strip()[:40])
+
+            subject = predicate = None
+            expect = "subject"
+            for kind, value, is_literal in _terms(statement, prefixes):
+                if kind == "punct":
+                    if value == ";" and expect in ("sep", "predicate"):
+                        expect = "predicate"
+                    elif value == "," and expect == "sep":
+                        expect = "object"
+                    elif value == "." and expect in ("sep", "predicate"):
+                        expect = "subject"
+                    else:
+                        raise UnsupportedSyntax(f"unexpected {value!r}")
+                elif expect == "subject" and not is_literal:
+                    subject, expect = value, "predicate"
+                elif expect == "predicate" and not is_literal:
+                    predicate, expect = value, "object"
+                elif expect == "object":
+                    expect = "sep"
+                    if is_literal and max_lit_len is not None and len(value) > max_lit_len:
+                        continue
+                    yield subject, predicate, value
+                else:
+                    raise UnsupportedSyntax(f"unexpected term {value!r}")
+            if expect != "subject":
+                raise UnsupportedSyntax("statement does not end with '.'")
+
+
+def iter_id_triples(triples, entities, relations):
+    # Assigns ids on the fly; entities / relations are dicts updated in place
+    for h, r, t in triples:
+        yield (entities.setdefault(h, len(entities)),
+               relations.setdefault(r, len(relations)),
+               entities.setdefault(t, len(entities)))
@@ -0,0 +1,64 @@
+import time
+
+# ——— Early stopping and successive halving ———
+# Both work on callables so they do not care how a model is trained:
+#   train_to(epochs, model) -> model   trains (or resumes) a config up to `epochs`;
+#                                      model is the one it returned last time (or None)
+#   evaluate(model) -> score           validation metric, higher is better (MRR)
+
+
+def early_stopping(train_to, evaluate, max_epochs, every=20, patience=3, min_delta=1e-3,
+                   start_epochs=0, best=None, on_best=None, log=print):
+    # Validates every `every` epochs and stops after `patience` checks without an
+    # improvement of at least min_delta. on_best(model, epoch, score) runs on each
+    # new best; best=(score, epoch) carries it over when resuming from start_epochs.
+    # Returns a dict with the best score/epoch and the epochs trained.
+    best_score, best_epoch = best or (float("-inf"), 0)
+    stale = 0
+    epoch = start_epochs
+    history = []
+    model = None
+    while epoch < max_epochs:
+        epoch = min(epoch + every, max_epochs)
+        model = train_to(epoch, model)
+        score = evaluate(model)
+        history.append((epoch, score))
+        if score > best_score + min_delta:
+            best_score, best_epoch, stale = score, epoch, 0
+            if on_best:
+                on_best(model, epoch, score)
+        else:
+            stale += 1
+        if log:
+            log(f"    epoch {epoch:>4}: MRR={score:.4f} (best {best_score:.4f} @ {best_epoch})")
+        if stale >= patience:
+            break
+    return {"best_score": best_score, "best_epoch": best_epoch, "epochs": epoch,
+            "stopped": epoch < max_epochs, "history": history, "model": model}
+
+
+def halving_rungs(min_epochs, max_epochs, eta=3):
+    # Epoch budgets per rung: min_epochs, min_epochs * eta, ... capped at max_epochs
+    rungs = [min(min_epochs, max_epochs)]
+    while rungs[-1] < max_epochs:
+        rungs.append(min(rungs[-1] * eta, max_epochs))
+    return rungs
+
+
+def successive_halving(configs, run_rung, min_epochs, max_epochs, eta=3, log=print):
+    # run_rung(configs, epochs) -> [(config, score), ...] trains every config up to
+    # `epochs` (resuming earlier rungs) and scores it; the best 1/eta go on to the
+    # next rung until one reaches max_epochs. Returns every rung's results.
+    survivors = list(configs)
+    rungs = []
+    for epochs in halving_rungs(min_epochs, max_epochs, eta):
+        start = time.perf_counter()
+        results = sorted(run_rung(survivors, epochs), key=lambda item: item[1], reverse=True)
+        rungs.append((epochs, results))
+        if log:
+            log(f"Rung {epochs:>4} epochs: {len(results)} configs in {time.perf_counter() - start:.1f} s, "
+                f"best MRR={results[0][1]:.4f}" if results else f"Rung {epochs}: no results")
+        survivors = [config for config, _ in results[:max(1, len(results) // eta)]]
+        if not survivors:
+            break
+    return rungs